@@ -2,11 +2,12 @@ from flask import Flask, render_template, request, jsonify, redirect, url_for, f
 from flask_login import login_required, current_user
 from datetime import datetime, date, timedelta
 from config import get_config
-from models import db, User, Group, Student, Attendance
+from models import db, User, Group, Student, Attendance, ensure_indexes
+from database import init_database, health_check, pool_stats
+from metrics import init_metrics, metrics, metrics_response
 from auth import auth_bp, init_auth
+from synthetic import init_synthetic
 from utils import *
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
 from io import BytesIO
 import os
 
@@ -15,22 +16,47 @@ app.config.from_object(get_config())
 
 # Database ni sozlash
 db.init_app(app)
+init_database(app, db)
+
+# So'rovlar latency'si, database so'rovlari soni/vaqti, sekin so'rovlar
+init_metrics(app, db)
+metrics.add_collector(pool_stats.metric_samples)
 
 # Authentication ni sozlash
 init_auth(app)
 app.register_blueprint(auth_bp)
 
-# Database yaratish
-with app.app_context():
-    db.create_all()
-    
-    # Admin yaratish (agar yo'q bo'lsa)
-    if not User.query.filter_by(username='admin').first():
-        admin = User(username='admin')
-        admin.set_password('a928100796')
-        db.session.add(admin)
-        db.session.commit()
-        print("Admin yaratildi: username=admin, password=admin123")
+# Benchmark uchun sun'iy ma'lumotlar (flask synth-data)
+init_synthetic(app)
+
+def init_db():
+    """
+    Jadvallar, indekslar va admin foydalanuvchi
+
+    Import paytida emas, ishga tushirishda BIR MARTA bajariladi:
+    `flask --app app init-db` (gunicorn.conf.py on_starting) yoki `python app.py`.
+    """
+    with app.app_context():
+        db.create_all()
+        ensure_indexes()
+
+        # Admin yaratish (agar yo'q bo'lsa)
+        if not User.query.filter_by(username='admin').first():
+            admin = User(username='admin')
+            if app.config['ADMIN_PASSWORD_HASH']:
+                admin.password_hash = app.config['ADMIN_PASSWORD_HASH']
+            else:
+                admin.set_password('a928100796')
+            db.session.add(admin)
+            db.session.commit()
+            print("Admin yaratildi: username=admin")
+
+
+@app.cli.command('init-db')
+def init_db_command():
+    """Jadvallar, indekslar va admin yaratish (ishga tushirishdan oldin)"""
+    init_db()
+    print("✅ Database tayyor")
 
 # ==================== ROUTES ====================
 
@@ -41,6 +67,26 @@ def index():
         return redirect(url_for('main.dashboard'))
     return redirect(url_for('auth.login'))
 
+@app.route('/health')
+def health():
+    """Health check - database kechikishi va pool statistikasi (login shart emas)"""
+    data, ok = health_check(db)
+    return jsonify(data), 200 if ok else 503
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus metrikalari (barcha worker'lar; ?scope=worker - faqat shu worker)"""
+    return metrics_response(request, app.config.get('METRICS_TOKEN'))
+
+@app.route('/metrics/slow')
+@login_required
+def slow_queries():
+    """Shu worker'dagi oxirgi sekin database so'rovlari (SQL parametrlari bilan)"""
+    return jsonify({
+        'threshold_ms': round(metrics.slow_query_seconds * 1000),
+        'items': list(reversed(metrics.slow_queries))
+    })
+
 # Main blueprint
 from flask import Blueprint
 main_bp = Blueprint('main', __name__)
@@ -176,17 +222,12 @@ def reports_group(group_id):
     # Talabalarni olish
     students = get_students_alphabetically(group_id)
     
-    # Har bir talaba uchun davomat
-    attendances = {}
-    for student in students:
-        att = Attendance.query.filter_by(
-            student_id=student.id,
-            date=selected_date
-        ).first()
-        if att:
-            attendances[student.id] = att.get_hours_list()
-        else:
-            attendances[student.id] = [None] * 7
+    # Guruhning shu kungi davomati (bitta so'rov)
+    day_attendance = get_group_day_attendance(group_id, selected_date)
+    attendances = {
+        student.id: day_attendance.get(student.id, [None] * 7)
+        for student in students
+    }
     
     return render_template(
         'reports_group.html',
@@ -259,7 +300,10 @@ def export_group(group_id):
         end_date = get_current_date()
         start_date = end_date - timedelta(days=30)
     
-    # Excel fayl yaratish
+    # Excel fayl yaratish (openpyxl faqat eksportda kerak - worker importi tezroq)
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, Alignment, PatternFill
+
     wb = Workbook()
     ws = wb.active
     ws.title = f"{group.name}"
@@ -293,8 +337,9 @@ def export_group(group_id):
     # Talabalarni olish
     students = get_students_alphabetically(group_id)
     
-    # Har bir sana uchun
-    delta = end_date - start_date
+    # Oraliq bo'yicha jami g'oyiblar va oxirgi kun davomati (ikkita so'rov)
+    absence_totals = get_group_absence_totals(group_id, start_date, end_date)
+    last_day_attendance = get_group_day_attendance(group_id, end_date)
     
     for idx, student in enumerate(students, 1):
         # Talaba ma'lumotlari
@@ -303,27 +348,12 @@ def export_group(group_id):
         ws.cell(row=current_row, column=3).value = student.last_name
         ws.cell(row=current_row, column=4).value = student.patronymic
         
-        total_absent = 0
-        
-        # Har bir sana uchun davomat
-        for i in range(delta.days + 1):
-            check_date = start_date + timedelta(days=i)
-            attendance = Attendance.query.filter_by(
-                student_id=student.id,
-                date=check_date
-            ).first()
-            
-            if attendance:
-                total_absent += attendance.count_absent()
+        total_absent = absence_totals.get(student.id, 0)
         
         # Oxirgi davomat (eng so'nggi kun)
-        last_attendance = Attendance.query.filter_by(
-            student_id=student.id,
-            date=end_date
-        ).first()
+        hours = last_day_attendance.get(student.id)
         
-        if last_attendance:
-            hours = last_attendance.get_hours_list()
+        if hours:
             for col, hour_status in enumerate(hours, 5):
                 cell = ws.cell(row=current_row, column=col)
                 if hour_status is True:
@@ -364,6 +394,30 @@ def export_group(group_id):
         download_name=filename
     )
 
+@main_bp.route('/export/<any(attendance, students, groups):dataset>.<any(csv, ndjson):fmt>')
+@login_required
+def export_dataset(dataset, fmt):
+    """Xom ma'lumotlarni CSV / NDJSON ko'rinishida oqim bilan yuklab olish"""
+    from stream_export import stream_query
+    
+    try:
+        start_date = datetime.strptime(request.args['start_date'], '%Y-%m-%d').date() \
+            if request.args.get('start_date') else None
+        end_date = datetime.strptime(request.args['end_date'], '%Y-%m-%d').date() \
+            if request.args.get('end_date') else None
+    except ValueError:
+        return jsonify({'error': 'Noto\'g\'ri sana formati'}), 400
+    
+    group_id = request.args.get('group_id', type=int)
+    
+    query = get_export_query(dataset, start_date, end_date, group_id)
+    
+    filename = dataset
+    if start_date or end_date:
+        filename = f"{dataset}_{start_date or ''}_{end_date or ''}"
+    
+    return stream_query(query, fmt, filename)
+
 # Blueprint ni ro'yxatdan o'tkazish
 app.register_blueprint(main_bp)
 
@@ -394,5 +448,6 @@ def utility_processor():
 
 if __name__ == '__main__':
     # Development
+    init_db()
     port = int(os.environ.get("PORT", 5656))
-    app.run(host="0.0.0.0", port=port
+    app.run(host="0.0.0.0", port=port)
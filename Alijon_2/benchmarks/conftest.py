@@ -0,0 +1,116 @@
+"""
+Benchmark sozlamalari (pytest-benchmark)
+
+ISHLATISH (Alijon_2 papkasidan, pip install pytest pytest-benchmark):
+    python -m pytest benchmarks --benchmark-autosave                  # vaqtinchalik SQLite
+    BENCH_DATABASE_URL=postgresql://... python -m pytest benchmarks --benchmark-autosave
+    python -m pytest benchmarks --benchmark-compare                   # oxirgi saqlangan natija bilan
+
+Benchmark'lar tests/ bilan bitta pytest jarayonida ishga tushirilmaydi:
+ikkalasi ham DATABASE_URL'ni o'rnatib bitta `app` modulini import qiladi.
+Shuning uchun pytest.ini'da testpaths = tests - oddiy `python -m pytest`
+faqat tests/ ni yig'adi.
+
+Natijalar .benchmarks/ papkasiga JSON sifatida saqlanadi (yoki
+--benchmark-json=FAYL). JSON'da database dialekti va ma'lumotlar hajmi ham
+bor - har xil sozlamadagi natijalarni adashtirib bo'lmaydi.
+
+Ma'lumotlar hajmi (synthetic.generate, seed bilan deterministik):
+    BENCH_GROUPS=20 BENCH_STUDENTS=2000 BENCH_DAYS=60 BENCH_SEED=42
+    BENCH_ROUNDS=10 - har bir benchmark necha marta o'lchanadi
+
+PostgreSQL database bo'sh bo'lishi kerak - jadvallar init_db() bilan
+yaratiladi va oxirida o'chiriladi.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+BENCH_GROUPS = int(os.environ.get('BENCH_GROUPS', 20))
+BENCH_STUDENTS = int(os.environ.get('BENCH_STUDENTS', 2000))
+BENCH_DAYS = int(os.environ.get('BENCH_DAYS', 60))
+BENCH_SEED = int(os.environ.get('BENCH_SEED', 42))
+
+# JSON natijaga qo'shiladigan ma'lumotlar (dataset fixture to'ldiradi)
+DATASET_INFO = {}
+
+
+def pytest_benchmark_update_json(config, benchmarks, output_json):
+    output_json['dataset'] = DATASET_INFO
+
+
+@pytest.fixture(scope='session')
+def app():
+    """
+    Alohida database'ga ulangan ilova
+    """
+    workdir = tempfile.mkdtemp(prefix='alijon_2_bench_')
+    os.environ['DATABASE_URL'] = os.environ.get(
+        'BENCH_DATABASE_URL', 'sqlite:///' + os.path.join(workdir, 'bench.db')
+    )
+    os.environ.setdefault('METRICS_DIR', os.path.join(workdir, 'metrics'))
+
+    from app import app as flask_app
+
+    # Jadvallar import paytida emas, ishga tushirish buyrug'ida (flask init-db) yaratiladi
+    from app import init_db
+    init_db()
+
+    with flask_app.app_context():
+        yield flask_app
+
+        from models import db
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope='session')
+def dataset(app):
+    """
+    Sun'iy guruhlar, talabalar va soatlik davomat (ANALYZE bilan)
+
+    Returns:
+        dict: synthetic.generate natijasi + group_id (eng katta guruh), student_ids
+    """
+    from models import db, Student
+    from synthetic import generate
+
+    counts = generate(db.engine, groups=BENCH_GROUPS, students=BENCH_STUDENTS,
+                      days=BENCH_DAYS, seed=BENCH_SEED)
+
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql('ANALYZE')
+
+    group_id = db.session.scalar(db.select(Student.group_id).order_by(Student.id).limit(1))
+    student_ids = db.session.scalars(db.select(Student.id).filter_by(group_id=group_id)).all()
+
+    DATASET_INFO.update({
+        'dialect': db.engine.dialect.name,
+        'groups': counts['groups'],
+        'students': counts['students'],
+        'attendance': counts['attendance'],
+        'days': BENCH_DAYS,
+        'seed': BENCH_SEED,
+    })
+    return dict(counts, group_id=group_id, student_ids=student_ids)
+
+
+@pytest.fixture
+def client(app):
+    """
+    Admin sifatida login qilingan test client
+    """
+    from models import User
+
+    user = User.query.filter_by(username='admin').first()
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user.id)
+        session['_fresh'] = True
+    return client
@@ -0,0 +1,88 @@
+"""
+Route benchmark'lari
+
+Har bir o'lchov to'liq HTTP so'rov (test client orqali): login, database,
+shablon yoki Excel yaratish.
+"""
+
+import os
+
+import pytest
+
+
+# Har bir benchmark necha marta o'lchanadi
+BENCH_ROUNDS = int(os.environ.get('BENCH_ROUNDS', 10))
+
+
+def run(benchmark, client, url):
+    """
+    GET so'rovni BENCH_ROUNDS marta o'lchash
+    """
+    def request():
+        response = client.get(url)
+        assert response.status_code == 200, url
+        return response
+
+    return benchmark.pedantic(request, rounds=BENCH_ROUNDS, warmup_rounds=1)
+
+
+def test_dashboard(benchmark, dataset, client):
+    run(benchmark, client, '/dashboard')
+
+
+def test_attendance_page(benchmark, dataset, client):
+    run(benchmark, client, f"/attendance/mark?group_id={dataset['group_id']}")
+
+
+def test_mark_group(benchmark, dataset, client):
+    """
+    Butun guruhni belgilash - bulk endpoint yo'q, sahifa har bir talabani
+    alohida POST qiladi; har bir o'lchovda holatlar almashadi
+    """
+    rounds = iter(range(10 ** 6))
+
+    def mark():
+        flip = next(rounds) % 2
+        for student_id in dataset['student_ids']:
+            response = client.post('/attendance/mark', json={
+                'student_id': student_id,
+                'date': str(dataset['end_date']),
+                'hours': [(student_id + hour + flip) % 7 != 0 for hour in range(7)]
+            })
+            assert response.status_code == 200
+
+    benchmark.pedantic(mark, rounds=BENCH_ROUNDS, warmup_rounds=1)
+
+
+def test_daily_report(benchmark, dataset, client):
+    run(benchmark, client, f"/reports/group/{dataset['group_id']}?date={dataset['end_date']}")
+
+
+@pytest.mark.parametrize('days', [7, 30])
+def test_excel_export(days, benchmark, dataset, client):
+    from datetime import timedelta
+
+    start_date = dataset['end_date'] - timedelta(days=days - 1)
+    run(benchmark, client,
+        f"/export/group/{dataset['group_id']}?start_date={start_date}&end_date={dataset['end_date']}")
+
+
+def test_auto_login(benchmark, app, dataset):
+    """
+    Session'siz so'rov remember cookie bilan (Flask-Login)
+    """
+    login_client = app.test_client()
+    login_client.post('/login', data={'username': 'admin', 'password': 'a928100796', 'remember': 'on'})
+    remember = login_client.get_cookie('remember_token')
+    assert remember is not None
+
+    def fresh_client():
+        client = app.test_client()
+        client.set_cookie('remember_token', remember.value)
+        return (client,), {}
+
+    def request(client):
+        response = client.get('/reports/groups')
+        assert response.status_code == 200
+
+    benchmark.pedantic(request, setup=fresh_client, rounds=BENCH_ROUNDS, warmup_rounds=1)
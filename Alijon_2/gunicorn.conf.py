@@ -0,0 +1,15 @@
+"""
+Gunicorn sozlamalari (gunicorn joriy papkadagi gunicorn.conf.py ni o'zi o'qiydi)
+
+Jadvallar, indekslar va admin master jarayonda BIR MARTA, worker'lar ishga
+tushishidan oldin alohida jarayonda yaratiladi - worker'lar import paytida
+database'ga ulanmaydi. Procfile'dagi buyruq o'zgarmaydi.
+"""
+
+import subprocess
+import sys
+
+
+def on_starting(server):
+    # Xato bo'lsa gunicorn ishga tushmaydi (jadvallarsiz ishlamaslik uchun)
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'app', 'init-db'], check=True)
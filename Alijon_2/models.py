@@ -49,6 +49,11 @@ class Student(db.Model):
     
     attendance_records = db.relationship('Attendance', backref='student', lazy=True, cascade='all, delete-orphan')
     
+    __table_args__ = (
+        # Guruh talabalari alfabit tartibida
+        db.Index('ix_students_group_name', 'group_id', 'last_name', 'first_name', 'patronymic'),
+    )
+    
     @property
     def full_name(self):
         return f"{self.last_name} {self.first_name} {self.patronymic}"
@@ -79,6 +84,10 @@ class Attendance(db.Model):
     
     __table_args__ = (
         db.UniqueConstraint('student_id', 'date', name='unique_student_date'),
+        # Guruh hisobotlari va export (guruh + sana oralig'i)
+        db.Index('ix_attendance_group_date', 'group_id', 'date'),
+        # Dashboard (bugungi davomat)
+        db.Index('ix_attendance_date', 'date'),
     )
     
     def get_hours_list(self):
@@ -131,3 +140,17 @@ class TrustedDevice(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     user = db.relationship('User', backref='trusted_devices')
+    
+    __table_args__ = (
+        db.Index('ix_trusted_devices_user_last_login', 'user_id', 'last_login'),
+    )
+
+
+def ensure_indexes():
+    """
+    Modeldagi indekslarni mavjud jadvallarda ham yaratish
+    (db.create_all() faqat yangi jadvallarga indeks qo'shadi)
+    """
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
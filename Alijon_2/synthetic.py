@@ -0,0 +1,186 @@
+"""
+Synthetic Data Module
+Benchmark va yuklama testlari uchun deterministik sun'iy ma'lumotlar
+
+Bir xil seed va parametrlar bo'sh database'da har safar bir xil guruhlar,
+talabalar va davomatni yaratadi - benchmark natijalarini solishtirish mumkin.
+
+    guruhlar   - '{prefix}-0001', '{prefix}-0002', ...
+    talabalar  - guruhlarga navbat bilan taqsimlanadi
+    davomat    - oxirgi `days` kalendar kun (yakshanbalarsiz), 7 soatlik;
+                 har bir talabaning o'z g'oyib bo'lish ehtimoli bor - yo kun
+                 butunlay qoldiriladi, yo alohida soatlar
+
+Yozuvlar chunk_size qatorlik bo'laklarda, har bir bo'lak alohida
+tranzaksiyada yoziladi (100k talaba va bir necha yil ham xotiraga sig'adi).
+
+ISHLATISH:
+    flask --app app synth-data --groups 300 --students 100000 --days 730 --seed 42
+"""
+
+import random
+from datetime import date, datetime, timedelta
+
+from models import db, Group, Student, Attendance
+
+
+FIRST_NAMES = (
+    'Ali', 'Aziz', 'Bobur', 'Dilshod', 'Doniyor', 'Eldor', 'Farrux', 'Jasur',
+    'Javohir', 'Otabek', 'Sardor', 'Sherzod', 'Ulugbek', 'Abdulla', 'Islom',
+    'Laylo', 'Madina', 'Malika', 'Nilufar', 'Nodira', 'Sevara', 'Shahlo',
+    'Dilnoza', 'Gulnora', 'Kamola', 'Zarina', 'Mohira', 'Feruza', 'Umida', 'Yulduz',
+)
+
+LAST_NAMES = (
+    'Valiyev', 'Karimov', 'Toshmatov', 'Rahimov', 'Yusupov', 'Aliyev', 'Tursunov',
+    'Nazarov', 'Ergashev', 'Xolmatov', 'Qodirov', 'Saidov', 'Mirzayev', 'Sobirov',
+    'Jo\'rayev', 'Hasanov', 'Ismoilov', 'Abdullayev', 'Usmonov', 'Olimov',
+)
+
+MIDDLE_NAMES = (
+    'Akmalovich', 'Baxtiyorovich', 'Rustamovich', 'Shavkatovich', 'Anvarovich',
+    'Akmalovna', 'Baxtiyorovna', 'Rustamovna', 'Shavkatovna', 'Anvarovna',
+)
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def school_days(end_date, days):
+    """
+    Oxirgi `days` kalendar kun ichidagi dars kunlari (yakshanbasiz)
+
+    Returns:
+        list: Sanalar (o'sish tartibida)
+    """
+    start_date = end_date - timedelta(days=days - 1)
+    return [
+        start_date + timedelta(days=offset)
+        for offset in range(days)
+        if (start_date + timedelta(days=offset)).weekday() != 6
+    ]
+
+
+def _insert_chunked(engine, table, rows, chunk_size):
+    """
+    Qatorlarni chunk_size bo'laklarda yozish (har biri alohida tranzaksiya)
+
+    Returns:
+        int: Yozilgan qatorlar soni
+    """
+    total = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            with engine.begin() as conn:
+                conn.execute(table.insert(), chunk)
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        with engine.begin() as conn:
+            conn.execute(table.insert(), chunk)
+        total += len(chunk)
+    return total
+
+
+def generate(engine, groups=10, students=300, days=30, seed=42,
+             end_date=None, prefix='Synth', chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Guruhlar, talabalar va davomat yaratish
+
+    Args:
+        engine: SQLAlchemy engine (db.engine)
+        groups: Guruhlar soni
+        students: Talabalar soni (barcha guruhlar bo'yicha)
+        days: Davomat kunlari (kalendar kunlar, end_date bilan tugaydi)
+        seed: Tasodifiy sonlar generatori uchun seed
+        end_date: Oxirgi davomat kuni (standart - bugun)
+        prefix: Guruh nomlari prefiksi (mavjud guruhlar bilan to'qnashmasligi uchun)
+
+    Returns:
+        dict: groups, students, attendance, start_date, end_date
+    """
+    rng = random.Random(seed)
+    end_date = end_date or date.today()
+
+    group_names = [f'{prefix}-{i:04}' for i in range(1, groups + 1)]
+    _insert_chunked(engine, Group.__table__, ({'name': name} for name in group_names), chunk_size)
+
+    with engine.connect() as conn:
+        group_ids = [row.id for row in conn.execute(
+            db.select(Group.id).where(Group.name.in_(group_names)).order_by(Group.name)
+        )]
+
+    _insert_chunked(engine, Student.__table__, (
+        {
+            'first_name': rng.choice(FIRST_NAMES),
+            'last_name': rng.choice(LAST_NAMES),
+            'patronymic': rng.choice(MIDDLE_NAMES),
+            'group_id': group_ids[i % groups],
+        }
+        for i in range(students)
+    ), chunk_size)
+
+    with engine.connect() as conn:
+        student_rows = conn.execute(
+            db.select(Student.id, Student.group_id)
+            .where(Student.group_id.in_(group_ids))
+            .order_by(Student.id)
+        ).all()
+
+    # Har bir talabaning g'oyib bo'lish ehtimoli (o'rtacha ~10%, ba'zilari ko'p qoldiradi)
+    absence_rates = [rng.betavariate(1.5, 12) for _ in student_rows]
+    dates = school_days(end_date, days)
+
+    def hours(rate):
+        # Kun butunlay qoldirilgan yoki alohida soatlar (kechikish, erta ketish)
+        if rng.random() < rate:
+            return {f'hour_{hour}': False for hour in range(1, 8)}
+        return {f'hour_{hour}': rng.random() >= rate / 4 for hour in range(1, 8)}
+
+    attendance = _insert_chunked(engine, Attendance.__table__, (
+        dict(
+            student_id=student_id,
+            group_id=group_id,
+            date=day,
+            **hours(rate)
+        )
+        for day in dates
+        for (student_id, group_id), rate in zip(student_rows, absence_rates)
+    ), chunk_size)
+
+    return {
+        'groups': len(group_ids),
+        'students': len(student_rows),
+        'attendance': attendance,
+        'start_date': dates[0] if dates else end_date,
+        'end_date': end_date,
+    }
+
+
+def init_synthetic(app):
+    """
+    `flask synth-data` buyrug'ini ro'yxatdan o'tkazish
+
+    Args:
+        app: Flask application
+    """
+    import click
+
+    @app.cli.command('synth-data')
+    @click.option('--groups', default=10, show_default=True, help='Guruhlar soni')
+    @click.option('--students', default=300, show_default=True, help='Talabalar soni')
+    @click.option('--days', default=30, show_default=True, help='Davomat kunlari (kalendar)')
+    @click.option('--seed', default=42, show_default=True, help='Seed (bir xil seed - bir xil ma\'lumot)')
+    @click.option('--end', 'end_str', default=None, help='Oxirgi kun (YYYY-MM-DD, standart - bugun)')
+    @click.option('--prefix', default='Synth', show_default=True, help='Guruh nomlari prefiksi')
+    @click.option('--chunk-size', default=DEFAULT_CHUNK_SIZE, show_default=True,
+                  help='Bitta tranzaksiyadagi qatorlar soni')
+    def synth_data_command(groups, students, days, seed, end_str, prefix, chunk_size):
+        """Benchmark uchun deterministik sun'iy ma'lumotlar yaratish"""
+        end_date = datetime.strptime(end_str, '%Y-%m-%d').date() if end_str else None
+
+        counts = generate(db.engine, groups=groups, students=students, days=days, seed=seed,
+                          end_date=end_date, prefix=prefix, chunk_size=chunk_size)
+        print(f"✅ {counts['groups']} ta guruh, {counts['students']} ta talaba, "
+              f"{counts['attendance']} ta davomat yozuvi yaratildi")
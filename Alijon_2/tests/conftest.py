@@ -0,0 +1,150 @@
+"""
+Test sozlamalari
+
+ISHLATISH (Alijon_2 papkasidan):
+    python -m pytest tests                                  # vaqtinchalik SQLite
+    TEST_DATABASE_URL=postgresql://... python -m pytest tests   # PostgreSQL
+
+PostgreSQL database bo'sh test database bo'lishi kerak - jadvallar
+init_db() bilan yaratiladi va test oxirida o'chiriladi.
+"""
+
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Seed hajmi - planner indeksni tanlashi uchun yetarli, lekin tez
+SEED_GROUPS = 5
+SEED_STUDENTS = 200
+SEED_DAYS = 31
+SEED_USERS = 50
+
+
+@pytest.fixture(scope='session')
+def app():
+    """
+    Alohida database'ga ulangan ilova
+    """
+    workdir = tempfile.mkdtemp(prefix='alijon_2_tests_')
+    os.environ['DATABASE_URL'] = os.environ.get(
+        'TEST_DATABASE_URL', 'sqlite:///' + os.path.join(workdir, 'test.db')
+    )
+
+    from app import app as flask_app
+    flask_app.config['TESTING'] = True
+
+    # Jadvallar import paytida emas, ishga tushirish buyrug'ida (flask init-db) yaratiladi
+    from app import init_db
+    init_db()
+
+    with flask_app.app_context():
+        yield flask_app
+
+        from models import db
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope='module')
+def seed(app):
+    """
+    Query plan testlari uchun o'z database'i: jadvallar qaytadan yaratiladi,
+    har bir katta jadval to'ldiriladi va ANALYZE qilinadi. Rejalar boshqa
+    test modullari qoldirgan ma'lumot va statistikaga bog'liq emas.
+
+    Returns:
+        dict: today, start_date, group_id, student_id, user_id
+    """
+    from app import init_db
+    from models import db, Group, Student, Attendance, User, BlockedDevice, TrustedDevice
+
+    db.session.remove()
+    db.drop_all()
+    init_db()
+
+    today = date.today()
+    start_date = today - timedelta(days=SEED_DAYS - 1)
+
+    groups = [Group(name=f'Test-{i:02}') for i in range(SEED_GROUPS)]
+    db.session.add_all(groups)
+    db.session.commit()
+
+    db.session.execute(db.insert(Student), [
+        {
+            'first_name': f'Ism{i:04}',
+            'last_name': f'Familiya{i:04}',
+            'patronymic': 'Otasi',
+            'group_id': groups[i % SEED_GROUPS].id
+        }
+        for i in range(SEED_STUDENTS)
+    ])
+    db.session.commit()
+
+    students = db.session.execute(
+        db.select(Student.id, Student.group_id).where(
+            Student.group_id.in_([group.id for group in groups])
+        )
+    ).all()
+    db.session.execute(db.insert(Attendance), [
+        dict(
+            student_id=student_id,
+            group_id=group_id,
+            date=start_date + timedelta(days=day),
+            **{f'hour_{hour}': (student_id + day + hour) % 6 != 0 for hour in range(1, 8)}
+        )
+        for student_id, group_id in students
+        for day in range(SEED_DAYS)
+    ])
+
+    # Bloklangan qurilmalar va har bir foydalanuvchiga 3 tadan ishonchli qurilma
+    db.session.execute(db.insert(User), [
+        {'username': f'user-{i:03}', 'password_hash': '-'} for i in range(SEED_USERS)
+    ])
+    db.session.execute(db.insert(BlockedDevice), [
+        {'ip_address': f'10.0.{i % 8}.{i % 250}', 'user_agent': f'agent-{i:04}', 'failed_attempts': 5}
+        for i in range(SEED_STUDENTS)
+    ])
+    user_ids = [row.id for row in db.session.execute(db.select(User.id))]
+    db.session.execute(db.insert(TrustedDevice), [
+        {'user_id': device_user_id, 'ip_address': f'10.1.{device}.{device_user_id % 250}',
+         'user_agent': f'agent-{device}'}
+        for device_user_id in user_ids
+        for device in range(3)
+    ])
+    db.session.commit()
+    user_id = User.query.filter_by(username='admin').first().id
+
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql('ANALYZE')
+
+    return {
+        'today': today,
+        'start_date': start_date,
+        'group_id': groups[0].id,
+        'student_id': students[1][0],
+        'user_id': user_id
+    }
+
+
+@pytest.fixture
+def captured_sql(app):
+    """
+    Test davomida bajarilgan barcha SQL (statement, parameters) ro'yxati
+    """
+    from models import db
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    yield statements
+    event.remove(db.engine, 'before_cursor_execute', capture)
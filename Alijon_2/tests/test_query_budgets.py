@@ -0,0 +1,167 @@
+"""
+So'rovlar soni byudjeti (N+1 regressiya testlari)
+
+Har bir route ikki xil hajmdagi guruhda chaqiriladi - 10 talaba va
+2 kunlik davomat hamda 1000 talaba va 30 kunlik davomat. Bajarilgan SQL
+so'rovlari soni ikkalasida bir xil bo'lishi va route byudjetidan
+oshmasligi kerak. Talaba yoki kun bo'yicha sikl ichidagi so'rov (N+1)
+katta guruhda darhol sonni oshirib yuboradi.
+
+Byudjetga login (user_loader) va guruhga kirish statistikasi so'rovlari
+ham kiradi.
+"""
+
+from datetime import timedelta
+
+import pytest
+
+from models import db, Group, Student, Attendance, User
+
+
+# Hajm -> (talabalar soni, davomat kunlari)
+SCALES = {
+    'small': (10, 2),
+    'large': (1000, 30),
+}
+
+# Route -> maksimal SQL so'rovlar soni
+QUERY_BUDGETS = {
+    'dashboard': 4,
+    'reports_group': 7,
+    'export_group': 5,
+    'reports_student': 5,
+}
+
+# Route -> hajm ma'lumotlari bilan URL
+ROUTES = {
+    'dashboard': lambda s: '/dashboard',
+    'reports_group': lambda s: f"/reports/group/{s['group_id']}?date={s['end_date']}",
+    'export_group': lambda s: (
+        f"/export/group/{s['group_id']}"
+        f"?start_date={s['start_date']}&end_date={s['end_date']}"
+    ),
+    'reports_student': lambda s: f"/reports/student/{s['student_id']}",
+}
+
+
+@pytest.fixture(scope='module')
+def scales(app):
+    """
+    Har bir hajm uchun alohida guruh, talabalar va davomat
+
+    Returns:
+        dict: hajm -> group_id, student_id, start_date, end_date
+    """
+    from utils import get_current_date
+
+    end_date = get_current_date()
+    data = {}
+
+    for name, (student_count, days) in SCALES.items():
+        group = Group(name=f'Budget-{name}')
+        db.session.add(group)
+        db.session.commit()
+
+        db.session.execute(db.insert(Student), [
+            {
+                'first_name': f'Ism{i:04}',
+                'last_name': f'Byudjet{i:04}',
+                'patronymic': 'Otasi',
+                'group_id': group.id
+            }
+            for i in range(student_count)
+        ])
+        student_ids = db.session.scalars(
+            db.select(Student.id).filter_by(group_id=group.id)
+        ).all()
+
+        start_date = end_date - timedelta(days=days - 1)
+        db.session.execute(db.insert(Attendance), [
+            dict(
+                student_id=student_id,
+                group_id=group.id,
+                date=start_date + timedelta(days=day),
+                **{f'hour_{hour}': (student_id + day + hour) % 4 != 0 for hour in range(1, 8)}
+            )
+            for student_id in student_ids
+            for day in range(days)
+        ])
+        db.session.commit()
+
+        data[name] = {
+            'group_id': group.id,
+            'student_id': student_ids[0],
+            'start_date': start_date,
+            'end_date': end_date,
+        }
+
+    return data
+
+
+@pytest.fixture
+def client(app):
+    """
+    Admin sifatida login qilingan test client
+    """
+    user = User.query.filter_by(username='admin').first()
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user.id)
+        session['_fresh'] = True
+    return client
+
+
+def count_queries(app, client, captured_sql, url):
+    """
+    Bitta so'rovdagi SQL so'rovlari soni
+
+    So'rov yangi app context'da bajariladi - g (login qilgan user) va
+    database session oldingi so'rovdan qolmaydi.
+    """
+    with app.app_context():
+        captured_sql.clear()
+        response = client.get(url)
+        assert response.status_code == 200, url
+        return len(captured_sql)
+
+
+@pytest.mark.parametrize('route', sorted(QUERY_BUDGETS))
+def test_query_budget(route, app, scales, client, captured_sql):
+    counts = {
+        name: count_queries(app, client, captured_sql, ROUTES[route](scale))
+        for name, scale in scales.items()
+    }
+
+    assert counts['large'] <= QUERY_BUDGETS[route], (
+        f"{route}: {counts['large']} ta so'rov (byudjet {QUERY_BUDGETS[route]})"
+    )
+    assert counts['small'] == counts['large'], (
+        f"{route}: so'rovlar soni hajmga bog'liq - {counts}"
+    )
+
+
+def test_export_group_totals(scales, client):
+    """
+    Agregat so'rov Attendance.count_absent() bilan bir xil natija beradi
+    """
+    from openpyxl import load_workbook
+    from io import BytesIO
+
+    scale = scales['small']
+    response = client.get(ROUTES['export_group'](scale))
+    sheet = load_workbook(BytesIO(response.data)).active
+
+    records = Attendance.query.filter(
+        Attendance.group_id == scale['group_id'],
+        Attendance.date >= scale['start_date'],
+        Attendance.date <= scale['end_date']
+    ).all()
+    expected = {}
+    for record in records:
+        expected[record.student_id] = expected.get(record.student_id, 0) + record.count_absent()
+
+    students = Student.query.filter_by(group_id=scale['group_id']).order_by(
+        Student.last_name, Student.first_name, Student.patronymic
+    ).all()
+    totals = [sheet.cell(row=5 + i, column=12).value for i in range(len(students))]
+    assert totals == [expected.get(student.id, 0) for student in students]
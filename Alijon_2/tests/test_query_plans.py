@@ -0,0 +1,119 @@
+"""
+Query plan regressiya testlari
+
+Har bir "issiq" so'rov haqiqiy funksiya orqali bajariladi, uning SQL'i
+ushlanadi va EXPLAIN (SQLite: EXPLAIN QUERY PLAN) bilan tekshiriladi.
+Katta jadvallardan birortasi to'liq skanerlansa (indekssiz) test yiqiladi.
+
+PostgreSQL'da kichik seed jadvallarida ham indeks tanlanishi uchun
+`enable_seqscan = off` qo'yiladi - indeks umuman bo'lmasagina Seq Scan qoladi.
+"""
+
+import re
+
+import pytest
+from sqlalchemy import inspect
+
+from models import db
+from security import is_device_blocked, is_device_trusted
+from utils import (
+    calculate_total_absences, get_dashboard_stats, get_export_query,
+    get_group_absence_totals, get_group_day_attendance,
+    get_or_create_attendance, get_student_attendance_history,
+    get_students_alphabetically
+)
+
+
+# To'liq skanerlanishi mumkin bo'lmagan jadvallar (groups, users - kichik)
+LARGE_TABLES = ('attendance', 'students', 'trusted_devices', 'blocked_devices')
+
+# Butun jadval bo'yicha agregat - to'liq o'qish so'rovning o'zidan kelib chiqadi
+ALLOWED_SCANS = {
+    'dashboard_today': {'students'},  # jami talabalar soni (filtrsiz COUNT)
+}
+
+SQLITE_SCAN = re.compile(r'^SCAN (\w+)$')
+POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+# Nom -> seed bilan chaqiriladigan funksiya
+HOT_QUERIES = {
+    'group_students': lambda s: get_students_alphabetically(s['group_id']),
+    'attendance_get': lambda s: get_or_create_attendance(s['student_id'], s['today']),
+    'student_total_absences': lambda s: calculate_total_absences(s['student_id']),
+    'student_history': lambda s: get_student_attendance_history(s['student_id']),
+    'group_day_attendance': lambda s: get_group_day_attendance(s['group_id'], s['today']),
+    'group_absence_totals': lambda s: get_group_absence_totals(
+        s['group_id'], s['start_date'], s['today']),
+    'dashboard_today': lambda s: get_dashboard_stats(),
+    'attendance_export_group': lambda s: get_export_query(
+        'attendance', s['start_date'], s['today'], s['group_id']).all(),
+    'attendance_export_range': lambda s: get_export_query(
+        'attendance', s['start_date'], s['today']).all(),
+    'device_blocked': lambda s: is_device_blocked(),
+    'device_trusted': lambda s: is_device_trusted(s['user_id']),
+}
+
+
+def explain(statement, parameters):
+    """
+    So'rov rejasi qatorlari (dialektga qarab)
+
+    Returns:
+        list: Reja qatorlari (matn)
+    """
+    with db.engine.connect() as conn:
+        if conn.dialect.name == 'postgresql':
+            with conn.begin():
+                conn.exec_driver_sql('SET LOCAL enable_seqscan = off')
+                rows = conn.exec_driver_sql('EXPLAIN ' + statement, parameters)
+                return [row[0] for row in rows]
+
+        rows = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)
+        return [row[3] for row in rows]
+
+
+def scanned_tables(plan):
+    """
+    Rejada to'liq (indekssiz) skanerlangan katta jadvallar
+    """
+    pattern = POSTGRES_SCAN if db.engine.dialect.name == 'postgresql' else SQLITE_SCAN
+    tables = set()
+    for line in plan:
+        match = pattern.search(line.strip())
+        if match and match.group(1) in LARGE_TABLES:
+            tables.add(match.group(1))
+    return tables
+
+
+@pytest.mark.parametrize('name', sorted(HOT_QUERIES))
+def test_hot_query_uses_indexes(name, app, seed, captured_sql):
+    with app.test_request_context(
+            '/', headers={'User-Agent': 'pytest'}, environ_base={'REMOTE_ADDR': '127.0.0.1'}
+    ):
+        HOT_QUERIES[name](seed)
+    db.session.rollback()
+
+    statements = [
+        (statement, parameters) for statement, parameters in captured_sql
+        if statement.lstrip().split(None, 1)[0].upper() in ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+    ]
+    assert statements, f'{name}: hech qanday so\'rov bajarilmadi'
+
+    for statement, parameters in statements:
+        plan = explain(statement, parameters)
+        assert not scanned_tables(plan) - ALLOWED_SCANS.get(name, set()), (
+            f'{name}: to\'liq skanerlash\n{statement}\n' + '\n'.join(plan)
+        )
+
+
+def test_curated_indexes_exist(app):
+    inspector = inspect(db.engine)
+    expected = {
+        'attendance': {'ix_attendance_group_date', 'ix_attendance_date'},
+        'students': {'ix_students_group_name'},
+        'trusted_devices': {'ix_trusted_devices_user_last_login'},
+    }
+    for table, names in expected.items():
+        existing = {index['name'] for index in inspector.get_indexes(table)}
+        assert names <= existing, f'{table}: {names - existing} yo\'q'
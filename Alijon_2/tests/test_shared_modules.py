@@ -0,0 +1,32 @@
+"""
+Ikkala ilovada bir xil bo'lishi kerak bo'lgan modullar
+
+Ilovalar alohida deploy qilinadi (har birining o'z requirements.txt'i),
+shuning uchun umumiy modullar har bir ilova papkasida nusxa sifatida
+turadi. Bir nusxa o'zgarib, ikkinchisi unutilsa - test yiqiladi.
+Qo'shni ilova papkasi bo'lmasa (faqat shu ilova deploy qilingan) - o'tkaziladi.
+"""
+
+import os
+
+import pytest
+
+
+SHARED_MODULES = ('database.py', 'metrics.py', 'stream_export.py')
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIBLING_DIR = os.path.join(os.path.dirname(APP_DIR), 'Alijon_malim')
+
+
+@pytest.mark.parametrize('name', SHARED_MODULES)
+def test_shared_module_matches_sibling_app(name):
+    sibling = os.path.join(SIBLING_DIR, name)
+    if not os.path.exists(sibling):
+        pytest.skip('Alijon_malim papkasi yo\'q')
+
+    with open(os.path.join(APP_DIR, name), 'rb') as f:
+        ours = f.read()
+    with open(sibling, 'rb') as f:
+        theirs = f.read()
+
+    assert ours == theirs, f'{name}: Alijon_2 va Alijon_malim nusxalari farq qiladi'
@@ -0,0 +1,42 @@
+"""
+Import paytida ish yo'q: `import app` database'ga ulanmaydi va diskda
+fayl yoki papka yaratmaydi (jadvallar - `flask init-db`da, metrikalar
+papkasi - birinchi snapshot yozilganda)
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+
+CHILD = '''
+import json, os, sys
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+connects = []
+event.listen(Engine, 'connect', lambda *args: connects.append('sqlalchemy'))
+
+import app
+
+entries = [os.path.join(root, name) for root, dirs, names in os.walk(sys.argv[1]) for name in dirs + names]
+print(json.dumps({'connects': connects, 'entries': entries}))
+'''
+
+
+def test_import_does_no_work(tmp_path):
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(
+        os.environ,
+        DATABASE_URL='sqlite:///' + str(tmp_path / 'import.db'),
+        METRICS_DIR=str(tmp_path / 'metrics'),
+    )
+
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD, str(tmp_path)],
+        cwd=app_dir, env=env, capture_output=True, text=True, check=True
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert report == {'connects': [], 'entries': []}
@@ -1,4 +1,4 @@
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from models import db, Student, Group, Attendance
 from sqlalchemy import func
 
@@ -71,10 +71,47 @@ def get_student_attendance_history(student_id):
         Attendance.date.desc()
     ).all()
 
+def get_group_day_attendance(group_id, target_date):
+    """Guruh talabalarining bir kunlik davomati - bitta so'rov
+
+    Returns:
+        dict: student_id -> 7 ta soat ro'yxati (yozuvi borlar uchun)
+    """
+    records = Attendance.query.join(
+        Student, Attendance.student_id == Student.id
+    ).filter(
+        Student.group_id == group_id,
+        Attendance.date == target_date
+    ).all()
+    return {record.student_id: record.get_hours_list() for record in records}
+
+def get_group_absence_totals(group_id, start_date, end_date):
+    """Guruh talabalarining sana oralig'idagi jami g'oyiblari - bitta agregat so'rov
+
+    Returns:
+        dict: student_id -> g'oyib soatlar soni (yozuvi borlar uchun)
+    """
+    absent_hours = sum(
+        db.case((getattr(Attendance, f'hour_{i}').is_(False), 1), else_=0)
+        for i in range(1, 8)
+    )
+    rows = db.session.query(
+        Attendance.student_id,
+        func.sum(absent_hours)
+    ).join(
+        Student, Attendance.student_id == Student.id
+    ).filter(
+        Student.group_id == group_id,
+        Attendance.date >= start_date,
+        Attendance.date <= end_date
+    ).group_by(Attendance.student_id).all()
+    return {student_id: int(total or 0) for student_id, total in rows}
+
 def get_dashboard_stats():
     """Dashboard uchun statistika"""
-    total_students = Student.query.count()
-    total_groups = Group.query.count()
+    # COUNT(*) to'g'ridan-to'g'ri (subquery'siz) - indeks bo'yicha sanaladi
+    total_students = db.session.query(func.count()).select_from(Student).scalar()
+    total_groups = db.session.query(func.count()).select_from(Group).scalar()
     
     # Bugungi davomat statistikasi
     today = get_current_date()
@@ -98,3 +135,76 @@ def get_dashboard_stats():
         'present_percentage': round(present_percentage, 1),
         'current_datetime': get_current_datetime()
     }
+
+def get_export_query(dataset, start_date=None, end_date=None, group_id=None):
+    """Xom ma'lumot eksporti uchun ustunli so'rov (stream_export uchun)
+
+    attendance - davomat sanasi bo'yicha, students va groups - qo'shilgan sana bo'yicha
+    """
+    if dataset == 'attendance':
+        hours = [getattr(Attendance, f'hour_{i}') for i in range(1, 8)]
+        query = db.session.query(
+            Attendance.id.label('id'),
+            Attendance.date.label('date'),
+            Attendance.student_id.label('student_id'),
+            Student.last_name.label('last_name'),
+            Student.first_name.label('first_name'),
+            Student.patronymic.label('patronymic'),
+            Attendance.group_id.label('group_id'),
+            Group.name.label('group_name'),
+            *[hour.label(f'hour_{i}') for i, hour in enumerate(hours, 1)],
+            Attendance.updated_at.label('updated_at')
+        ).join(
+            Student, Attendance.student_id == Student.id
+        ).join(
+            Group, Attendance.group_id == Group.id
+        )
+        if start_date:
+            query = query.filter(Attendance.date >= start_date)
+        if end_date:
+            query = query.filter(Attendance.date <= end_date)
+        if group_id:
+            query = query.filter(Attendance.group_id == group_id)
+        return query.order_by(Attendance.date, Attendance.student_id)
+
+    if dataset == 'students':
+        query = db.session.query(
+            Student.id.label('id'),
+            Student.last_name.label('last_name'),
+            Student.first_name.label('first_name'),
+            Student.patronymic.label('patronymic'),
+            Student.group_id.label('group_id'),
+            Group.name.label('group_name'),
+            Student.created_at.label('created_at')
+        ).join(Group, Student.group_id == Group.id)
+        if start_date:
+            query = query.filter(Student.created_at >= start_date)
+        if end_date:
+            query = query.filter(Student.created_at < end_date + timedelta(days=1))
+        if group_id:
+            query = query.filter(Student.group_id == group_id)
+        return query.order_by(Student.id)
+
+    if dataset == 'groups':
+        counts = db.session.query(
+            Student.group_id.label('group_id'),
+            func.count(Student.id).label('students')
+        ).group_by(Student.group_id).subquery()
+
+        query = db.session.query(
+            Group.id.label('id'),
+            Group.name.label('name'),
+            func.coalesce(counts.c.students, 0).label('students'),
+            Group.created_at.label('created_at'),
+            Group.last_accessed.label('last_accessed'),
+            Group.access_count.label('access_count')
+        ).outerjoin(counts, counts.c.group_id == Group.id)
+        if start_date:
+            query = query.filter(Group.created_at >= start_date)
+        if end_date:
+            query = query.filter(Group.created_at < end_date + timedelta(days=1))
+        if group_id:
+            query = query.filter(Group.id == group_id)
+        return query.order_by(Group.id)
+
+    raise ValueError(f"Noma'lum dataset: {dataset}")
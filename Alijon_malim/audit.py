@@ -0,0 +1,242 @@
+"""
+Audit Module
+Xavfsizlik hodisalarini asinxron yozish (SecurityAuditLog uchun sink)
+
+So'rov faqat hodisani xotiradagi chegaralangan navbatga qo'shadi.
+Fon thread'i navbatni to'plamlab (batch) yozadi:
+
+    db     - security_events jadvali (indeksli, /security/events da ko'rinadi)
+    jsonl  - AUDIT_LOG_DIR'dagi aylanuvchi (rotating) JSONL fayllar
+    off    - hodisalar yozilmaydi
+
+Navbat to'lsa hodisa tashlab yuboriladi (so'rov hech qachon kutmaydi),
+tashlanganlar soni `dropped` da saqlanadi.
+"""
+
+import atexit
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows - bitta jarayonli lokal ishga tushirish
+    fcntl = None
+
+
+class DatabaseWriter:
+    """
+    Hodisalarni security_events jadvaliga bitta INSERT bilan yozish
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def write(self, events):
+        from models import db, SecurityEvent
+
+        with self.app.app_context():
+            with db.engine.begin() as conn:
+                conn.execute(SecurityEvent.__table__.insert(), events)
+
+
+class JsonlWriter:
+    """
+    Hodisalarni JSONL fayllarga yozish (hajm bo'yicha aylanadi)
+
+    security_events.jsonl -> security_events.jsonl.1 -> ... -> .{backups}
+
+    Barcha worker'lar bitta faylga yozadi: hajm tekshiruvi, aylantirish va
+    yozish `security_events.jsonl.lock` fayli ustidagi flock ostida bajariladi
+    (ikki worker bir vaqtda aylantirib, fayllarni ikki marta surmasligi uchun).
+    Fayl har yozishda yo'li bo'yicha ochiladi - aylantirishdan keyin boshqa
+    worker'lar eski faylga yozib qolmaydi.
+    """
+
+    def __init__(self, directory, max_bytes=10 * 1024 * 1024, backups=5):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.path = os.path.join(directory, 'security_events.jsonl')
+        self.lock_path = f'{self.path}.lock'
+
+    def _rotate(self):
+        for index in range(self.backups - 1, 0, -1):
+            source = f'{self.path}.{index}'
+            if os.path.exists(source):
+                os.replace(source, f'{self.path}.{index + 1}')
+        os.replace(self.path, f'{self.path}.1')
+
+    def write(self, events):
+        lines = ''.join(
+            json.dumps(event, default=str, ensure_ascii=False) + '\n'
+            for event in events
+        )
+        # Papka birinchi yozishda yaratiladi (import paytida emas)
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.lock_path, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if os.path.exists(self.path) and os.path.getsize(self.path) + len(lines) > self.max_bytes:
+                    self._rotate()
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(lines)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class AuditSink:
+    """
+    Chegaralangan navbat + fon yozuvchi thread
+    """
+
+    def __init__(self, max_queue=10000, batch_size=200, flush_seconds=2.0):
+        """
+        Args:
+            max_queue: Navbatdagi maksimal hodisalar soni
+            batch_size: Bitta yozishdagi maksimal hodisalar soni
+            flush_seconds: To'plam to'lmasa ham shuncha soniyada yoziladi
+        """
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.writer = None
+        self.dropped = 0
+        self.thread = None
+        self.pid = None
+        self.lock = threading.Lock()
+
+    def configure(self, writer, max_queue=None, batch_size=None, flush_seconds=None):
+        """
+        Yozuvchi va sozlamalarni o'rnatish (init_audit)
+        """
+        with self.lock:
+            self.writer = writer
+            if max_queue is not None:
+                self.queue = queue.Queue(maxsize=max_queue)
+            if batch_size is not None:
+                self.batch_size = batch_size
+            if flush_seconds is not None:
+                self.flush_seconds = flush_seconds
+
+    def emit(self, event_type, username=None, ip_address=None, user_agent=None, details=None):
+        """
+        Hodisani navbatga qo'shish (I/O yo'q)
+
+        Returns:
+            bool: False agar navbat to'la bo'lsa va hodisa tashlangan bo'lsa
+        """
+        if self.writer is None:
+            return False
+
+        self._ensure_thread()
+        event = {
+            'created_at': datetime.utcnow(),
+            'event_type': event_type,
+            'username': username,
+            'ip_address': ip_address,
+            'user_agent': (user_agent or '')[:500] or None,
+            'details': details
+        }
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _ensure_thread(self):
+        # Gunicorn fork'idan keyin har bir worker o'z thread'ini ishga tushiradi
+        pid = os.getpid()
+        if self.thread is not None and self.pid == pid and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread is not None and self.pid == pid and self.thread.is_alive():
+                return
+            self.pid = pid
+            self.thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self.thread.start()
+
+    def _next_batch(self, timeout):
+        try:
+            batch = [self.queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        try:
+            self.writer.write(batch)
+        except Exception as e:
+            print(f"❌ Audit log yozishda xatolik ({len(batch)} ta hodisa): {e}")
+
+    def _run(self):
+        while True:
+            batch = self._next_batch(self.flush_seconds)
+            if batch:
+                self._write(batch)
+
+    def flush(self):
+        """
+        Navbatda qolgan hodisalarni darhol yozish (to'xtashda / testlarda)
+
+        Returns:
+            int: Yozilgan hodisalar soni
+        """
+        if self.writer is None:
+            return 0
+
+        total = 0
+        while True:
+            batch = self._next_batch(0)
+            if not batch:
+                return total
+            self._write(batch)
+            total += len(batch)
+
+
+# Barcha worker so'rovlari uchun umumiy sink
+audit_log = AuditSink()
+
+
+def init_audit(app):
+    """
+    Audit sink'ni app sozlamalari bilan ishga tushirish
+
+    Args:
+        app: Flask application
+    """
+    backend = app.config.get('AUDIT_SINK', 'db')
+
+    if backend == 'db':
+        writer = DatabaseWriter(app)
+    elif backend == 'jsonl':
+        from cache import DEFAULT_CACHE_DIR
+        writer = JsonlWriter(
+            app.config.get('AUDIT_LOG_DIR') or os.path.join(
+                app.config.get('CACHE_DIR', DEFAULT_CACHE_DIR), 'audit'
+            ),
+            max_bytes=app.config.get('AUDIT_LOG_MAX_BYTES', 10 * 1024 * 1024),
+            backups=app.config.get('AUDIT_LOG_BACKUPS', 5)
+        )
+    else:
+        writer = None
+
+    audit_log.configure(
+        writer,
+        max_queue=app.config.get('AUDIT_QUEUE_SIZE', 10000),
+        batch_size=app.config.get('AUDIT_BATCH_SIZE', 200),
+        flush_seconds=app.config.get('AUDIT_FLUSH_SECONDS', 2.0)
+    )
+
+    # Worker to'xtaganda navbatda qolganini yozish
+    atexit.register(audit_log.flush)
@@ -26,9 +26,18 @@ import os  # os modulini import qilish
 #     'password_hash': generate_password_hash('928100796')
 # }
 
+# Parol hash'i oldindan hisoblangan - PBKDF2 ataylab sekin, uni har bir
+# worker import paytida hisoblamasligi kerak. Boshqa parol uchun hash'ni
+# ADMIN_PASSWORD_HASH environment o'zgaruvchisiga yozing:
+#   python -c "from werkzeug.security import generate_password_hash; print(generate_password_hash('parol'))"
+DEFAULT_ADMIN_PASSWORD_HASH = (  # '928100796'
+    'pbkdf2:sha256:600000$Mcv5rjRmFe5LI3aM$'
+    'dfeffc3e44c9633cf0c7cf84643ad60caba02c999eaecf10e18bea8a4d49d90e'
+)
+
 ADMIN_CREDENTIALS = {
     'username': 'admin',  # ← LOGIN
-    'password_hash': generate_password_hash('928100796')  # ← PAROL
+    'password_hash': os.getenv('ADMIN_PASSWORD_HASH') or DEFAULT_ADMIN_PASSWORD_HASH  # ← PAROL
 }
 
 
@@ -132,6 +141,7 @@ def create_remember_me_token(response, user_agent=None, ip_address=None):
         Modified response with cookie
     """
     from models import AdminToken
+    from security import SecurityAuditLog
     
     # Token yaratish
     selector, validator, token_obj = AdminToken.generate_token(
@@ -157,6 +167,8 @@ def create_remember_me_token(response, user_agent=None, ip_address=None):
         samesite='Lax'      # CSRF himoyasi
     )
     
+    SecurityAuditLog.log_token_created(ip_address, user_agent)
+    
     return response
 
 
@@ -182,7 +194,13 @@ def verify_remember_me_token():
         return False
     
     # Tokenni tekshirish
-    return AdminToken.verify_token(selector, validator)
+    if AdminToken.verify_token(selector, validator):
+        return True
+    
+    from security import SecurityAuditLog
+    user_agent, ip_address = get_client_info()
+    SecurityAuditLog.log_token_rejected(ip_address, user_agent)
+    return False
 
 
 def revoke_remember_me_token(response):
@@ -204,7 +222,10 @@ def revoke_remember_me_token(response):
         try:
             selector, _ = cookie_value.split(':', 1)
             # Database'dan tokenni o'chirish
-            AdminToken.revoke_token(selector)
+            if AdminToken.revoke_token(selector):
+                from security import SecurityAuditLog
+                _, ip_address = get_client_info()
+                SecurityAuditLog.log_token_revoked(selector, 'Logout', ip_address)
         except ValueError:
             pass
     
@@ -241,8 +262,14 @@ def try_auto_login():
     
     # Remember me token tekshirish
     if verify_remember_me_token():
+        from security import SecurityAuditLog
+        
         # Auto-login
         login_user(ADMIN_CREDENTIALS['username'], login_method='token')
+        user_agent, ip_address = get_client_info()
+        SecurityAuditLog.log_login_success(
+            ADMIN_CREDENTIALS['username'], ip_address, user_agent, method='token'
+        )
         flash('Avtomatik login qilindi! 🔐', 'info')
         return True
     
@@ -291,10 +318,10 @@ def get_client_info():
     """
     user_agent = request.headers.get('User-Agent', '')[:500]  # Max 500 char
     
-    # IP address (proxy orqali bo'lsa ham)
-    ip_address = request.headers.get('X-Forwarded-For', request.remote_addr)
-    if ip_address:
-        ip_address = ip_address.split(',')[0].strip()
+    # IP address - proxy orqali bo'lsa ProxyFix (TRUSTED_PROXY_HOPS) uni
+    # ishonchli X-Forwarded-For qiymatidan qo'yadi; header'ning o'zi client
+    # qo'lida, shuning uchun to'g'ridan-to'g'ri o'qilmaydi
+    ip_address = request.remote_addr
     
     return user_agent, ip_address
 
@@ -318,14 +345,32 @@ def is_suspicious_login():
 def rate_limit_check():
     """
     Login urinishlarini cheklash (Rate limiting)
+    Bir IP'dan RATE_LIMIT_MAX_ATTEMPTS ta noto'g'ri urinish RATE_LIMIT_WINDOW_MIN
+    daqiqada - hisoblagichlar barcha worker'lar uchun umumiy (security.rate_limiter)
     
     Returns:
         bool: True agar ruxsat etilsa
     """
-    # Bu yerda rate limiting logikasi qo'shiladi
-    # Misol: Bir IP'dan 5 ta login urinishi 15 daqiqada
+    from security import rate_limiter
+    
+    _, ip_address = get_client_info()
+    return rate_limiter.is_allowed(ip_address or 'unknown')
+
+
+def record_login_attempt(success):
+    """
+    Login natijasini rate limiter'ga yozish
+    
+    Args:
+        success: True - hisoblagich tozalanadi, False - urinish qo'shiladi
+    """
+    from security import rate_limiter
     
-    return True
+    _, ip_address = get_client_info()
+    if success:
+        rate_limiter.reset(ip_address or 'unknown')
+    else:
+        rate_limiter.record_attempt(ip_address or 'unknown')
 
 
 # ==========================================
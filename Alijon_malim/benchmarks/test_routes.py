@@ -0,0 +1,102 @@
+"""
+Route benchmark'lari
+
+Har bir o'lchov to'liq HTTP so'rov (test client orqali): auth, database,
+shablon yoki Excel yaratish. O'qish route'lari keshsiz (cold) o'lchanadi.
+"""
+
+import os
+
+import pytest
+
+
+# Har bir benchmark necha marta o'lchanadi
+BENCH_ROUNDS = int(os.environ.get('BENCH_ROUNDS', 10))
+
+
+def run(benchmark, client, url, setup=None, **kwargs):
+    """
+    GET so'rovni BENCH_ROUNDS marta o'lchash
+
+    Returns:
+        Oxirgi javob
+    """
+    def request():
+        response = client.get(url, **kwargs)
+        assert response.status_code == 200, url
+        return response
+
+    return benchmark.pedantic(request, setup=setup, rounds=BENCH_ROUNDS, warmup_rounds=1)
+
+
+def test_dashboard(benchmark, dataset, client, cold):
+    run(benchmark, client, '/dashboard', setup=cold)
+
+
+def test_attendance_page(benchmark, dataset, client, cold):
+    run(benchmark, client,
+        f"/attendance?group_id={dataset['group_id']}&date={dataset['end_date']}", setup=cold)
+
+
+def test_bulk_mark(benchmark, dataset, client):
+    """
+    Butun guruhni belgilash - har bir o'lchovda holatlar almashadi (haqiqiy yozuv)
+    """
+    rounds = iter(range(10 ** 6))
+
+    def payload():
+        flip = next(rounds) % 2
+        return (), {'json': {
+            'date': str(dataset['end_date']),
+            'group_id': dataset['group_id'],
+            'attendances': [
+                {'student_id': student_id,
+                 'status': 'absent' if (student_id + flip) % 7 == 0 else 'present'}
+                for student_id in dataset['student_ids']
+            ]
+        }}
+
+    def mark(json):
+        response = client.post('/attendance/bulk-mark', json=json)
+        assert response.status_code == 200
+        assert response.get_json()['success']
+
+    benchmark.pedantic(mark, setup=payload, rounds=BENCH_ROUNDS, warmup_rounds=1)
+
+
+def test_daily_report(benchmark, dataset, client, cold):
+    run(benchmark, client, f"/reports/view?date={dataset['end_date']}", setup=cold)
+
+
+@pytest.mark.parametrize('kind', ['group', 'daily', 'range'])
+def test_excel_export(kind, benchmark, dataset, client, cold):
+    urls = {
+        'group': f"/reports/export?date={dataset['end_date']}&group_id={dataset['group_id']}",
+        'daily': f"/reports/export?date={dataset['end_date']}",
+        'range': (
+            f"/reports/export-range?start_date={dataset['start_date']}"
+            f"&end_date={dataset['end_date']}&group_id={dataset['group_id']}"
+        ),
+    }
+    run(benchmark, client, urls[kind], setup=cold)
+
+
+def test_auto_login(benchmark, app, dataset):
+    """
+    Session'siz so'rov "Remember Me" cookie bilan (token tekshiruvi + login)
+    """
+    from auth import REMEMBER_ME_COOKIE_NAME
+    from models import AdminToken
+
+    selector, validator, _ = AdminToken.generate_token(user_agent='benchmark', ip_address='127.0.0.1')
+
+    def fresh_client():
+        client = app.test_client()
+        client.set_cookie(REMEMBER_ME_COOKIE_NAME, f'{selector}:{validator}')
+        return (client,), {}
+
+    def request(client):
+        response = client.get('/reports')
+        assert response.status_code == 200
+
+    benchmark.pedantic(request, setup=fresh_client, rounds=BENCH_ROUNDS, warmup_rounds=1)
@@ -0,0 +1,187 @@
+"""
+Bulk Attendance Module
+Ko'p talabaning davomatini set-based (to'plam) usulida saqlash
+
+Guruh qanchalik katta bo'lmasin, so'rovlar soni o'zgarmaydi:
+    1. Bitta SELECT - talabalar mavjud/aktivligi va joriy statuslari
+    2. Har CHUNK_SIZE qator uchun bitta INSERT ... ON CONFLICT DO UPDATE
+    3. Tegishli guruhlarning kunlik rollup'lari (lock + refresh)
+"""
+
+from models import db, Student, Attendance, dialect_insert
+from rollups import lock_rollups, refresh_rollups
+
+
+# Bitta INSERT'dagi maksimal qatorlar (SQLite parametr limitidan ancha past)
+CHUNK_SIZE = 200
+
+VALID_STATUSES = ('present', 'absent')
+
+# Har bir qator natijasi
+OUTCOME_CREATED = 'created'
+OUTCOME_UPDATED = 'updated'
+OUTCOME_UNCHANGED = 'unchanged'
+OUTCOME_INVALID = 'invalid'
+OUTCOME_NOT_FOUND = 'not_found'
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def normalize_items(items):
+    """
+    Payload'ni tekshirish va takroriy talabalarni birlashtirish
+    (bir talaba bir necha marta kelsa - oxirgisi hisoblanadi)
+
+    Args:
+        items: [{'student_id': ..., 'status': ...}, ...]
+
+    Returns:
+        tuple: (marks, invalid)
+            marks - {student_id: status} (har talaba oxirgi kelgan o'rni tartibida)
+            invalid - noto'g'ri qatorlar natijalari
+    """
+    marks = {}
+    invalid = []
+
+    for item in items or []:
+        if not isinstance(item, dict):
+            invalid.append({'student_id': None, 'status': None, 'outcome': OUTCOME_INVALID})
+            continue
+
+        status = item.get('status')
+        try:
+            student_id = int(item.get('student_id'))
+        except (TypeError, ValueError):
+            student_id = None
+
+        if not student_id or status not in VALID_STATUSES:
+            invalid.append({
+                'student_id': item.get('student_id'),
+                'status': status,
+                'outcome': OUTCOME_INVALID
+            })
+            continue
+
+        # Avvalgi qiymat o'chiriladi - talaba oxirgi kelgan o'ringa ko'chadi
+        marks.pop(student_id, None)
+        marks[student_id] = status
+
+    return marks, invalid
+
+
+def load_current_statuses(student_ids, date):
+    """
+    Aktiv talabalarni, guruhini va o'sha sanadagi statusini bitta so'rovda olish
+
+    Returns:
+        dict: {student_id: (status yoki None, group_id)} - faqat mavjud va aktiv talabalar
+    """
+    current = {}
+
+    for chunk in _chunks(list(student_ids), CHUNK_SIZE * 4):
+        rows = db.session.query(
+            Student.id, Attendance.status, Student.group_id
+        ).outerjoin(
+            Attendance,
+            db.and_(
+                Attendance.student_id == Student.id,
+                Attendance.date == date
+            )
+        ).filter(
+            Student.id.in_(chunk),
+            Student.active == True
+        ).all()
+
+        for student_id, status, group_id in rows:
+            current[student_id] = (status, group_id)
+
+    return current
+
+
+def upsert_attendance(rows, group_ids):
+    """
+    Qatorlarni INSERT ... ON CONFLICT (student_id, date) DO UPDATE bilan yozish
+    va tegishli kunlik rollup'larni shu tranzaksiyada yangilash
+
+    Args:
+        rows: [{'student_id', 'date', 'status'}, ...]
+        group_ids: Qatorlardagi talabalar guruhlari
+    """
+    dates = sorted({row['date'] for row in rows})
+    table = Attendance.__table__
+
+    if dialect_insert(table) is None:
+        # Boshqa dialektlar uchun ORM orqali (sekinroq, lekin to'g'ri);
+        # rollup'lar mark_attendance ichida yangilanadi
+        for row in rows:
+            Attendance.mark_attendance(row['student_id'], row['date'], row['status'])
+        db.session.flush()
+        return
+
+    # Avval rollup qatorlari qulflanadi - parallel belgilovchilar ketma-ket sanaydi
+    for date in dates:
+        lock_rollups(group_ids, date)
+
+    for chunk in _chunks(rows, CHUNK_SIZE):
+        stmt = dialect_insert(table).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.student_id, table.c.date],
+            set_={'status': stmt.excluded.status}
+        )
+        db.session.execute(stmt)
+
+    for date in dates:
+        refresh_rollups(group_ids, date)
+
+
+def bulk_mark_attendance(date, items):
+    """
+    Ko'p talabaning davomatini bitta tranzaksiyada belgilash
+    Commit chaqiruvchi tomonidan qilinadi (Attendance.mark_attendance kabi)
+
+    Args:
+        date: Sana
+        items: [{'student_id': ..., 'status': 'present'|'absent'}, ...]
+
+    Returns:
+        dict: {
+            'saved': yozilgan qatorlar soni,
+            'counts': {outcome: soni},
+            'results': [{'student_id', 'status', 'outcome'}, ...]
+        }
+    """
+    marks, results = normalize_items(items)
+    current = load_current_statuses(marks.keys(), date) if marks else {}
+
+    rows = []
+    group_ids = set()
+    for student_id, status in marks.items():
+        if student_id not in current:
+            outcome = OUTCOME_NOT_FOUND
+        elif current[student_id][0] is None:
+            outcome = OUTCOME_CREATED
+        elif current[student_id][0] != status:
+            outcome = OUTCOME_UPDATED
+        else:
+            outcome = OUTCOME_UNCHANGED
+
+        if outcome in (OUTCOME_CREATED, OUTCOME_UPDATED):
+            rows.append({'student_id': student_id, 'date': date, 'status': status})
+            group_ids.add(current[student_id][1])
+
+        results.append({'student_id': student_id, 'status': status, 'outcome': outcome})
+
+    if rows:
+        upsert_attendance(rows, group_ids)
+
+    counts = {}
+    for result in results:
+        counts[result['outcome']] = counts.get(result['outcome'], 0) + 1
+
+    return {
+        'saved': len(rows),
+        'counts': counts,
+        'results': results
+    }
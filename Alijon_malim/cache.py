@@ -0,0 +1,391 @@
+"""
+Cache Module
+Jarayon ichidagi (in-process) keshlar - davomat ro'yxati snapshotlari
+va diskdagi Excel export keshi
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from scheduler import scheduler
+
+
+# Gunicorn worker'lari bir-birining keshini bekor qilishi uchun umumiy papka
+DEFAULT_CACHE_DIR = os.environ.get(
+    'CACHE_DIR',
+    os.path.join(tempfile.gettempdir(), 'davomat_cache')
+)
+
+
+class SnapshotCache:
+    """
+    Kalit bo'yicha snapshot saqlovchi kesh (TTL bilan)
+
+    Har bir worker o'z xotirasida saqlaydi, lekin bekor qilish (invalidation)
+    umumiy papkadagi "generation" fayllari orqali barcha worker'larga yetadi:
+    yozuvdan keyin fayl o'zgaradi, boshqa worker esa o'qishda bitta
+    os.stat() bilan buni sezadi - database'ga murojaat qilinmaydi.
+    """
+
+    GLOBAL_SCOPE = '_all'
+
+    def __init__(self, namespace, ttl_seconds=300, max_entries=512, generation_namespace=None):
+        """
+        Args:
+            namespace: Kesh nomi
+            ttl_seconds: Snapshot yashash muddati (soniyada)
+            max_entries: Xotirada saqlanadigan maksimal snapshotlar soni
+            generation_namespace: Generation fayllari prefiksi - boshqa kesh
+                                  nomi berilsa, uning bekor qilinishi shu
+                                  keshga ham ta'sir qiladi (standart: namespace)
+        """
+        self.namespace = namespace
+        self.generation_namespace = generation_namespace or namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.cache_dir = DEFAULT_CACHE_DIR
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def configure(self, cache_dir=None, ttl_seconds=None):
+        """
+        Sozlamalarni app config'dan olish
+        """
+        with self.lock:
+            if cache_dir:
+                self.cache_dir = cache_dir
+            if ttl_seconds is not None:
+                self.ttl_seconds = ttl_seconds
+            self.entries.clear()
+
+    def _generation_path(self, scope):
+        return os.path.join(self.cache_dir, f'{self.generation_namespace}-{scope}.gen')
+
+    def _generation(self, scope):
+        """
+        Scope'ning joriy generation'i (fayl mtime + hajmi)
+        """
+        try:
+            stat = os.stat(self._generation_path(scope))
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _bump(self, scope):
+        """
+        Scope generation'ini o'zgartirish - barcha worker'larda eskiradi
+        """
+        path = self._generation_path(scope)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Fayl cheksiz o'smasligi uchun vaqti-vaqti bilan qisqartiriladi
+            mode = 'w' if os.path.exists(path) and os.path.getsize(path) > 4096 else 'a'
+            with open(path, mode) as f:
+                f.write('.')
+        except OSError:
+            # Papkaga yozib bo'lmasa hech bo'lmaganda shu worker tozalanadi
+            with self.lock:
+                self.entries.clear()
+
+    @staticmethod
+    def _scope_for(key):
+        """
+        Kalitning scope'i - kalit tuple bo'lsa oxirgi elementi (sana)
+        """
+        scope = key[-1] if isinstance(key, tuple) else key
+        if hasattr(scope, 'isoformat'):
+            scope = scope.isoformat()
+        return str(scope)
+
+    def get(self, key):
+        """
+        Snapshotni olish
+
+        Returns:
+            Saqlangan qiymat yoki None (topilmasa / eskirgan bo'lsa)
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        value, generations, stored_at = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            self.invalidate(key)
+            return None
+
+        if generations != self._current_generations(key):
+            self.invalidate(key)
+            return None
+
+        return value
+
+    def set(self, key, value, generations=None):
+        """
+        Snapshotni saqlash
+
+        Args:
+            generations: Yuklashdan oldin olingan generation (ixtiyoriy)
+        """
+        if generations is None:
+            generations = self._current_generations(key)
+        with self.lock:
+            if len(self.entries) >= self.max_entries and key not in self.entries:
+                # Eng eski yozuvni chiqarib tashlash
+                oldest_key = min(self.entries, key=lambda k: self.entries[k][2])
+                del self.entries[oldest_key]
+            self.entries[key] = (value, generations, time.monotonic())
+
+    def get_or_load(self, key, loader):
+        """
+        Keshdan olish, bo'lmasa loader() orqali yuklab saqlash
+        """
+        value = self.get(key)
+        if value is None:
+            # Generation yuklashdan OLDIN olinadi: yuklash paytida kelgan
+            # yozuv keyingi o'qishda snapshotni eskirtiradi
+            generations = self._current_generations(key)
+            value = loader()
+            self.set(key, value, generations)
+        return value
+
+    def _current_generations(self, key):
+        return (
+            self._generation(self._scope_for(key)),
+            self._generation(self.GLOBAL_SCOPE)
+        )
+
+    def invalidate(self, key):
+        """
+        Faqat shu worker'dagi bitta snapshotni o'chirish
+        """
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def invalidate_scope(self, scope):
+        """
+        Scope (masalan sana) bo'yicha barcha worker'larda bekor qilish
+        """
+        if hasattr(scope, 'isoformat'):
+            scope = scope.isoformat()
+        self._bump(str(scope))
+
+    def invalidate_all(self):
+        """
+        Barcha snapshotlarni barcha worker'larda bekor qilish
+        """
+        with self.lock:
+            self.entries.clear()
+        self._bump(self.GLOBAL_SCOPE)
+
+    def global_generation(self):
+        """
+        Umumiy generation - invalidate_all() chaqirilganda o'zgaradi
+        """
+        return self._generation(self.GLOBAL_SCOPE)
+
+    def prune(self):
+        """
+        Muddati o'tgan snapshotlarni tozalash
+
+        Returns:
+            int: O'chirilgan snapshotlar soni
+        """
+        now = time.monotonic()
+        with self.lock:
+            expired = [
+                key for key, (_, _, stored_at) in self.entries.items()
+                if now - stored_at > self.ttl_seconds
+            ]
+            for key in expired:
+                del self.entries[key]
+        return len(expired)
+
+
+class ExportCache:
+    """
+    Tayyor Excel fayllari uchun diskdagi kesh (hajm chegarali LRU)
+
+    Fayl nomi - (hisobot turi, sana oralig'i, guruh, ma'lumot versiyasi)
+    kalitining sha256 xeshi; shu xesh javobning ETag'i ham bo'ladi.
+    Ma'lumot versiyasi o'zgarsa kalit ham o'zgaradi - eski fayl boshqa
+    so'ralmaydi va LRU orqali o'chib ketadi. Papka barcha worker'lar
+    uchun umumiy.
+    """
+
+    SUFFIX = '.xlsx'
+
+    def __init__(self, cache_dir=None, max_bytes=200 * 1024 * 1024):
+        """
+        Args:
+            cache_dir: Fayllar papkasi
+            max_bytes: Papkaning maksimal umumiy hajmi
+        """
+        self.cache_dir = cache_dir or os.path.join(DEFAULT_CACHE_DIR, 'exports')
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+    def configure(self, cache_dir=None, max_bytes=None):
+        """
+        Sozlamalarni app config'dan olish
+        """
+        if cache_dir:
+            self.cache_dir = cache_dir
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(kind, start_date, end_date, group_id, version):
+        """
+        Kesh kaliti (va ETag)
+
+        Returns:
+            str: sha256 hex
+        """
+        parts = [kind, start_date, end_date, group_id or 'all', version]
+        raw = '|'.join(
+            part.isoformat() if hasattr(part, 'isoformat') else repr(part)
+            for part in parts
+        )
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + self.SUFFIX)
+
+    def open(self, key):
+        """
+        Keshdagi faylni ochish (LRU uchun vaqti yangilanadi)
+
+        Returns:
+            Ochilgan fayl yoki None
+        """
+        path = self._path(key)
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return f
+
+    def put(self, key, fileobj):
+        """
+        Faylni keshga yozish (vaqtinchalik fayl + os.replace - atomik)
+
+        Args:
+            fileobj: Boshidan o'qiladigan fayl obyekti
+
+        Returns:
+            Keshdagi ochilgan fayl yoki None (yozib bo'lmasa)
+        """
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as out:
+                shutil.copyfileobj(fileobj, out)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            return None
+
+        self.evict()
+        return self.open(key)
+
+    def evict(self):
+        """
+        Umumiy hajm max_bytes'dan oshsa eng kam ishlatilgan fayllarni o'chirish
+
+        Returns:
+            int: O'chirilgan fayllar soni
+        """
+        with self.lock:
+            try:
+                names = os.listdir(self.cache_dir)
+            except OSError:
+                return 0
+
+            files = []
+            total = 0
+            for name in names:
+                if not name.endswith(self.SUFFIX):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(self.cache_dir, name))
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, name))
+                total += stat.st_size
+
+            removed = 0
+            for _, size, name in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+
+            return removed
+
+    def clear(self):
+        """
+        Barcha keshlangan fayllarni o'chirish
+        """
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+# Davomat sahifasi uchun (guruh, sana) snapshotlari
+roster_cache = SnapshotCache('roster', ttl_seconds=300)
+
+# Dashboard statistikasi - bir necha soniyalik; roster generation'larini
+# ishlatadi, shuning uchun davomat/talaba yozuvlari uni ham bekor qiladi
+dashboard_cache = SnapshotCache('dashboard', ttl_seconds=5, max_entries=8,
+                                generation_namespace='roster')
+
+# Tayyor Excel hisobotlari
+export_cache = ExportCache()
+
+
+def prune_snapshots():
+    """
+    Barcha snapshot keshlardan muddati o'tganlarni tozalash
+
+    Returns:
+        int: O'chirilgan snapshotlar soni
+    """
+    return roster_cache.prune() + dashboard_cache.prune()
+
+
+def init_cache(app):
+    """
+    Keshlarni app sozlamalari bilan ishga tushirish
+
+    Args:
+        app: Flask application
+    """
+    cache_dir = app.config.get('CACHE_DIR', DEFAULT_CACHE_DIR)
+
+    roster_cache.configure(
+        cache_dir=cache_dir,
+        ttl_seconds=app.config.get('ROSTER_CACHE_TTL', 300)
+    )
+    dashboard_cache.configure(
+        cache_dir=cache_dir,
+        ttl_seconds=app.config.get('DASHBOARD_CACHE_TTL', 5)
+    )
+    export_cache.configure(
+        cache_dir=app.config.get('EXPORT_CACHE_DIR', os.path.join(cache_dir, 'exports')),
+        max_bytes=app.config.get('EXPORT_CACHE_MAX_BYTES', 200 * 1024 * 1024)
+    )
+
+    # Muddati o'tgan snapshotlar (har bir worker xotirasi) va disk keshi hajmi
+    prune_seconds = app.config.get('CACHE_PRUNE_INTERVAL_MIN', 10) * 60
+    scheduler.add_job('cache-prune', prune_snapshots, prune_seconds, leader_only=False)
+    scheduler.add_job('export-cache-evict', export_cache.evict, prune_seconds)
@@ -0,0 +1,352 @@
+"""
+Database Engine Module
+Muhit (environment) bo'yicha engine profillari, SQLite pragmalari va
+ulanishlar pool'i statistikasi
+
+Shu fayl Alijon_malim va Alijon_2 ilovalarida bir xil (tests/test_shared_modules.py tekshiradi).
+
+Profil SQLALCHEMY_ENGINE_OPTIONS'ga aylanadi:
+
+    PostgreSQL  - pool_size, max_overflow, pool_timeout, pool_pre_ping,
+                  pool_recycle va statement_timeout (har bir ulanishda)
+    SQLite      - WAL, synchronous, busy_timeout, mmap_size, cache_size
+                  pragmalari har bir yangi ulanishda; ulanishlar pool'da
+                  qayta ishlatiladi (pragmalar har so'rovda takrorlanmaydi)
+
+Har bir qiymatni environment o'zgaruvchisi bilan almashtirish mumkin
+(DB_POOL_SIZE, SQLITE_BUSY_TIMEOUT_MS, ...). Pool statistikasi: GET /health
+"""
+
+import os
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+
+PROFILES = {
+    'production': {
+        'pool_size': 5,
+        'max_overflow': 10,
+        'pool_timeout': 30,
+        'pool_recycle': 1800,              # Render idle ulanishlarni uzadi
+        'statement_timeout_ms': 30000,
+        'sqlite_synchronous': 'NORMAL',
+        'sqlite_busy_timeout_ms': 5000,
+        'sqlite_mmap_size_mb': 256,
+        'sqlite_cache_size_mb': 64,
+    },
+    'development': {
+        'pool_size': 2,
+        'max_overflow': 5,
+        'pool_timeout': 10,
+        'pool_recycle': 1800,
+        'statement_timeout_ms': 60000,
+        'sqlite_synchronous': 'NORMAL',
+        'sqlite_busy_timeout_ms': 5000,
+        'sqlite_mmap_size_mb': 64,
+        'sqlite_cache_size_mb': 16,
+    },
+    'testing': {
+        'pool_size': 2,
+        'max_overflow': 5,
+        'pool_timeout': 10,
+        'pool_recycle': 1800,
+        'statement_timeout_ms': 10000,
+        'sqlite_synchronous': 'OFF',       # vaqtinchalik database - tezlik muhimroq
+        'sqlite_busy_timeout_ms': 5000,
+        'sqlite_mmap_size_mb': 0,
+        'sqlite_cache_size_mb': 8,
+    },
+}
+
+# Profil kaliti -> environment o'zgaruvchisi
+ENV_OVERRIDES = {
+    'pool_size': 'DB_POOL_SIZE',
+    'max_overflow': 'DB_MAX_OVERFLOW',
+    'pool_timeout': 'DB_POOL_TIMEOUT',
+    'pool_recycle': 'DB_POOL_RECYCLE',
+    'statement_timeout_ms': 'DB_STATEMENT_TIMEOUT_MS',
+    'sqlite_synchronous': 'SQLITE_SYNCHRONOUS',
+    'sqlite_busy_timeout_ms': 'SQLITE_BUSY_TIMEOUT_MS',
+    'sqlite_mmap_size_mb': 'SQLITE_MMAP_SIZE_MB',
+    'sqlite_cache_size_mb': 'SQLITE_CACHE_SIZE_MB',
+}
+
+SQLITE_SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+
+def normalize_database_url(url):
+    """
+    Render/Heroku 'postgres://' URL'ini SQLAlchemy tushunadigan
+    'postgresql://' ga almashtirish
+    """
+    if url and url.startswith('postgres://'):
+        return 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def get_profile(env):
+    """
+    Muhit profili (environment o'zgaruvchilari bilan)
+
+    Args:
+        env: 'production', 'development' yoki 'testing'
+
+    Returns:
+        dict: Profil sozlamalari
+    """
+    profile = dict(PROFILES.get(env, PROFILES['development']))
+    for key, var in ENV_OVERRIDES.items():
+        value = os.environ.get(var)
+        if value is None or value == '':
+            continue
+        profile[key] = value.upper() if key == 'sqlite_synchronous' else int(value)
+
+    if profile['sqlite_synchronous'] not in SQLITE_SYNCHRONOUS_MODES:
+        raise ValueError(f"SQLITE_SYNCHRONOUS noto'g'ri: {profile['sqlite_synchronous']}")
+    return profile
+
+
+def _is_memory_sqlite(url):
+    return url in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in url
+
+
+def engine_options(url, profile):
+    """
+    Profil -> SQLALCHEMY_ENGINE_OPTIONS
+
+    Args:
+        url: Database URL
+        profile: get_profile() natijasi
+
+    Returns:
+        dict
+    """
+    if url.startswith('postgresql'):
+        connect_args = {'connect_timeout': 10}
+        if profile['statement_timeout_ms']:
+            connect_args['options'] = f"-c statement_timeout={profile['statement_timeout_ms']}"
+        return {
+            'poolclass': TimedQueuePool,
+            'pool_size': profile['pool_size'],
+            'max_overflow': profile['max_overflow'],
+            'pool_timeout': profile['pool_timeout'],
+            'pool_recycle': profile['pool_recycle'],
+            'pool_pre_ping': True,
+            'connect_args': connect_args,
+        }
+
+    if url.startswith('sqlite'):
+        if _is_memory_sqlite(url):
+            # In-memory database - SQLAlchemy standart pool'i (bitta ulanish)
+            return {}
+        return {
+            'poolclass': TimedQueuePool,
+            'pool_size': profile['pool_size'],
+            'max_overflow': profile['max_overflow'],
+            'pool_timeout': profile['pool_timeout'],
+            'connect_args': {
+                'timeout': profile['sqlite_busy_timeout_ms'] / 1000,
+                'check_same_thread': False,
+            },
+        }
+
+    return {'pool_pre_ping': True, 'pool_recycle': profile['pool_recycle']}
+
+
+class PoolStats:
+    """
+    Ulanishlar pool'i hisoblagichlari (worker bo'yicha)
+    """
+
+    def __init__(self):
+        self.engine = None
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.invalidations = 0
+            self.timeouts = 0
+            self.waits = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+            self.held_seconds_total = 0.0
+            self.held_seconds_max = 0.0
+
+    def record_wait(self, seconds, timed_out=False):
+        with self.lock:
+            self.waits += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def on_connect(self, dbapi_connection, connection_record):
+        with self.lock:
+            self.connects += 1
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        connection_record.info['checked_out_at'] = time.perf_counter()
+        with self.lock:
+            self.checkouts += 1
+
+    def on_checkin(self, dbapi_connection, connection_record):
+        started = connection_record.info.pop('checked_out_at', None)
+        if started is None:
+            return
+        held = time.perf_counter() - started
+        with self.lock:
+            self.held_seconds_total += held
+            self.held_seconds_max = max(self.held_seconds_max, held)
+
+    def on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self.lock:
+            self.invalidations += 1
+
+    def snapshot(self, pool=None):
+        """
+        Hisoblagichlar va pool'ning joriy holati
+
+        Returns:
+            dict
+        """
+        with self.lock:
+            data = {
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'invalidations': self.invalidations,
+                'timeouts': self.timeouts,
+                'wait_ms_avg': round(self.wait_seconds_total / self.waits * 1000, 3) if self.waits else 0,
+                'wait_ms_max': round(self.wait_seconds_max * 1000, 3),
+                'held_ms_avg': round(self.held_seconds_total / self.checkouts * 1000, 3) if self.checkouts else 0,
+                'held_ms_max': round(self.held_seconds_max * 1000, 3),
+            }
+
+        if isinstance(pool, QueuePool):
+            data.update({
+                'size': pool.size(),
+                'checked_in': pool.checkedin(),
+                'checked_out': pool.checkedout(),
+                'overflow': pool.overflow(),
+            })
+        elif pool is not None:
+            data['pool'] = type(pool).__name__
+        return data
+
+
+    def metric_samples(self):
+        """
+        /metrics uchun qiymatlar (metrics.add_collector)
+        """
+        data = self.snapshot(self.engine.pool if self.engine is not None else None)
+        samples = [
+            ('db_pool_connects_total', 'counter', 'Yangi database ulanishlari', {}, data['connects']),
+            ('db_pool_checkouts_total', 'counter', 'Pool\'dan olingan ulanishlar', {}, data['checkouts']),
+            ('db_pool_invalidations_total', 'counter', 'Yaroqsiz deb topilgan ulanishlar', {}, data['invalidations']),
+            ('db_pool_timeouts_total', 'counter', 'Ulanish kutishda timeout', {}, data['timeouts']),
+            ('db_pool_wait_seconds_total', 'counter', 'Ulanish kutishga ketgan vaqt', {}, self.wait_seconds_total),
+        ]
+        if 'checked_out' in data:
+            samples.append(('db_pool_checked_out', 'gauge', 'Hozir band ulanishlar', {}, data['checked_out']))
+        return samples
+
+
+# Shu worker'dagi engine pool'i statistikasi
+pool_stats = PoolStats()
+
+
+class TimedQueuePool(QueuePool):
+    """
+    Ulanish olish uchun kutish vaqtini o'lchaydigan QueuePool
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            pool_stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_stats.record_wait(time.perf_counter() - start)
+        return connection
+
+
+def _sqlite_pragmas(profile, memory):
+    pragmas = [
+        f"PRAGMA synchronous={profile['sqlite_synchronous']}",
+        f"PRAGMA busy_timeout={int(profile['sqlite_busy_timeout_ms'])}",
+        f"PRAGMA cache_size={-int(profile['sqlite_cache_size_mb']) * 1024}",
+    ]
+    if not memory:
+        pragmas.insert(0, 'PRAGMA journal_mode=WAL')
+        pragmas.append(f"PRAGMA mmap_size={int(profile['sqlite_mmap_size_mb']) * 1024 * 1024}")
+    return pragmas
+
+
+def init_database(app, db):
+    """
+    Engine'ga SQLite pragmalari va pool statistikasi listener'larini ulash
+    (db.init_app'dan keyin, birinchi ulanishdan oldin)
+
+    Args:
+        app: Flask application
+        db: SQLAlchemy obyekti
+    """
+    profile = app.config.get('DB_PROFILE') or get_profile('development')
+
+    with app.app_context():
+        engine = db.engine
+    pool_stats.engine = engine
+
+    if engine.dialect.name == 'sqlite':
+        pragmas = _sqlite_pragmas(profile, _is_memory_sqlite(str(engine.url)))
+
+        @event.listens_for(engine, 'connect')
+        def apply_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+            finally:
+                cursor.close()
+
+    event.listen(engine, 'connect', pool_stats.on_connect)
+    event.listen(engine, 'checkout', pool_stats.on_checkout)
+    event.listen(engine, 'checkin', pool_stats.on_checkin)
+    event.listen(engine, 'invalidate', pool_stats.on_invalidate)
+
+
+def health_check(db):
+    """
+    Database holati (SELECT 1 kechikishi) va pool statistikasi
+    (app context ichida chaqiriladi)
+
+    Returns:
+        tuple: (dict, bool) - javob va database ishlayaptimi
+    """
+    from sqlalchemy import text
+
+    engine = db.engine
+    start = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+        ok, error = True, None
+    except Exception as e:
+        ok, error = False, str(e)
+
+    return {
+        'status': 'ok' if ok else 'error',
+        'database': {
+            'dialect': engine.dialect.name,
+            'ok': ok,
+            'latency_ms': round((time.perf_counter() - start) * 1000, 3),
+            'error': error,
+        },
+        'pool': pool_stats.snapshot(engine.pool),
+    }, ok
@@ -1,340 +1,456 @@
 """
 Excel Export Module
 Attendance hisobotlarini Excel formatga export qilish
+
+Ikki rejim:
+    AttendanceExcelExporter()               - oddiy, natija BytesIO'da
+    AttendanceExcelExporter(streaming=True) - write-only, natija vaqtinchalik faylda
+
+Streaming rejimda qatorlar kelishi bilan yoziladi (guruhlar generator'dan
+o'qilishi mumkin), workbook xotirada yig'ilmaydi va fayl to'g'ridan-to'g'ri
+send_file'ga beriladi. Stillar ikkala rejimda ham bir marta NamedStyle
+sifatida ro'yxatdan o'tkaziladi - har bir cell uchun yangi obyekt yaratilmaydi.
 """
 
+import tempfile
+from copy import copy
+from io import BytesIO
+
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
-from io import BytesIO
-from datetime import datetime
+
+
+# Streaming rejimda shu hajmgacha xotirada, keyin diskka
+SPOOL_MAX_SIZE = 2 * 1024 * 1024
+
+# Ranglar
+COLORS = {
+    'header': 'FF4472C4',       # Ko'k
+    'present': 'FF70AD47',      # Yashil
+    'absent': 'FFFF0000',       # Qizil
+    'total': 'FFFFC000',        # Sariq
+    'group_header': 'FF5B9BD5', # Och ko'k
+    'unmarked': 'FFCCCCCC',     # Kulrang
+    'stat': 'FFE7E6E6'          # Och kulrang
+}
+
+# Fontlar
+FONTS = {
+    'header': Font(name='Arial', size=14, bold=True, color='FFFFFF'),
+    'subheader': Font(name='Arial', size=12, bold=True, color='FFFFFF'),
+    'title': Font(name='Arial', size=16, bold=True),
+    'normal': Font(name='Arial', size=11),
+    'bold': Font(name='Arial', size=11, bold=True),
+    'status': Font(name='Arial', size=11, bold=True, color='FFFFFF')
+}
+
+_thin = Side(style='thin')
+THIN_BORDER = Border(left=_thin, right=_thin, top=_thin, bottom=_thin)
+
+_center = Alignment(horizontal='center', vertical='center')
+_left = Alignment(horizontal='left')
+
+
+def _fill(color):
+    return PatternFill(start_color=color, end_color=color, fill_type='solid')
+
+
+def _build_named_styles():
+    """
+    Workbook'da bir marta ro'yxatdan o'tkaziladigan stillar
+    """
+    return [
+        NamedStyle(name='title', font=FONTS['title'], alignment=_center),
+        NamedStyle(name='bold_center', font=FONTS['bold'], alignment=_center),
+        NamedStyle(name='summary', font=FONTS['bold'], fill=_fill(COLORS['total']),
+                   border=THIN_BORDER, alignment=_center),
+        NamedStyle(name='group_header', font=FONTS['subheader'],
+                   fill=_fill(COLORS['group_header']), border=THIN_BORDER, alignment=_left),
+        NamedStyle(name='table_header', font=FONTS['header'], fill=_fill(COLORS['header']),
+                   border=THIN_BORDER, alignment=_center),
+        NamedStyle(name='cell', font=FONTS['normal'], border=THIN_BORDER),
+        NamedStyle(name='cell_center', font=FONTS['normal'], border=THIN_BORDER,
+                   alignment=_center),
+        NamedStyle(name='status_present', font=FONTS['status'], fill=_fill(COLORS['present']),
+                   border=THIN_BORDER, alignment=_center),
+        NamedStyle(name='status_absent', font=FONTS['status'], fill=_fill(COLORS['absent']),
+                   border=THIN_BORDER, alignment=_center),
+        NamedStyle(name='status_unmarked', font=FONTS['normal'], fill=_fill(COLORS['unmarked']),
+                   border=THIN_BORDER, alignment=_center),
+        NamedStyle(name='stat', font=FONTS['bold'], fill=_fill(COLORS['stat']),
+                   border=THIN_BORDER),
+        NamedStyle(name='mark_present', font=FONTS['status'], fill=_fill(COLORS['present']),
+                   border=THIN_BORDER, alignment=_center),
+        NamedStyle(name='mark_absent', font=FONTS['status'], fill=_fill(COLORS['absent']),
+                   border=THIN_BORDER, alignment=_center),
+    ]
+
+
+STATUS_CELLS = {
+    'present': ("✅ Keldi", 'status_present'),
+    'absent': ("❌ Kelmadi", 'status_absent'),
+    None: ("⏳ Belgilanmagan", 'status_unmarked')
+}
+
+
+# Matritsa kodlari -> (qiymat, stil); reports.MARK_* bilan mos
+MATRIX_CELLS = {
+    0: ("", 'cell_center'),
+    1: ("✓", 'mark_present'),
+    2: ("✗", 'mark_absent')
+}
+
+
+def _percentage(present, total):
+    return (present / total * 100) if total > 0 else 0
 
 
 class AttendanceExcelExporter:
     """
     Davomat hisobotlarini Excel'ga export qilish
     """
-    
-    def __init__(self):
-        self.wb = Workbook()
-        self.ws = self.wb.active
-        
-        # Ranglar
-        self.colors = {
-            'header': 'FF4472C4',      # Ko'k
-            'present': 'FF70AD47',     # Yashil
-            'absent': 'FFFF0000',      # Qizil
-            'total': 'FFFFC000',       # Sariq
-            'group_header': 'FF5B9BD5' # Och ko'k
-        }
-        
-        # Fontlar
-        self.fonts = {
-            'header': Font(name='Arial', size=14, bold=True, color='FFFFFF'),
-            'subheader': Font(name='Arial', size=12, bold=True, color='FFFFFF'),
-            'title': Font(name='Arial', size=16, bold=True),
-            'normal': Font(name='Arial', size=11),
-            'bold': Font(name='Arial', size=11, bold=True)
-        }
-    
-    def _apply_border(self, cell):
+
+    def __init__(self, streaming=False):
+        self.streaming = streaming
+        self.wb = Workbook(write_only=streaming)
+
+        if streaming:
+            self.ws = self.wb.create_sheet()
+        else:
+            self.ws = self.wb.active
+
+        for style in _build_named_styles():
+            self.wb.add_named_style(style)
+
+        self.current_row = 0
+        # Stil nomi -> tayyor StyleArray (NamedStyle qidiruvi har cell uchun takrorlanmaydi)
+        self._style_cache = {}
+
+    # ==========================================
+    # YORDAMCHI METODLAR
+    # ==========================================
+
+    def _cell(self, value, style='cell'):
+        """
+        Stil nomi bilan cell (ikkala rejimda ham ws.append() ga beriladi)
+        """
+        cell = WriteOnlyCell(self.ws, value=value)
+        style_array = self._style_cache.get(style)
+        if style_array is None:
+            cell.style = style
+            self._style_cache[style] = copy(cell._style)
+        else:
+            cell._style = copy(style_array)
+        return cell
+
+    def _append(self, cells=()):
+        """
+        Keyingi qatorni yozish
+
+        Returns:
+            int: Yozilgan qator raqami
+        """
+        self.ws.append(list(cells))
+        self.current_row += 1
+        return self.current_row
+
+    def _merge(self, first_col, last_col, row):
+        """
+        Qatordagi ustunlarni birlashtirish
+        """
+        cell_range = f'{get_column_letter(first_col)}{row}:{get_column_letter(last_col)}{row}'
+        if self.streaming:
+            # Write-only sheet'da merge faqat ro'yxatga yoziladi
+            self.ws.merged_cells.add(cell_range)
+        else:
+            self.ws.merge_cells(cell_range)
+
+    def _set_column_widths(self, widths):
         """
-        Cell'ga border qo'shish
+        Ustun kengliklarini sozlash
+        (streaming rejimda birinchi qatordan OLDIN chaqirilishi shart)
         """
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        cell.border = thin_border
-    
-    def _set_column_width(self, column, width):
+        for column, width in enumerate(widths, start=1):
+            self.ws.column_dimensions[get_column_letter(column)].width = width
+
+    def _status_cell(self, status):
+        value, style = STATUS_CELLS.get(status, STATUS_CELLS[None])
+        return self._cell(value, style)
+
+    def _save(self):
         """
-        Ustun kengligini sozlash
+        Workbook'ni saqlash
+
+        Returns:
+            BytesIO yoki vaqtinchalik fayl (boshiga qaytarilgan)
         """
-        self.ws.column_dimensions[get_column_letter(column)].width = width
-    
-    def export_daily_report(self, date, groups_data):
+        if self.streaming:
+            output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, suffix='.xlsx')
+        else:
+            output = BytesIO()
+
+        self.wb.save(output)
+        output.seek(0)
+        return output
+
+    # ==========================================
+    # HISOBOTLAR
+    # ==========================================
+
+    def export_daily_report(self, date, groups_data, summary=None):
         """
         Kunlik hisobot - barcha guruhlar
-        
+
         Args:
             date: Hisobot sanasi
-            groups_data: Guruhlar ma'lumotlari
-            
+            groups_data: Guruhlar ma'lumotlari (ro'yxat yoki generator)
+            summary: {'total', 'present', 'absent'} - berilmasa groups_data'dan
+                     hisoblanadi (generator bo'lsa u ro'yxatga aylanadi)
+
         Returns:
-            BytesIO: Excel fayl
+            BytesIO yoki vaqtinchalik fayl: Excel fayl
         """
         self.ws.title = f"Davomat {date.strftime('%d.%m.%Y')}"
-        
-        current_row = 1
-        
+        self._set_column_widths([6, 18, 18, 18, 18, 30])
+
+        if summary is None:
+            groups_data = list(groups_data)
+            summary = {
+                'total': sum(g['total'] for g in groups_data),
+                'present': sum(g['present'] for g in groups_data),
+                'absent': sum(g['absent'] for g in groups_data)
+            }
+
         # Sarlavha
-        self.ws.merge_cells(f'A{current_row}:E{current_row}')
-        title_cell = self.ws[f'A{current_row}']
-        title_cell.value = f"DAVOMAT HISOBOTI - {date.strftime('%d.%m.%Y')}"
-        title_cell.font = self.fonts['title']
-        title_cell.alignment = Alignment(horizontal='center', vertical='center')
-        current_row += 2
-        
+        row = self._append([self._cell(f"DAVOMAT HISOBOTI - {date.strftime('%d.%m.%Y')}", 'title')])
+        self._merge(1, 5, row)
+        self._append()
+
         # Umumiy statistika
-        self.ws.merge_cells(f'A{current_row}:E{current_row}')
-        summary_cell = self.ws[f'A{current_row}']
-        
-        total_students = sum(g['total'] for g in groups_data)
-        total_present = sum(g['present'] for g in groups_data)
-        total_absent = sum(g['absent'] for g in groups_data)
-        percentage = (total_present / total_students * 100) if total_students > 0 else 0
-        
-        summary_cell.value = f"Jami: {total_students} talaba | Kelgan: {total_present} | Kelmagan: {total_absent} | Foiz: {percentage:.1f}%"
-        summary_cell.font = self.fonts['bold']
-        summary_cell.fill = PatternFill(start_color=self.colors['total'], fill_type='solid')
-        summary_cell.alignment = Alignment(horizontal='center')
-        self._apply_border(summary_cell)
-        current_row += 2
-        
+        percentage = _percentage(summary['present'], summary['total'])
+        row = self._append([self._cell(
+            f"Jami: {summary['total']} talaba | Kelgan: {summary['present']} | "
+            f"Kelmagan: {summary['absent']} | Foiz: {percentage:.1f}%",
+            'summary'
+        )])
+        self._merge(1, 5, row)
+        self._append()
+
+        headers = ['#', 'Ism', 'Otchestvo', 'Familiya', 'Status', 'Izoh']
+
         # Har bir guruh uchun
         for group_data in groups_data:
             # Guruh nomi
-            self.ws.merge_cells(f'A{current_row}:E{current_row}')
-            group_cell = self.ws[f'A{current_row}']
-            group_cell.value = f"📁 {group_data['group_name']}"
-            group_cell.font = self.fonts['subheader']
-            group_cell.fill = PatternFill(start_color=self.colors['group_header'], fill_type='solid')
-            group_cell.alignment = Alignment(horizontal='left')
-            self._apply_border(group_cell)
-            current_row += 1
-            
+            row = self._append([self._cell(f"📁 {group_data['group_name']}", 'group_header')])
+            self._merge(1, 5, row)
+
             # Header
-            headers = ['#', 'Ism', 'Otchestvo', 'Familiya', 'Status', 'Izoh']
-            for col, header in enumerate(headers, start=1):
-                cell = self.ws.cell(row=current_row, column=col)
-                cell.value = header
-                cell.font = self.fonts['header']
-                cell.fill = PatternFill(start_color=self.colors['header'], fill_type='solid')
-                cell.alignment = Alignment(horizontal='center')
-                self._apply_border(cell)
-            current_row += 1
-            
+            self._append(self._cell(header, 'table_header') for header in headers)
+
             # Talabalar
             for idx, student in enumerate(group_data['students'], start=1):
-                # Raqam
-                cell = self.ws.cell(row=current_row, column=1)
-                cell.value = idx
-                cell.alignment = Alignment(horizontal='center')
-                self._apply_border(cell)
-                
-                # Ism
-                cell = self.ws.cell(row=current_row, column=2)
-                cell.value = student['first_name']
-                self._apply_border(cell)
-                
-                # Otchestvo
-                cell = self.ws.cell(row=current_row, column=3)
-                cell.value = student.get('middle_name', '') or ''
-                self._apply_border(cell)
-                
-                # Familiya
-                cell = self.ws.cell(row=current_row, column=4)
-                cell.value = student['last_name']
-                self._apply_border(cell)
-                
-                # Status
-                cell = self.ws.cell(row=current_row, column=5)
-                if student['status'] == 'present':
-                    cell.value = "✅ Keldi"
-                    cell.fill = PatternFill(start_color=self.colors['present'], fill_type='solid')
-                    cell.font = Font(name='Arial', size=11, bold=True, color='FFFFFF')
-                elif student['status'] == 'absent':
-                    cell.value = "❌ Kelmadi"
-                    cell.fill = PatternFill(start_color=self.colors['absent'], fill_type='solid')
-                    cell.font = Font(name='Arial', size=11, bold=True, color='FFFFFF')
-                else:
-                    cell.value = "⏳ Belgilanmagan"
-                    cell.fill = PatternFill(start_color='FFCCCCCC', fill_type='solid')
-                
-                cell.alignment = Alignment(horizontal='center')
-                self._apply_border(cell)
-                
-                # Izoh (bo'sh)
-                cell = self.ws.cell(row=current_row, column=6)
-                cell.value = ""
-                self._apply_border(cell)
-                
-                current_row += 1
-            
+                self._append([
+                    self._cell(idx, 'cell_center'),
+                    self._cell(student['first_name']),
+                    self._cell(student.get('middle_name', '') or ''),
+                    self._cell(student['last_name']),
+                    self._status_cell(student['status']),
+                    self._cell("")
+                ])
+
             # Guruh statistikasi
-            self.ws.merge_cells(f'A{current_row}:B{current_row}')
-            stat_cell = self.ws.cell(row=current_row, column=1)
-            stat_cell.value = f"Jami: {group_data['total']}"
-            stat_cell.font = self.fonts['bold']
-            stat_cell.fill = PatternFill(start_color='FFE7E6E6', fill_type='solid')
-            self._apply_border(stat_cell)
-            
-            cell = self.ws.cell(row=current_row, column=3)
-            cell.value = f"Kelgan: {group_data['present']}"
-            cell.font = self.fonts['bold']
-            cell.fill = PatternFill(start_color='FFE7E6E6', fill_type='solid')
-            self._apply_border(cell)
-            
-            cell = self.ws.cell(row=current_row, column=4)
-            cell.value = f"Kelmagan: {group_data['absent']}"
-            cell.font = self.fonts['bold']
-            cell.fill = PatternFill(start_color='FFE7E6E6', fill_type='solid')
-            self._apply_border(cell)
-            
-            self.ws.merge_cells(f'E{current_row}:F{current_row}')
-            cell = self.ws.cell(row=current_row, column=5)
-            group_percentage = (group_data['present'] / group_data['total'] * 100) if group_data['total'] > 0 else 0
-            cell.value = f"{group_percentage:.1f}%"
-            cell.font = self.fonts['bold']
-            cell.fill = PatternFill(start_color='FFE7E6E6', fill_type='solid')
-            self._apply_border(cell)
-            
-            current_row += 2  # Bo'sh qator
-        
-        # Ustun kengliklari
-        self._set_column_width(1, 6)   # #
-        self._set_column_width(2, 18)  # Ism
-        self._set_column_width(3, 18)  # Otchestvo
-        self._set_column_width(4, 18)  # Familiya
-        self._set_column_width(5, 18)  # Status
-        self._set_column_width(6, 30)  # Izoh
-        
-        # BytesIO'ga saqlash
-        output = BytesIO()
-        self.wb.save(output)
-        output.seek(0)
-        
-        return output
-    
+            group_percentage = _percentage(group_data['present'], group_data['total'])
+            row = self._append([
+                self._cell(f"Jami: {group_data['total']}", 'stat'),
+                self._cell(None, 'stat'),
+                self._cell(f"Kelgan: {group_data['present']}", 'stat'),
+                self._cell(f"Kelmagan: {group_data['absent']}", 'stat'),
+                self._cell(f"{group_percentage:.1f}%", 'stat'),
+                self._cell(None, 'stat')
+            ])
+            self._merge(1, 2, row)
+            self._merge(5, 6, row)
+
+            self._append()  # Bo'sh qator
+
+        return self._save()
+
     def export_group_report(self, date, group_name, students_data):
         """
         Bitta guruh uchun batafsil hisobot
-        
+
         Args:
             date: Sana
             group_name: Guruh nomi
-            students_data: Talabalar ma'lumotlari
-            
+            students_data: Talabalar ma'lumotlari (ro'yxat yoki generator)
+
         Returns:
-            BytesIO: Excel fayl
+            BytesIO yoki vaqtinchalik fayl: Excel fayl
         """
-        self.ws.title = f"{group_name}"
-        
-        current_row = 1
-        
+        self.ws.title = f"{group_name}"[:31]
+        self._set_column_widths([6, 30, 18, 15])
+
         # Sarlavha
-        self.ws.merge_cells(f'A{current_row}:D{current_row}')
-        title_cell = self.ws[f'A{current_row}']
-        title_cell.value = f"GURUH: {group_name}"
-        title_cell.font = self.fonts['title']
-        title_cell.alignment = Alignment(horizontal='center', vertical='center')
-        current_row += 1
-        
+        row = self._append([self._cell(f"GURUH: {group_name}", 'title')])
+        self._merge(1, 4, row)
+
         # Sana
-        self.ws.merge_cells(f'A{current_row}:D{current_row}')
-        date_cell = self.ws[f'A{current_row}']
-        date_cell.value = f"Sana: {date.strftime('%d.%m.%Y')}"
-        date_cell.font = self.fonts['bold']
-        date_cell.alignment = Alignment(horizontal='center')
-        current_row += 2
-        
+        row = self._append([self._cell(f"Sana: {date.strftime('%d.%m.%Y')}", 'bold_center')])
+        self._merge(1, 4, row)
+        self._append()
+
         # Header
         headers = ['#', 'Ism Familiya', 'Status', 'Vaqt']
-        for col, header in enumerate(headers, start=1):
-            cell = self.ws.cell(row=current_row, column=col)
-            cell.value = header
-            cell.font = self.fonts['header']
-            cell.fill = PatternFill(start_color=self.colors['header'], fill_type='solid')
-            cell.alignment = Alignment(horizontal='center')
-            self._apply_border(cell)
-        current_row += 1
-        
-        # Talabalar
+        self._append(self._cell(header, 'table_header') for header in headers)
+
+        # Talabalar - statistika yozish bilan birga sanaladi
+        total = 0
         present_count = 0
         absent_count = 0
-        
+
         for idx, student in enumerate(students_data, start=1):
-            # Raqam
-            cell = self.ws.cell(row=current_row, column=1)
-            cell.value = idx
-            cell.alignment = Alignment(horizontal='center')
-            self._apply_border(cell)
-            
-            # Ism Familiya
-            cell = self.ws.cell(row=current_row, column=2)
-            cell.value = f"{student['first_name']} {student['last_name']}"
-            self._apply_border(cell)
-            
-            # Status
-            cell = self.ws.cell(row=current_row, column=3)
+            total += 1
             if student['status'] == 'present':
-                cell.value = "✅ Keldi"
-                cell.fill = PatternFill(start_color=self.colors['present'], fill_type='solid')
-                cell.font = Font(name='Arial', size=11, bold=True, color='FFFFFF')
                 present_count += 1
             elif student['status'] == 'absent':
-                cell.value = "❌ Kelmadi"
-                cell.fill = PatternFill(start_color=self.colors['absent'], fill_type='solid')
-                cell.font = Font(name='Arial', size=11, bold=True, color='FFFFFF')
                 absent_count += 1
-            else:
-                cell.value = "⏳ Belgilanmagan"
-            
-            cell.alignment = Alignment(horizontal='center')
-            self._apply_border(cell)
-            
-            # Vaqt (bo'sh)
-            cell = self.ws.cell(row=current_row, column=4)
-            cell.value = ""
-            self._apply_border(cell)
-            
-            current_row += 1
-        
+
+            self._append([
+                self._cell(idx, 'cell_center'),
+                self._cell(f"{student['first_name']} {student['last_name']}"),
+                self._status_cell(student['status']),
+                self._cell("")
+            ])
+
         # Statistika
-        current_row += 1
-        total = len(students_data)
-        percentage = (present_count / total * 100) if total > 0 else 0
-        
-        self.ws.merge_cells(f'A{current_row}:D{current_row}')
-        stat_cell = self.ws[f'A{current_row}']
-        stat_cell.value = f"Jami: {total} | Kelgan: {present_count} | Kelmagan: {absent_count} | Foiz: {percentage:.1f}%"
-        stat_cell.font = self.fonts['bold']
-        stat_cell.fill = PatternFill(start_color=self.colors['total'], fill_type='solid')
-        stat_cell.alignment = Alignment(horizontal='center')
-        self._apply_border(stat_cell)
-        
-        # Ustun kengliklari
-        self._set_column_width(1, 6)   # #
-        self._set_column_width(2, 30)  # Ism Familiya
-        self._set_column_width(3, 18)  # Status
-        self._set_column_width(4, 15)  # Vaqt
-        
-        # BytesIO'ga saqlash
-        output = BytesIO()
-        self.wb.save(output)
-        output.seek(0)
-        
-        return output
+        self._append()
+        percentage = _percentage(present_count, total)
+        row = self._append([self._cell(
+            f"Jami: {total} | Kelgan: {present_count} | Kelmagan: {absent_count} | "
+            f"Foiz: {percentage:.1f}%",
+            'summary'
+        )])
+        self._merge(1, 4, row)
+
+        return self._save()
+
+    def export_range_report(self, report, group_name=None):
+        """
+        Sana oralig'i bo'yicha talaba x kun matritsasi
+
+        Args:
+            report: ReportService.range_matrix() natijasi
+            group_name: Guruh nomi (sarlavha uchun, ixtiyoriy)
+
+        Returns:
+            BytesIO yoki vaqtinchalik fayl: Excel fayl
+        """
+        start_date = report['start_date']
+        end_date = report['end_date']
+        days = report['days']
+        students = report['students']
+        matrix = report['matrix']
+
+        period = f"{start_date.strftime('%d.%m.%Y')} - {end_date.strftime('%d.%m.%Y')}"
+        self.ws.title = f"Davomat {start_date.strftime('%d.%m')}-{end_date.strftime('%d.%m.%Y')}"
+
+        # Ustunlar: #, Guruh, F.I.O., kunlar..., Kelgan, Kelmagan, Foiz
+        first_day_col = 4
+        total_col = first_day_col + len(days)
+        last_col = total_col + 2
+        self._set_column_widths([6, 16, 30] + [6] * len(days) + [10, 10, 8])
+
+        # Sarlavha
+        title = f"DAVOMAT MATRITSASI - {period}"
+        if group_name:
+            title = f"{title} ({group_name})"
+        row = self._append([self._cell(title, 'title')])
+        self._merge(1, min(last_col, 10), row)
+        self._append()
+
+        # Header
+        headers = ['#', 'Guruh', 'F.I.O.'] + [day.strftime('%d.%m') for day in days] \
+            + ['Kelgan', 'Kelmagan', 'Foiz']
+        self._append(self._cell(header, 'table_header') for header in headers)
+
+        # Talabalar
+        names = students[['group_name', 'first_name', 'middle_name', 'last_name']] \
+            .fillna('').itertuples(index=False)
+
+        for idx, (name_row, marks, present, absent, percentage) in enumerate(zip(
+                names,
+                matrix.tolist(),
+                report['student_present'].tolist(),
+                report['student_absent'].tolist(),
+                report['student_percentage'].tolist()), start=1):
+            full_name = " ".join(
+                part for part in (name_row.first_name, name_row.middle_name, name_row.last_name)
+                if part
+            )
+            cells = [
+                self._cell(idx, 'cell_center'),
+                self._cell(name_row.group_name),
+                self._cell(full_name)
+            ]
+            for mark in marks:
+                value, style = MATRIX_CELLS[mark]
+                cells.append(self._cell(value, style))
+            cells += [
+                self._cell(present, 'cell_center'),
+                self._cell(absent, 'cell_center'),
+                self._cell(f"{percentage:.1f}%", 'cell_center')
+            ]
+            self._append(cells)
+
+        # Kunlik jami qatorlari
+        day_present = report['day_present'].tolist()
+        day_absent = report['day_absent'].tolist()
+        total_present = sum(day_present)
+        total_absent = sum(day_absent)
+
+        for label, values, total in (
+                ("Kelgan", day_present, total_present),
+                ("Kelmagan", day_absent, total_absent)):
+            row = self._append(
+                [self._cell(label, 'stat'), self._cell(None, 'stat'), self._cell(None, 'stat')]
+                + [self._cell(value, 'stat') for value in values]
+                + [self._cell(total, 'stat'), self._cell(None, 'stat'), self._cell(None, 'stat')]
+            )
+            self._merge(1, 3, row)
+
+        # Umumiy statistika
+        self._append()
+        percentage = _percentage(total_present, total_present + total_absent)
+        row = self._append([self._cell(
+            f"Talabalar: {len(students)} | Kunlar: {len(days)} | Kelgan: {total_present} | "
+            f"Kelmagan: {total_absent} | Foiz: {percentage:.1f}%",
+            'summary'
+        )])
+        self._merge(1, min(last_col, 10), row)
+
+        return self._save()
 
 
 # Helper function
-def generate_filename(prefix, date, group_name=None):
+def generate_filename(prefix, date, group_name=None, end_date=None):
     """
     Excel fayl nomi generatsiya qilish
-    
+
     Args:
         prefix: Fayl prefiksi
-        date: Sana
+        date: Sana (oraliq bo'lsa - boshlanish sanasi)
         group_name: Guruh nomi (ixtiyoriy)
-        
+        end_date: Oraliq tugash sanasi (ixtiyoriy)
+
     Returns:
         str: Fayl nomi
     """
     date_str = date.strftime('%Y-%m-%d')
-    
+    if end_date:
+        date_str = f"{date_str}_{end_date.strftime('%Y-%m-%d')}"
+
     if group_name:
         # Guruh nomidagi maxsus belgilarni tozalash
         safe_group_name = "".join(c for c in group_name if c.isalnum() or c in (' ', '-', '_')).strip()
@@ -0,0 +1,15 @@
+"""
+Gunicorn sozlamalari (gunicorn joriy papkadagi gunicorn.conf.py ni o'zi o'qiydi)
+
+Sxema tekshiruvi va migratsiyalar master jarayonda BIR MARTA, worker'lar
+ishga tushishidan oldin alohida jarayonda bajariladi - worker'lar import
+paytida database'ga ulanmaydi. Procfile-Render'dagi buyruq o'zgarmaydi.
+"""
+
+import subprocess
+import sys
+
+
+def on_starting(server):
+    # Xato bo'lsa gunicorn ishga tushmaydi (eskirgan sxema bilan ishlamaslik uchun)
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'app', 'db-check'], check=True)
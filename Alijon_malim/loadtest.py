@@ -0,0 +1,319 @@
+"""
+Load Test - ertalabki davomat "portlashi" (roll-call burst)
+
+Haqiqiy cho'qqi: barcha o'qituvchilar bir xil 10 daqiqada davomat
+belgilaydi. Har bir o'qituvchi (alohida thread) o'z guruhi uchun:
+
+    1. GET  /attendance?group_id=..&date=..     - davomat sahifasi
+    2. belgilash:
+         --mode single  - har bir talaba uchun POST /attendance/mark
+         --mode batch   - bitta POST /attendance/bulk-mark (Idempotency-Key bilan)
+    3. GET  /dashboard                          - bosh sahifani yangilash
+
+O'qituvchilar --ramp soniya ichida bir tekis boshlaydi (0 - hammasi birdan),
+belgilashlar orasida --think millisekund "o'ylash" vaqti bor.
+
+Natija: endpoint bo'yicha so'rovlar soni, xatolar (HTTP status / exception),
+throughput va p50/p95/p99 latency. --json bilan faylga ham yoziladi -
+worker soni yoki optimizatsiyadan oldingi/keyingi natijalarni solishtirish uchun.
+
+Faqat standart kutubxona - serverdagi ilova bilan bir xil muhit shart emas.
+
+ISHLATISH (Alijon_malim papkasidan):
+    gunicorn app:app --bind 127.0.0.1:8000 --workers 2 --timeout 120   # Procfile-Render
+    python loadtest.py --url http://127.0.0.1:8000 --teachers 40 --mode single
+    python loadtest.py --teachers 40 --mode batch --ramp 60 --json natija.json
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import date
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+
+class Stats:
+    """
+    Endpoint bo'yicha latency va xatolar (barcha thread'lar uchun umumiy)
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint, seconds, error=None):
+        with self.lock:
+            self.latencies[endpoint].append(seconds)
+            if error is not None:
+                self.errors[endpoint][error] += 1
+
+    @staticmethod
+    def percentile(sorted_values, pct):
+        """
+        Nearest-rank percentil (tartiblangan ro'yxatdan)
+        """
+        if not sorted_values:
+            return 0.0
+        rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+        return sorted_values[rank - 1]
+
+    def summary(self, elapsed):
+        """
+        Returns:
+            dict: endpoint -> requests, errors, error_rate, rps, p50/p95/p99/max (ms)
+        """
+        result = {}
+        with self.lock:
+            endpoints = sorted(self.latencies)
+            for endpoint in endpoints + ['TOTAL']:
+                if endpoint == 'TOTAL':
+                    values = sorted(v for e in endpoints for v in self.latencies[e])
+                    errors = {}
+                    for e in endpoints:
+                        for key, count in self.errors[e].items():
+                            errors[key] = errors.get(key, 0) + count
+                else:
+                    values = sorted(self.latencies[endpoint])
+                    errors = dict(self.errors[endpoint])
+
+                failed = sum(errors.values())
+                result[endpoint] = {
+                    'requests': len(values),
+                    'errors': errors,
+                    'error_rate': round(failed / len(values), 4) if values else 0.0,
+                    'rps': round(len(values) / elapsed, 2) if elapsed else 0.0,
+                    'p50_ms': round(self.percentile(values, 50) * 1000, 1),
+                    'p95_ms': round(self.percentile(values, 95) * 1000, 1),
+                    'p99_ms': round(self.percentile(values, 99) * 1000, 1),
+                    'max_ms': round(values[-1] * 1000, 1) if values else 0.0,
+                }
+        return result
+
+
+class Client:
+    """
+    Bitta o'qituvchining HTTP ulanishi va cookie'lari
+    """
+
+    def __init__(self, base_url, stats, timeout=130):
+        parts = urlsplit(base_url)
+        connection_class = (
+            http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        )
+        self.connection = connection_class(parts.netloc, timeout=timeout)
+        self.prefix = parts.path.rstrip('/')
+        self.stats = stats
+        self.cookies = {}
+
+    def request(self, endpoint, method, path, body=None, headers=None, expect=(200,)):
+        """
+        So'rov yuborish va natijani Stats'ga yozish
+
+        Returns:
+            tuple: (status yoki None, javob tanasi)
+        """
+        headers = dict(headers or {})
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{k}={v}' for k, v in self.cookies.items())
+
+        start = time.perf_counter()
+        try:
+            self.connection.request(method, self.prefix + path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        except Exception as e:
+            # Uzilgan ulanish (worker timeout, restart) - keyingi so'rov qayta ulanadi
+            self.connection.close()
+            self.stats.record(endpoint, time.perf_counter() - start, type(e).__name__)
+            return None, b''
+
+        self.stats.record(
+            endpoint, time.perf_counter() - start,
+            None if response.status in expect else f'HTTP {response.status}'
+        )
+        for header in response.msg.get_all('Set-Cookie') or []:
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = morsel.value
+        return response.status, data
+
+    def get(self, endpoint, path, **params):
+        query = f'?{urlencode(params)}' if params else ''
+        return self.request(endpoint, 'GET', path + query)
+
+    def post_form(self, endpoint, path, data, **kwargs):
+        return self.request(endpoint, 'POST', path, body=urlencode(data),
+                            headers={'Content-Type': 'application/x-www-form-urlencoded'}, **kwargs)
+
+    def post_json(self, endpoint, path, data, headers=None):
+        return self.request(endpoint, 'POST', path, body=json.dumps(data),
+                            headers=dict(headers or {}, **{'Content-Type': 'application/json'}))
+
+
+def login(args, stats):
+    """
+    Bir marta login qilish - session cookie barcha o'qituvchilarga beriladi
+    (har biri alohida login qilsa login rate limiter ishlab ketadi)
+
+    Returns:
+        dict: Cookie'lar
+    """
+    client = Client(args.url, stats, timeout=args.timeout)
+    status, _ = client.post_form('login', '/login', {
+        'username': args.username,
+        'password': args.password,
+    }, expect=(302,))
+    if status != 302 or 'session' not in client.cookies:
+        sys.exit(f"❌ Login muvaffaqiyatsiz (HTTP {status}) - --username/--password ni tekshiring")
+    return client.cookies
+
+
+def load_groups(args, stats, cookies):
+    """
+    Guruhlar va aktiv talabalar (bitta /reports/daily-data so'rovi)
+
+    Returns:
+        list: [(group_id, [student_id, ...]), ...]
+    """
+    client = Client(args.url, stats, timeout=args.timeout)
+    client.cookies.update(cookies)
+    status, data = client.get('setup', '/reports/daily-data', date=args.date)
+    if status != 200:
+        sys.exit(f"❌ Guruhlar ro'yxatini olib bo'lmadi (HTTP {status})")
+
+    groups = [
+        (group['group_id'], [student['student_id'] for student in group['students']])
+        for group in json.loads(data)['groups']
+    ]
+    if not groups:
+        sys.exit("❌ Talabasi bor guruh yo'q - avval `flask synth-data` bilan ma'lumot yarating")
+    return groups
+
+
+def teacher(index, args, stats, cookies, group):
+    """
+    Bitta o'qituvchi ssenariysi: sahifa -> belgilash -> dashboard
+    """
+    group_id, student_ids = group
+    rng = random.Random(args.seed + index)
+    client = Client(args.url, stats, timeout=args.timeout)
+    client.cookies.update(cookies)
+    think = args.think / 1000
+
+    for _ in range(args.iterations):
+        client.get('attendance_page', '/attendance', group_id=group_id, date=args.date)
+
+        marks = [
+            {'student_id': student_id, 'status': 'absent' if rng.random() < 0.1 else 'present'}
+            for student_id in student_ids
+        ]
+
+        if args.mode == 'batch':
+            time.sleep(think * len(marks))
+            client.post_json('bulk_mark', '/attendance/bulk-mark', {
+                'date': args.date,
+                'group_id': group_id,
+                'attendances': marks,
+            }, headers={'Idempotency-Key': uuid.uuid4().hex})
+        else:
+            for mark in marks:
+                time.sleep(think)
+                client.post_form('mark', '/attendance/mark', dict(mark, date=args.date))
+
+        client.get('dashboard', '/dashboard')
+
+
+def print_summary(summary, elapsed, args):
+    print()
+    print(f"⏱️  {elapsed:.1f} s, {args.teachers} ta o'qituvchi, mode={args.mode}")
+    print(f"{'endpoint':<18}{'so`rov':>8}{'xato':>7}{'xato %':>8}{'rps':>8}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for endpoint, row in summary.items():
+        failed = sum(row['errors'].values())
+        print(f"{endpoint:<18}{row['requests']:>8}{failed:>7}{row['error_rate'] * 100:>7.1f}%"
+              f"{row['rps']:>8}{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}{row['max_ms']:>9}")
+    for endpoint, row in summary.items():
+        if row['errors'] and endpoint != 'TOTAL':
+            print(f"❌ {endpoint}: {row['errors']}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Ertalabki davomat yuklama testi")
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='Server manzili')
+    parser.add_argument('--teachers', type=int, default=20, help="Parallel o'qituvchilar soni")
+    parser.add_argument('--mode', choices=('single', 'batch'), default='single',
+                        help="Har bir talaba alohida yoki bitta bulk so'rov")
+    parser.add_argument('--ramp', type=float, default=0,
+                        help="O'qituvchilar shu soniya ichida bir tekis boshlaydi")
+    parser.add_argument('--think', type=float, default=0,
+                        help="Har bir talabani belgilashdan oldin kutish (ms)")
+    parser.add_argument('--iterations', type=int, default=1,
+                        help="Har bir o'qituvchi ssenariyni necha marta takrorlaydi")
+    parser.add_argument('--date', default=date.today().isoformat(), help='Davomat sanasi')
+    parser.add_argument('--timeout', type=float, default=130,
+                        help="So'rov timeout'i (s) - gunicorn --timeout dan katta")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--username', default=os.environ.get('LOADTEST_USERNAME', 'admin'))
+    parser.add_argument('--password', default=os.environ.get('LOADTEST_PASSWORD', '928100796'))
+    parser.add_argument('--json', dest='json_path', help='Natijani JSON faylga yozish')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_stats = Stats()
+    cookies = login(args, setup_stats)
+    groups = load_groups(args, setup_stats, cookies)
+
+    stats = Stats()
+    threads = []
+    for index in range(args.teachers):
+        thread = threading.Thread(
+            target=teacher, name=f'teacher-{index}',
+            args=(index, args, stats, cookies, groups[index % len(groups)]),
+            daemon=True
+        )
+        threads.append(thread)
+
+    print(f"🚀 {args.teachers} ta o'qituvchi, {len(groups)} ta guruh, {args.url}")
+    start = time.perf_counter()
+    for index, thread in enumerate(threads):
+        if args.ramp and index:
+            time.sleep(args.ramp / args.teachers)
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    summary = stats.summary(elapsed)
+    print_summary(summary, elapsed, args)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'url': args.url,
+                'teachers': args.teachers,
+                'mode': args.mode,
+                'ramp': args.ramp,
+                'think_ms': args.think,
+                'iterations': args.iterations,
+                'date': args.date,
+                'elapsed_seconds': round(elapsed, 3),
+                'endpoints': summary,
+            }, f, indent=2, ensure_ascii=False)
+        print(f"✅ Natija yozildi: {args.json_path}")
+
+    return 1 if summary['TOTAL']['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
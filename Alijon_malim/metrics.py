@@ -0,0 +1,475 @@
+"""
+Metrics Module
+So'rovlar bo'yicha latency, database so'rovlari soni/vaqti va sekin
+so'rovlar logi - Prometheus text formatida (GET /metrics)
+
+Har bir worker o'z xotirasida hisoblaydi. METRICS_DIR berilsa, fon
+thread'i ('metrics-writer') har METRICS_FLUSH_SECONDS soniyada worker
+snapshot'ini shu papkaga yozadi va /metrics barcha worker'lar fayllarini
+qo'shib beradi (METRICS_STALE_SECONDS'dan eski fayllar - o'lgan worker'lar -
+hisobga olinmaydi). ?scope=worker - faqat javob bergan worker.
+
+Shu fayl Alijon_malim va Alijon_2 ilovalarida bir xil (tests/test_shared_modules.py tekshiradi).
+
+Metrikalar:
+    http_requests_total{endpoint,method,status}
+    http_request_duration_seconds{endpoint,method}      (histogram)
+    db_queries_per_request{endpoint}                    (histogram)
+    db_seconds_per_request{endpoint}                    (histogram)
+    db_queries_total{endpoint}, db_query_seconds_total{endpoint}
+    db_slow_queries_total{endpoint}
+    + add_collector() bilan qo'shilgan qiymatlar (pool, scheduler, ...)
+"""
+
+import atexit
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+# So'rovdan tashqaridagi (scheduler, CLI) database so'rovlari uchun endpoint
+BACKGROUND_ENDPOINT = '(background)'
+UNMATCHED_ENDPOINT = '(unmatched)'
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def label_key(**labels):
+    """
+    Label'lar -> Prometheus matni (snapshot kaliti sifatida ham ishlatiladi)
+    """
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in sorted(labels.items()))
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def bind_sql(statement, parameters, limit=2000):
+    """
+    Log uchun SQL'ga parametrlarni qo'yish (taxminiy - faqat o'qish uchun)
+    """
+    many = isinstance(parameters, (list, tuple)) and parameters and isinstance(parameters[0], (list, tuple, dict))
+    params = parameters[0] if many else parameters
+
+    if isinstance(params, dict):
+        sql = re.sub(
+            r'%\((\w+)\)s|:(\w+)',
+            lambda m: repr(params.get(m.group(1) or m.group(2), m.group(0))),
+            statement
+        )
+    elif params:
+        values = iter(params)
+        sql = re.sub(r'\?|%s', lambda m: repr(next(values, m.group(0))), statement)
+    else:
+        sql = statement
+
+    sql = ' '.join(sql.split())
+    if many:
+        sql += f' -- x{len(parameters)}'
+    return sql if len(sql) <= limit else sql[:limit] + '...'
+
+
+class MetricsRegistry:
+    """
+    Worker metrikalari: counter'lar va histogram'lar (label'lar bo'yicha)
+    """
+
+    def __init__(self):
+        self.definitions = {}
+        self.counters = {}
+        self.histograms = {}
+        self.collectors = []
+        self.slow_queries = deque(maxlen=100)
+        self.slow_query_seconds = 0.2
+        self.directory = None
+        self.flush_seconds = 10
+        self.stale_seconds = 3600
+        self.thread = None
+        self.pid = None
+        self.lock = threading.Lock()
+
+        self.define('http_requests_total', 'counter', 'HTTP so\'rovlar soni')
+        self.define('http_request_duration_seconds', 'histogram',
+                    'HTTP so\'rov bajarilish vaqti', LATENCY_BUCKETS)
+        self.define('db_queries_per_request', 'histogram',
+                    'Bitta HTTP so\'rovdagi database so\'rovlari soni', QUERY_COUNT_BUCKETS)
+        self.define('db_seconds_per_request', 'histogram',
+                    'Bitta HTTP so\'rovda database\'ga ketgan vaqt', LATENCY_BUCKETS)
+        self.define('db_queries_total', 'counter', 'Database so\'rovlari soni')
+        self.define('db_query_seconds_total', 'counter', 'Database so\'rovlariga ketgan vaqt')
+        self.define('db_slow_queries_total', 'counter', 'Sekin database so\'rovlari soni')
+
+    def configure(self, directory=None, flush_seconds=None, stale_seconds=None, slow_query_ms=None):
+        """
+        Sozlamalarni app config'dan olish
+        """
+        with self.lock:
+            self.directory = directory
+            if flush_seconds is not None:
+                self.flush_seconds = flush_seconds
+            if stale_seconds is not None:
+                self.stale_seconds = stale_seconds
+            if slow_query_ms is not None:
+                self.slow_query_seconds = slow_query_ms / 1000
+
+    def define(self, name, kind, help_text, buckets=None):
+        self.definitions[name] = (kind, help_text, tuple(buckets) if buckets else None)
+
+    def add_collector(self, collector):
+        """
+        Snapshot paytida chaqiriladigan funksiya qo'shish
+
+        Args:
+            collector: [(nom, 'counter'|'gauge', izoh, labels_dict, qiymat), ...]
+                       qaytaruvchi argumentsiz funksiya
+        """
+        self.collectors.append(collector)
+
+    # ---------- Yozish ----------
+
+    def inc(self, name, labels, value=1):
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0) + value
+
+    def observe(self, name, labels, value):
+        buckets = self.definitions[name][2]
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            entry = series.get(labels)
+            if entry is None:
+                # [har bir bucket (+Inf bilan), yig'indi, soni]
+                entry = series[labels] = [0] * (len(buckets) + 1) + [0.0, 0]
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    entry[index] += 1
+                    break
+            else:
+                entry[len(buckets)] += 1
+            entry[-2] += value
+            entry[-1] += 1
+
+    def record_request(self, endpoint, method, status, seconds, queries, query_seconds):
+        """
+        Tugagan HTTP so'rovni yozish
+        """
+        self.inc('http_requests_total', label_key(endpoint=endpoint, method=method, status=status))
+        self.observe('http_request_duration_seconds', label_key(endpoint=endpoint, method=method), seconds)
+        labels = label_key(endpoint=endpoint)
+        self.observe('db_queries_per_request', labels, queries)
+        self.observe('db_seconds_per_request', labels, query_seconds)
+
+    def record_query(self, endpoint, seconds, statement, parameters):
+        """
+        Bitta database so'rovini yozish (sekin bo'lsa logga ham)
+        """
+        labels = label_key(endpoint=endpoint)
+        with self.lock:
+            queries = self.counters.setdefault('db_queries_total', {})
+            queries[labels] = queries.get(labels, 0) + 1
+            durations = self.counters.setdefault('db_query_seconds_total', {})
+            durations[labels] = durations.get(labels, 0) + seconds
+
+        if seconds < self.slow_query_seconds:
+            return
+
+        self.inc('db_slow_queries_total', labels)
+        sql = bind_sql(statement, parameters)
+        self.slow_queries.append({
+            'at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'endpoint': endpoint,
+            'ms': round(seconds * 1000, 2),
+            'sql': sql
+        })
+        print(f"🐢 Sekin so'rov {seconds * 1000:.1f} ms [{endpoint}]: {sql}")
+
+    # ---------- Snapshot ----------
+
+    def snapshot(self):
+        """
+        Worker metrikalari (collector'lar bilan) - JSON'ga yoziladigan ko'rinishda
+
+        Returns:
+            dict
+        """
+        collected = {}
+        for collector in self.collectors:
+            try:
+                samples = collector()
+            except Exception as e:
+                print(f"❌ Metrika collector xatoligi: {e}")
+                continue
+            for name, kind, help_text, labels, value in samples:
+                if name not in self.definitions:
+                    self.define(name, kind, help_text)
+                series = collected.setdefault(name, {})
+                key = label_key(**labels)
+                series[key] = series.get(key, 0) + (value or 0)
+
+        with self.lock:
+            counters = {name: dict(series) for name, series in self.counters.items()}
+            histograms = {
+                name: {labels: list(entry) for labels, entry in series.items()}
+                for name, series in self.histograms.items()
+            }
+
+        for name, series in collected.items():
+            counters[name] = series
+
+        return {
+            'pid': os.getpid(),
+            'updated_at': time.time(),
+            'definitions': {name: list(definition) for name, definition in self.definitions.items()},
+            'counters': counters,
+            'histograms': histograms
+        }
+
+    @staticmethod
+    def merge(snapshots):
+        """
+        Bir nechta worker snapshot'larini qo'shish (counter/gauge - yig'indi)
+        """
+        merged = {'definitions': {}, 'counters': {}, 'histograms': {}}
+        for snapshot in snapshots:
+            merged['definitions'].update(snapshot.get('definitions', {}))
+            for name, series in snapshot.get('counters', {}).items():
+                target = merged['counters'].setdefault(name, {})
+                for labels, value in series.items():
+                    target[labels] = target.get(labels, 0) + value
+            for name, series in snapshot.get('histograms', {}).items():
+                target = merged['histograms'].setdefault(name, {})
+                for labels, entry in series.items():
+                    current = target.get(labels)
+                    target[labels] = entry if current is None else [a + b for a, b in zip(current, entry)]
+        merged['workers'] = len(snapshots)
+        return merged
+
+    @staticmethod
+    def render(snapshot):
+        """
+        Snapshot -> Prometheus text exposition format
+        """
+        lines = []
+        definitions = snapshot['definitions']
+
+        for name in sorted(set(snapshot['counters']) | set(snapshot['histograms'])):
+            kind, help_text, buckets = definitions.get(name, ('untyped', '', None))
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+            if kind == 'histogram':
+                for labels, entry in sorted(snapshot['histograms'].get(name, {}).items()):
+                    prefix = labels + ',' if labels else ''
+                    cumulative = 0
+                    for bound, count in zip(list(buckets) + [float('inf')], entry):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{prefix}le="{_format_value(float(bound))}"}} {cumulative}')
+                    suffix = f'{{{labels}}}' if labels else ''
+                    lines.append(f'{name}_sum{suffix} {_format_value(entry[-2])}')
+                    lines.append(f'{name}_count{suffix} {entry[-1]}')
+            else:
+                for labels, value in sorted(snapshot['counters'].get(name, {}).items()):
+                    series = f'{name}{{{labels}}}' if labels else name
+                    lines.append(f'{series} {_format_value(value)}')
+
+        if 'workers' in snapshot:
+            lines.append('# HELP metrics_workers Hisobga olingan worker\'lar soni')
+            lines.append('# TYPE metrics_workers gauge')
+            lines.append(f"metrics_workers {snapshot['workers']}")
+
+        return '\n'.join(lines) + '\n'
+
+    # ---------- Worker'lararo ----------
+
+    def _path(self, pid=None):
+        return os.path.join(self.directory, f'worker-{pid or os.getpid()}.json')
+
+    def write_snapshot(self):
+        """
+        Worker snapshot'ini umumiy papkaga atomar yozish
+        """
+        if not self.directory:
+            return
+        path = self._path()
+        temp_path = f'{path}.tmp'
+        try:
+            # Papka birinchi yozishda yaratiladi (import paytida emas)
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp_path, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"❌ Metrikalarni yozishda xatolik: {e}")
+
+    def read_snapshots(self):
+        """
+        Umumiy papkadagi yangi (o'lmagan worker'lar) snapshot'lar
+        """
+        snapshots = []
+        cutoff = time.time() - self.stale_seconds
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return snapshots
+
+        for name in names:
+            if not (name.startswith('worker-') and name.endswith('.json')):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    continue
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def aggregate(self, scope='all'):
+        """
+        /metrics uchun snapshot - barcha worker'lar yoki faqat shu worker
+        """
+        if scope == 'worker' or not self.directory:
+            return self.merge([self.snapshot()])
+
+        # Shu worker'ning fayli eng yangi bo'lsin
+        self.write_snapshot()
+        return self.merge(self.read_snapshots())
+
+    def ensure_writer(self):
+        """
+        Snapshot yozuvchi fon thread'ini ishga tushirish (fork'dan keyin ham)
+        """
+        if not self.directory:
+            return
+        pid = os.getpid()
+        if self.thread is not None and self.pid == pid and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread is not None and self.pid == pid and self.thread.is_alive():
+                return
+            self.pid = pid
+            self.thread = threading.Thread(target=self._run_writer, name='metrics-writer', daemon=True)
+            self.thread.start()
+
+    def _run_writer(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            self.write_snapshot()
+
+
+# Shu worker metrikalari
+metrics = MetricsRegistry()
+
+
+def init_metrics(app, db):
+    """
+    So'rov hook'lari va SQLAlchemy listener'larini ulash
+    (db.init_app'dan keyin)
+
+    Args:
+        app: Flask application
+        db: SQLAlchemy obyekti
+    """
+    from flask import g, has_app_context, request
+    from sqlalchemy import event
+
+    metrics.configure(
+        directory=app.config.get('METRICS_DIR'),
+        flush_seconds=app.config.get('METRICS_FLUSH_SECONDS', 10),
+        stale_seconds=app.config.get('METRICS_STALE_SECONDS', 3600),
+        slow_query_ms=app.config.get('METRICS_SLOW_QUERY_MS', 200)
+    )
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('metrics_query_start')
+        if not starts:
+            return
+        seconds = time.perf_counter() - starts.pop()
+
+        state = getattr(g, '_metrics', None) if has_app_context() else None
+        if state is None:
+            endpoint = BACKGROUND_ENDPOINT
+        else:
+            state['queries'] += 1
+            state['query_seconds'] += seconds
+            endpoint = state['endpoint']
+        metrics.record_query(endpoint, seconds, statement, parameters)
+
+    def start_request():
+        metrics.ensure_writer()
+        g._metrics = {
+            'start': time.perf_counter(),
+            'endpoint': request.endpoint or UNMATCHED_ENDPOINT,
+            'queries': 0,
+            'query_seconds': 0.0,
+            'status': 500
+        }
+
+    # Boshqa before_request hook'laridan (auto-login, ...) oldin - ularning vaqti ham hisoblansin
+    app.before_request_funcs.setdefault(None, []).insert(0, start_request)
+
+    @app.after_request
+    def remember_status(response):
+        state = getattr(g, '_metrics', None)
+        if state is not None:
+            state['status'] = response.status_code
+        return response
+
+    @app.teardown_request
+    def finish_request(exception=None):
+        state = g.pop('_metrics', None)
+        if state is None or state['endpoint'] == 'static':
+            return
+        metrics.record_request(
+            state['endpoint'], request.method, state['status'],
+            time.perf_counter() - state['start'],
+            state['queries'], state['query_seconds']
+        )
+
+    atexit.register(metrics.write_snapshot)
+
+
+def metrics_response(request, token=None):
+    """
+    GET /metrics javobi (Prometheus text)
+
+    Args:
+        request: Flask request
+        token: METRICS_TOKEN - berilsa 'Authorization: Bearer <token>' talab qilinadi
+
+    Returns:
+        tuple: (body, status, headers)
+    """
+    import hmac
+
+    if token:
+        header = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(header, f'Bearer {token}'):
+            return 'Unauthorized\n', 401, {'Content-Type': CONTENT_TYPE}
+
+    scope = 'worker' if request.args.get('scope') == 'worker' else 'all'
+    return metrics.render(metrics.aggregate(scope)), 200, {'Content-Type': CONTENT_TYPE}
@@ -0,0 +1,414 @@
+"""
+Schema Migration Module
+Database sxemasini versiyalar bo'yicha yangilash (SQLite va PostgreSQL)
+
+Har bir migratsiya bir marta, tartib bilan bajariladi va `schema_version`
+jadvaliga yoziladi. Request'lar hech qanday DDL bajarmaydi - sxema faqat
+ishga tushishda (yoki deploy paytida `flask db-upgrade` bilan) tekshiriladi.
+
+ISHLATISH:
+    flask --app app db-upgrade     # kutilayotgan migratsiyalarni bajarish
+    flask --app app db-status      # joriy versiyani ko'rish
+
+YANGI MIGRATSIYA QO'SHISH:
+    1. _mNNN_nom(conn, dialect) funksiyasini yozing
+    2. MIGRATIONS ro'yxatining OXIRIGA (versiya, nom, funksiya) qo'shing
+    Mavjud migratsiyalarni o'zgartirmang - ular production'da bajarilgan.
+    Jadval yaratishda joriy models.py emas, o'sha versiyadagi jadval
+    ta'rifini migratsiyaning o'ziga yozing (models keyin o'zgaradi).
+"""
+
+from datetime import datetime
+
+from sqlalchemy import (
+    Boolean, Column, Date, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, Text,
+    UniqueConstraint, bindparam, inspect, text
+)
+from sqlalchemy.exc import IntegrityError
+
+from models import db
+
+
+# PostgreSQL advisory lock kaliti (bir vaqtda faqat bitta worker migratsiya qiladi)
+MIGRATION_LOCK_KEY = 73524101
+
+schema_metadata = MetaData()
+
+schema_version = Table(
+    'schema_version', schema_metadata,
+    Column('version', Integer, primary_key=True),
+    Column('name', String(100), nullable=False),
+    Column('applied_at', DateTime, nullable=False, default=datetime.utcnow),
+)
+
+
+# ==========================================
+# MIGRATSIYALAR
+# ==========================================
+
+def _column_names(conn, table_name):
+    return {column['name'] for column in inspect(conn).get_columns(table_name)}
+
+
+def _m001_initial_schema(conn, dialect):
+    """
+    Boshlang'ich sxema - mavjud bo'lmagan jadvallarni yaratish
+    (avval db.create_all() bilan yaratilgan database'larda hech narsa qilmaydi)
+
+    Jadvallar muzlatilgan - middle_name ustunini _m002 qo'shadi, keyingi
+    jadval va indekslarni o'z migratsiyalari yaratadi.
+    """
+    metadata = MetaData()
+
+    Table(
+        'admin_tokens', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('token_hash', String(256), unique=True, nullable=False, index=True),
+        Column('selector', String(64), unique=True, nullable=False, index=True),
+        Column('user_agent', String(500)),
+        Column('ip_address', String(50)),
+        Column('created_at', DateTime, nullable=False),
+        Column('expires_at', DateTime, nullable=False),
+        Column('last_used', DateTime),
+    )
+    Table(
+        'groups', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('name', String(100), unique=True, nullable=False),
+    )
+    Table(
+        'students', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('first_name', String(100), nullable=False),
+        Column('last_name', String(100), nullable=False),
+        Column('group_id', Integer, ForeignKey('groups.id'), nullable=False),
+        Column('active', Boolean, nullable=False),
+        Column('created_at', DateTime),
+    )
+    Table(
+        'attendance', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('student_id', Integer, ForeignKey('students.id'), nullable=False),
+        Column('date', Date, nullable=False),
+        Column('status', String(20), nullable=False),
+        Column('created_at', DateTime),
+        UniqueConstraint('student_id', 'date', name='unique_student_date'),
+    )
+
+    metadata.create_all(bind=conn, checkfirst=True)
+
+
+def _m002_students_middle_name(conn, dialect):
+    """
+    students.middle_name ustuni (eski migrate_add_mimiddle_name.py o'rniga)
+    """
+    if 'middle_name' not in _column_names(conn, 'students'):
+        conn.execute(text("ALTER TABLE students ADD COLUMN middle_name VARCHAR(100)"))
+
+
+def _m003_idempotency_keys(conn, dialect):
+    """
+    Batch saqlash uchun idempotency_keys jadvali
+    (created_at indeksi - _m005, request_hash/username - _m008)
+    """
+    Table(
+        'idempotency_keys', MetaData(),
+        Column('id', Integer, primary_key=True),
+        Column('key', String(64), unique=True, nullable=False, index=True),
+        Column('response', Text, nullable=False),
+        Column('created_at', DateTime, nullable=False),
+    ).create(bind=conn, checkfirst=True)
+
+
+def _m004_daily_group_rollup(conn, dialect):
+    """
+    daily_group_rollup jadvali + mavjud tarix uchun bir martalik to'ldirish
+    (o'sha versiyadagi rollups.rebuild_range hisobi: active_total - guruhdagi
+    hozirgi aktiv talabalar soni)
+    """
+    metadata = MetaData()
+
+    # Faqat ForeignKey uchun - jadval yaratilmaydi
+    Table('groups', metadata, Column('id', Integer, primary_key=True))
+    Table(
+        'daily_group_rollup', metadata,
+        Column('group_id', Integer, ForeignKey('groups.id'), primary_key=True),
+        Column('date', Date, primary_key=True),
+        Column('present', Integer, nullable=False),
+        Column('absent', Integer, nullable=False),
+        Column('active_total', Integer, nullable=False),
+        Column('updated_at', DateTime, nullable=False),
+        Index('ix_daily_group_rollup_date', 'date'),
+    ).create(bind=conn, checkfirst=True)
+
+    conn.execute(text("DELETE FROM daily_group_rollup"))
+    conn.execute(text("""
+        INSERT INTO daily_group_rollup (group_id, date, present, absent, active_total, updated_at)
+        SELECT students.group_id, attendance.date,
+               COALESCE(SUM(CASE WHEN attendance.status = 'present' THEN 1 ELSE 0 END), 0),
+               COALESCE(SUM(CASE WHEN attendance.status = 'absent' THEN 1 ELSE 0 END), 0),
+               MAX(active_counts.active_total),
+               :now
+        FROM attendance
+        JOIN students ON attendance.student_id = students.id
+        JOIN (
+            SELECT group_id, COUNT(id) AS active_total
+            FROM students
+            WHERE active = :active
+            GROUP BY group_id
+        ) AS active_counts ON active_counts.group_id = students.group_id
+        WHERE students.active = :active
+        GROUP BY students.group_id, attendance.date
+    """).bindparams(
+        bindparam('now', datetime.utcnow(), type_=DateTime),
+        bindparam('active', True, type_=Boolean),
+    ))
+
+
+def _m005_hot_query_indexes(conn, dialect):
+    """
+    Tez-tez ishlatiladigan filtrlar uchun indekslar
+    (jadvallarning faqat indekslangan ustunlari - jadval yaratilmaydi)
+    """
+    metadata = MetaData()
+
+    students = Table(
+        'students', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('group_id', Integer),
+        Column('active', Boolean),
+        Column('first_name', String(100)),
+    )
+    attendance = Table(
+        'attendance', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('date', Date),
+        Column('status', String(20)),
+    )
+    admin_tokens = Table(
+        'admin_tokens', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('expires_at', DateTime),
+    )
+    idempotency_keys = Table(
+        'idempotency_keys', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('created_at', DateTime),
+    )
+
+    indexes = [
+        Index('ix_students_group_active_name',
+              students.c.group_id, students.c.active, students.c.first_name, students.c.id),
+        Index('ix_students_active_group_name',
+              students.c.group_id, students.c.first_name, students.c.id,
+              sqlite_where=text('active = 1'), postgresql_where=text('active')),
+        Index('ix_attendance_date_status', attendance.c.date, attendance.c.status),
+        Index('ix_admin_tokens_expires_at', admin_tokens.c.expires_at),
+        Index('ix_idempotency_keys_created_at', idempotency_keys.c.created_at),
+    ]
+    for index in indexes:
+        index.create(bind=conn, checkfirst=True)
+
+    # Planner statistikasi yangi indekslarni hisobga olsin
+    conn.execute(text("ANALYZE"))
+
+
+def _m006_security_events(conn, dialect):
+    """
+    Audit log uchun security_events jadvali
+    """
+    Table(
+        'security_events', MetaData(),
+        Column('id', Integer, primary_key=True),
+        Column('created_at', DateTime, nullable=False),
+        Column('event_type', String(50), nullable=False),
+        Column('username', String(100)),
+        Column('ip_address', String(50)),
+        Column('user_agent', String(500)),
+        Column('details', String(500)),
+        Index('ix_security_events_created_at', 'created_at'),
+        Index('ix_security_events_type_id', 'event_type', 'id'),
+        Index('ix_security_events_ip_id', 'ip_address', 'id'),
+    ).create(bind=conn, checkfirst=True)
+
+
+def _m007_scheduler_leases(conn, dialect):
+    """
+    Scheduler lideri uchun scheduler_leases jadvali
+    """
+    Table(
+        'scheduler_leases', MetaData(),
+        Column('name', String(50), primary_key=True),
+        Column('owner', String(100)),
+        Column('expires_at', DateTime, nullable=False),
+    ).create(bind=conn, checkfirst=True)
+
+
+def _m008_idempotency_request_binding(conn, dialect):
+    """
+    idempotency_keys.request_hash va username ustunlari
+    (kalit so'rov tanasi va foydalanuvchiga bog'lanadi)
+    """
+    columns = _column_names(conn, 'idempotency_keys')
+    if 'request_hash' not in columns:
+        conn.execute(text("ALTER TABLE idempotency_keys ADD COLUMN request_hash VARCHAR(64)"))
+    if 'username' not in columns:
+        conn.execute(text("ALTER TABLE idempotency_keys ADD COLUMN username VARCHAR(100)"))
+
+
+MIGRATIONS = [
+    (1, 'initial_schema', _m001_initial_schema),
+    (2, 'students_middle_name', _m002_students_middle_name),
+    (3, 'idempotency_keys', _m003_idempotency_keys),
+    (4, 'daily_group_rollup', _m004_daily_group_rollup),
+    (5, 'hot_query_indexes', _m005_hot_query_indexes),
+    (6, 'security_events', _m006_security_events),
+    (7, 'scheduler_leases', _m007_scheduler_leases),
+    (8, 'idempotency_request_binding', _m008_idempotency_request_binding),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# ==========================================
+# RUNNER
+# ==========================================
+
+def _lock(conn, dialect):
+    """
+    Tranzaksiya davomida migratsiyani boshqa worker'lardan himoyalash
+    """
+    if dialect == 'postgresql':
+        # Engine profilidagi statement_timeout uzun migratsiyalarga (indeks, ANALYZE) tegmasin
+        conn.execute(text("SET LOCAL statement_timeout = 0"))
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': MIGRATION_LOCK_KEY})
+    elif dialect == 'sqlite':
+        # Yozish qulfini darhol olish - ikkinchi worker shu yerda kutadi
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def get_current_version(conn):
+    """
+    Database'dagi joriy sxema versiyasi
+
+    Returns:
+        int: Versiya (0 - hali migratsiya qilinmagan)
+    """
+    if not inspect(conn).has_table('schema_version'):
+        return 0
+    result = conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar()
+    return result or 0
+
+
+def pending_migrations(conn):
+    """
+    Hali bajarilmagan migratsiyalar ro'yxati
+    """
+    current = get_current_version(conn)
+    return [m for m in MIGRATIONS if m[0] > current]
+
+
+def upgrade(engine=None):
+    """
+    Kutilayotgan barcha migratsiyalarni bajarish
+
+    Returns:
+        list: Bajarilgan migratsiyalar nomlari
+    """
+    engine = engine or db.engine
+    dialect = engine.dialect.name
+    applied = []
+
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            _lock(conn, dialect)
+            schema_metadata.create_all(bind=conn, checkfirst=True)
+
+            for version, name, migrate in pending_migrations(conn):
+                migrate(conn, dialect)
+                conn.execute(schema_version.insert().values(
+                    version=version,
+                    name=name,
+                    applied_at=datetime.utcnow()
+                ))
+                applied.append(f'{version:03d}_{name}')
+
+            trans.commit()
+        except IntegrityError:
+            # Boshqa worker bizdan oldin bajardi
+            trans.rollback()
+            return []
+        except Exception:
+            trans.rollback()
+            raise
+
+    return applied
+
+
+def check_schema(app, auto_upgrade=True):
+    """
+    Ishga tushishda BIR MARTA sxema versiyasini tekshirish
+
+    Args:
+        app: Flask application
+        auto_upgrade: True bo'lsa kutilayotgan migratsiyalar bajariladi,
+                      aks holda faqat ogohlantirish chiqadi
+
+    Returns:
+        int: Joriy sxema versiyasi
+    """
+    with app.app_context():
+        with db.engine.connect() as conn:
+            current = get_current_version(conn)
+
+        if current >= LATEST_VERSION:
+            return current
+
+        if not auto_upgrade:
+            print(f"⚠️  Sxema eskirgan: v{current} (kerak: v{LATEST_VERSION}). "
+                  f"'flask db-upgrade' ni ishga tushiring")
+            return current
+
+        for name in upgrade():
+            print(f"✅ Migratsiya bajarildi: {name}")
+
+        with db.engine.connect() as conn:
+            return get_current_version(conn)
+
+
+def init_migrations(app):
+    """
+    Migratsiya CLI buyruqlarini ro'yxatdan o'tkazish
+
+    Sxema import paytida tekshirilmaydi (har bir worker database'ga
+    ulanmasligi uchun) - `flask db-check` ishga tushishda bir marta
+    bajariladi (gunicorn.conf.py, `python app.py`).
+
+    Args:
+        app: Flask application
+    """
+    @app.cli.command('db-upgrade')
+    def db_upgrade_command():
+        """Kutilayotgan migratsiyalarni bajarish"""
+        applied = upgrade()
+        for name in applied:
+            print(f"✅ {name}")
+        if not applied:
+            print("ℹ️  Sxema allaqachon yangi")
+
+    @app.cli.command('db-status')
+    def db_status_command():
+        """Joriy sxema versiyasini ko'rsatish"""
+        with db.engine.connect() as conn:
+            current = get_current_version(conn)
+            pending = pending_migrations(conn)
+        print(f"Joriy versiya: v{current} (oxirgi: v{LATEST_VERSION})")
+        for version, name, _ in pending:
+            print(f"  ⏳ {version:03d}_{name}")
+
+    @app.cli.command('db-check')
+    def db_check_command():
+        """Sxema versiyasini tekshirish (AUTO_MIGRATE=1 bo'lsa migratsiya ham)"""
+        current = check_schema(app, auto_upgrade=app.config.get('AUTO_MIGRATE', True))
+        print(f"✅ Sxema versiyasi: v{current}")
@@ -7,6 +7,9 @@ from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime, timedelta
 import secrets
 import hashlib
+import hmac
+import json
+import base64
 
 db = SQLAlchemy()
 
@@ -27,6 +30,14 @@ class AdminToken(db.Model):
     expires_at = db.Column(db.DateTime, nullable=False)
     last_used = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Tozalashda bitta DELETE'dagi maksimal qatorlar soni
+    PURGE_BATCH_SIZE = 1000
+    
+    # Muddati tugaganlarni tozalash va aktiv sessiyalarni sanash uchun
+    __table_args__ = (
+        db.Index('ix_admin_tokens_expires_at', 'expires_at'),
+    )
+    
     def __repr__(self):
         return f'<AdminToken {self.selector}>'
     
@@ -67,7 +78,10 @@ class AdminToken(db.Model):
     @staticmethod
     def verify_token(selector, validator):
         """
-        Tokenni tekshirish
+        Tokenni tekshirish - bitta indeksli SELECT
+        
+        last_used yangilanishi va yaroqsiz tokenni o'chirish so'rov ichida
+        bajarilmaydi - token_activity buferi ularni keyinroq yozadi.
         
         Args:
             selector: Token selector
@@ -76,29 +90,28 @@ class AdminToken(db.Model):
         Returns:
             bool: True agar token to'g'ri va amal qilsa
         """
+        from token_activity import token_activity
+        
         token = AdminToken.query.filter_by(selector=selector).first()
         
-        if not token:
+        if not token or token_activity.is_revoked(token.id):
             return False
         
         # Muddati tugaganmi tekshirish
         if token.expires_at < datetime.utcnow():
-            db.session.delete(token)
-            db.session.commit()
+            token_activity.revoke(token.id)
             return False
         
         # Hash'ni tekshirish
         validator_hash = hashlib.sha256(validator.encode()).hexdigest()
         
-        if token.token_hash == validator_hash:
-            # Last used yangilash
-            token.last_used = datetime.utcnow()
-            db.session.commit()
+        if hmac.compare_digest(token.token_hash, validator_hash):
+            # Last used yangilash (write-behind)
+            token_activity.touch(token.id, token.last_used)
             return True
         
         # Agar hash mos kelmasa, token o'chiriladi (xavfsizlik)
-        db.session.delete(token)
-        db.session.commit()
+        token_activity.revoke(token.id)
         return False
     
     @staticmethod
@@ -114,27 +127,51 @@ class AdminToken(db.Model):
         return False
     
     @staticmethod
-    def cleanup_expired():
+    def purge_expired(batch_size=None, now=None):
         """
-        Muddati tugagan tokenlarni tozalash
+        Muddati tugagan tokenlarni to'plamlab (batch) o'chirish
+        
+        Har bir to'plam - bitta set-based DELETE va alohida qisqa tranzaksiya,
+        shuning uchun jadval uzoq vaqt bloklanmaydi va obyektlar yuklanmaydi.
+        
+        Args:
+            batch_size: Bitta DELETE'dagi maksimal qatorlar soni
+            now: Taqqoslash vaqti (standart: hozir, UTC)
+        
+        Returns:
+            int: O'chirilgan tokenlar soni
         """
-        expired = AdminToken.query.filter(
-            AdminToken.expires_at < datetime.utcnow()
-        ).all()
+        table = AdminToken.__table__
+        batch_size = batch_size or AdminToken.PURGE_BATCH_SIZE
+        now = now or datetime.utcnow()
         
-        for token in expired:
-            db.session.delete(token)
+        expired_ids = db.select([table.c.id]).where(
+            table.c.expires_at < now
+        ).limit(batch_size).scalar_subquery()
         
-        db.session.commit()
-        return len(expired)
+        total = 0
+        while True:
+            with db.engine.begin() as conn:
+                deleted = conn.execute(
+                    table.delete().where(table.c.id.in_(expired_ids))
+                ).rowcount
+            total += deleted
+            if deleted < batch_size:
+                return total
+    
+    @staticmethod
+    def cleanup_expired():
+        """
+        Muddati tugagan tokenlarni tozalash
+        """
+        return AdminToken.purge_expired()
     
     @staticmethod
     def revoke_all():
         """
         Barcha tokenlarni bekor qilish (xavfsizlik)
         """
-        count = AdminToken.query.count()
-        AdminToken.query.delete()
+        count = AdminToken.query.delete(synchronize_session=False)
         db.session.commit()
         return count
 
@@ -155,13 +192,49 @@ class Group(db.Model):
     def __repr__(self):
         return f'<Group {self.name}>'
     
-    def to_dict(self):
-        """JSON formatga o'tkazish uchun"""
+    def active_students_count(self):
+        """Aktiv talabalar soni (talabalarni yuklamasdan, bitta COUNT)"""
+        return Student.query.filter_by(group_id=self.id, active=True).count()
+    
+    def to_dict(self, students_count=None):
+        """
+        JSON formatga o'tkazish uchun
+        
+        Args:
+            students_count: Oldindan sanalgan aktiv talabalar soni
+                            (berilmasa bitta COUNT so'rovi)
+        """
+        if students_count is None:
+            students_count = self.active_students_count()
         return {
             'id': self.id,
             'name': self.name,
-            'students_count': len([s for s in self.students if s.active])
+            'students_count': students_count
         }
+    
+    @staticmethod
+    def with_student_counts():
+        """
+        Barcha guruhlar va aktiv talabalar soni - bitta GROUP BY so'rovi
+        
+        Returns:
+            list: [{'group': Group, 'students_count': int}]
+        """
+        rows = db.session.query(
+            Group,
+            db.func.count(Student.id)
+        ).outerjoin(
+            Student,
+            db.and_(
+                Student.group_id == Group.id,
+                Student.active == True
+            )
+        ).group_by(Group.id).order_by(Group.id).all()
+        
+        return [
+            {'group': group, 'students_count': count}
+            for group, count in rows
+        ]
 
 
 class Student(db.Model):
@@ -183,6 +256,17 @@ class Student(db.Model):
     attendances = db.relationship('Attendance', backref='student', lazy=True, 
                                   cascade='all, delete-orphan')
     
+    __table_args__ = (
+        # Guruh + holat bo'yicha filtr va ism bo'yicha tartib (admin ro'yxati)
+        db.Index('ix_students_group_active_name', 'group_id', 'active', 'first_name', 'id'),
+        # Faqat aktiv talabalar (dashboard, kunlik hisobot, sanoqlar) - partial index
+        db.Index(
+            'ix_students_active_group_name', 'group_id', 'first_name', 'id',
+            sqlite_where=db.text('active = 1'),
+            postgresql_where=db.text('active')
+        ),
+    )
+    
     def __repr__(self):
         return f'<Student {self.first_name} {self.last_name}>'
     
@@ -198,8 +282,19 @@ class Student(db.Model):
             return f"{self.first_name} {self.middle_name} {self.last_name}"
         return self.full_name
     
-    def to_dict(self):
-        """JSON formatga o'tkazish uchun"""
+    # Ro'yxat sahifasi hajmi
+    PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+    
+    def to_dict(self, group_name=None):
+        """
+        JSON formatga o'tkazish uchun
+        
+        Args:
+            group_name: Oldindan olingan guruh nomi (berilsa relationship yuklanmaydi)
+        """
+        if group_name is None and self.group:
+            group_name = self.group.name
         return {
             'id': self.id,
             'first_name': self.first_name,
@@ -208,24 +303,109 @@ class Student(db.Model):
             'full_name': self.full_name,
             'full_name_with_middle': self.full_name_with_middle,
             'group_id': self.group_id,
-            'group_name': self.group.name if self.group else None,
+            'group_name': group_name,
             'active': self.active
         }
     
+    @staticmethod
+    def encode_cursor(student):
+        """Keyset kursori - (group_id, first_name, id) dan URL-xavfsiz satr"""
+        raw = json.dumps([student.group_id, student.first_name, student.id])
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+    
+    @staticmethod
+    def decode_cursor(cursor):
+        """
+        Kursorni ochish
+        
+        Raises:
+            ValueError: Kursor noto'g'ri bo'lsa
+        """
+        try:
+            group_id, first_name, student_id = json.loads(
+                base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+            )
+        except (TypeError, ValueError, UnicodeError, base64.binascii.Error):
+            raise ValueError("Noto'g'ri kursor")
+        if not isinstance(group_id, int) or not isinstance(student_id, int) \
+                or not isinstance(first_name, str):
+            raise ValueError("Noto'g'ri kursor")
+        return group_id, first_name, student_id
+    
+    @staticmethod
+    def list_page(limit=None, cursor=None, group_id=None, search=None, status='active'):
+        """
+        Talabalar ro'yxatining bitta sahifasi (keyset pagination)
+        Tartib: guruh, ism, id - OFFSET ishlatilmaydi, har bir sahifa bitta so'rov
+        
+        Args:
+            limit: Sahifa hajmi (MAX_PAGE_SIZE gacha)
+            cursor: Oldingi sahifaning next_cursor qiymati
+            group_id: Faqat bitta guruh
+            search: Ism/otchestvo/familiya bo'yicha qidiruv
+            status: 'active', 'inactive' yoki 'all'
+        
+        Returns:
+            dict: {'items': [...], 'next_cursor': str yoki None}
+        """
+        limit = min(max(limit or Student.PAGE_SIZE, 1), Student.MAX_PAGE_SIZE)
+        
+        query = db.session.query(Student, Group.name).join(
+            Group, Student.group_id == Group.id
+        )
+        
+        if status == 'active':
+            query = query.filter(Student.active == True)
+        elif status == 'inactive':
+            query = query.filter(Student.active == False)
+        
+        if group_id:
+            query = query.filter(Student.group_id == group_id)
+        
+        if search:
+            pattern = f"%{search}%"
+            query = query.filter(db.or_(
+                Student.first_name.ilike(pattern),
+                Student.last_name.ilike(pattern),
+                Student.middle_name.ilike(pattern)
+            ))
+        
+        if cursor:
+            query = query.filter(
+                db.tuple_(Student.group_id, Student.first_name, Student.id)
+                > db.tuple_(*Student.decode_cursor(cursor))
+            )
+        
+        rows = query.order_by(
+            Student.group_id, Student.first_name, Student.id
+        ).limit(limit + 1).all()
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        return {
+            'items': [student.to_dict(group_name) for student, group_name in rows],
+            'next_cursor': Student.encode_cursor(rows[-1][0]) if has_more else None
+        }
+    
     def get_attendance_stats(self, start_date=None, end_date=None):
         """
-        Talabaning statistikasini olish
+        Talabaning statistikasini olish - bitta shartli agregat so'rov
         """
-        query = Attendance.query.filter_by(student_id=self.id)
+        query = db.session.query(
+            db.func.count(Attendance.id),
+            db.func.sum(db.case([(Attendance.status == 'present', 1)], else_=0)),
+            db.func.sum(db.case([(Attendance.status == 'absent', 1)], else_=0))
+        ).filter(Attendance.student_id == self.id)
         
         if start_date:
             query = query.filter(Attendance.date >= start_date)
         if end_date:
             query = query.filter(Attendance.date <= end_date)
         
-        total = query.count()
-        present = query.filter_by(status='present').count()
-        absent = query.filter_by(status='absent').count()
+        total, present, absent = query.one()
+        present = present or 0
+        absent = absent or 0
         
         percentage = (present / total * 100) if total > 0 else 0
         
@@ -253,6 +433,8 @@ class Attendance(db.Model):
     # MUHIM: Bir talaba bir kunda faqat BIR marta yozilishi uchun
     __table_args__ = (
         db.UniqueConstraint('student_id', 'date', name='unique_student_date'),
+        # Sana (oraliq) bo'yicha hisobotlar va status sanoqlari
+        db.Index('ix_attendance_date_status', 'date', 'status'),
     )
     
     def __repr__(self):
@@ -284,14 +466,102 @@ class Attendance(db.Model):
             query = query.filter(Student.group_id == group_id)
         
         return query.all()
-    
+
+    @staticmethod
+    def get_roster(date, group_id=None):
+        """
+        Davomat sahifasi uchun ro'yxat - BITTA so'rov bilan
+        Aktiv talabalar + guruh nomi + o'sha sanadagi status (LEFT JOIN)
+
+        Returns:
+            list: dict'lar ro'yxati (keshda saqlash uchun ORM obyektlarsiz)
+        """
+        query = db.session.query(
+            Student.id,
+            Student.first_name,
+            Student.middle_name,
+            Student.last_name,
+            Student.group_id,
+            Group.name,
+            Attendance.status
+        ).join(
+            Group, Student.group_id == Group.id
+        ).outerjoin(
+            Attendance,
+            db.and_(
+                Attendance.student_id == Student.id,
+                Attendance.date == date
+            )
+        ).filter(Student.active == True)
+
+        if group_id:
+            query = query.filter(Student.group_id == group_id)
+
+        rows = query.order_by(Student.first_name, Student.id).all()
+
+        roster = []
+        for student_id, first_name, middle_name, last_name, st_group_id, group_name, status in rows:
+            if middle_name:
+                full_name = f"{first_name} {middle_name} {last_name}"
+            else:
+                full_name = f"{first_name} {last_name}"
+
+            roster.append({
+                'student_id': student_id,
+                'full_name_with_middle': full_name,
+                'group_id': st_group_id,
+                'group_name': group_name,
+                'status': status
+            })
+
+        return roster
+
+    @staticmethod
+    def get_day_summary(date, group_id=None):
+        """
+        Sana bo'yicha qisqa statistika - bitta agregat so'rov
+        (aktiv talabalar soni, kelgan, kelmagan, belgilanmagan)
+        """
+        query = db.session.query(
+            db.func.count(Student.id),
+            db.func.sum(db.case([(Attendance.status == 'present', 1)], else_=0)),
+            db.func.sum(db.case([(Attendance.status == 'absent', 1)], else_=0))
+        ).outerjoin(
+            Attendance,
+            db.and_(
+                Attendance.student_id == Student.id,
+                Attendance.date == date
+            )
+        ).filter(Student.active == True)
+
+        if group_id:
+            query = query.filter(Student.group_id == group_id)
+
+        total, present, absent = query.one()
+        total = total or 0
+        present = present or 0
+        absent = absent or 0
+
+        return {
+            'total': total,
+            'present': present,
+            'absent': absent,
+            'unmarked': total - present - absent
+        }
+
     @staticmethod
     def mark_attendance(student_id, date, status):
         """
         Davomatni belgilash yoki yangilash
         Agar avvaldan mavjud bo'lsa - yangilaydi
         Aks holda - yangi qo'shadi
+        Guruhning kunlik rollup'i shu tranzaksiyada yangilanadi
         """
+        from rollups import lock_rollups, refresh_rollups
+        
+        group_id = db.session.query(Student.group_id).filter_by(id=student_id).scalar()
+        lock_rollups([group_id], date)
+        
         existing = Attendance.query.filter_by(
             student_id=student_id,
             date=date
@@ -300,28 +570,249 @@ class Attendance(db.Model):
         if existing:
             # Mavjud davomatni yangilash
             existing.status = status
-            return existing
+            attendance = existing
         else:
             # Yangi davomat qo'shish
-            new_attendance = Attendance(
+            attendance = Attendance(
                 student_id=student_id,
                 date=date,
                 status=status
             )
-            db.session.add(new_attendance)
-            return new_attendance
+            db.session.add(attendance)
+        
+        db.session.flush()
+        refresh_rollups([group_id], date)
+        return attendance
+
+
+class IdempotencyKey(db.Model):
+    """
+    Takroriy so'rovlardan himoya (idempotency)
+    Batch saqlash javobi kalit bilan birga saqlanadi - qayta yuborilgan
+    so'rov davomatni ikkinchi marta yozmaydi, avvalgi javob qaytariladi.
+    Kalit so'rov tanasining hash'i va foydalanuvchiga bog'lanadi - boshqa
+    ma'lumot bilan qayta ishlatilgan kalit javobni takrorlamaydi.
+    """
+    __tablename__ = 'idempotency_keys'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(64), unique=True, nullable=False, index=True)
+    request_hash = db.Column(db.String(64))
+    username = db.Column(db.String(100))
+    response = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    MAX_KEY_LENGTH = 64
+    
+    __table_args__ = (
+        db.Index('ix_idempotency_keys_created_at', 'created_at'),
+    )
+    
+    def __repr__(self):
+        return f'<IdempotencyKey {self.key}>'
+    
+    @staticmethod
+    def request_hash_for(payload):
+        """
+        So'rov tanasining normallashtirilgan hash'i (kalitlar tartibi va
+        bo'sh joylarga bog'liq emas)
+        
+        Returns:
+            str: sha256 hex
+        """
+        canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def get_response(key, request_hash, username):
+        """
+        Kalit uchun saqlangan javobni olish
+        
+        Returns:
+            tuple: (javob dict yoki None, mos keladimi) - kalit yo'q bo'lsa (None, True);
+                   kalit boshqa so'rov tanasi yoki foydalanuvchi bilan saqlangan
+                   bo'lsa (None, False)
+        """
+        row = db.session.query(
+            IdempotencyKey.response,
+            IdempotencyKey.request_hash,
+            IdempotencyKey.username
+        ).filter_by(key=key).first()
+        if row is None:
+            return None, True
+        if row.request_hash != request_hash or row.username != username:
+            return None, False
+        return json.loads(row.response), True
+    
+    @staticmethod
+    def record(key, request_hash, username, response):
+        """
+        Javobni kalit bilan saqlash (commit chaqiruvchi tomonidan -
+        davomat yozuvlari bilan BITTA tranzaksiyada)
+        """
+        db.session.add(IdempotencyKey(
+            key=key,
+            request_hash=request_hash,
+            username=username,
+            response=json.dumps(response)
+        ))
+    
+    @staticmethod
+    def purge_older_than(hours=24):
+        """
+        Eski kalitlarni o'chirish
+        
+        Returns:
+            int: O'chirilgan kalitlar soni
+        """
+        cutoff = datetime.utcnow() - timedelta(hours=hours)
+        count = IdempotencyKey.query.filter(
+            IdempotencyKey.created_at < cutoff
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return count
+
+
+class DailyGroupRollup(db.Model):
+    """
+    Kunlik guruh statistikasi (rollup)
+    Har bir (guruh, sana) uchun tayyor sanoqlar - dashboard va oraliq
+    statistikasi xom attendance qatorlarini sanamasdan shu jadvaldan o'qiydi.
+    Davomat yozilgan tranzaksiyaning o'zida yangilanadi (rollups.py).
+    """
+    __tablename__ = 'daily_group_rollup'
+    
+    group_id = db.Column(db.Integer, db.ForeignKey('groups.id'), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    present = db.Column(db.Integer, nullable=False, default=0)
+    absent = db.Column(db.Integer, nullable=False, default=0)
+    active_total = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_daily_group_rollup_date', 'date'),
+    )
+    
+    def __repr__(self):
+        return f'<DailyGroupRollup {self.group_id} - {self.date}>'
+
+
+class SecurityEvent(db.Model):
+    """
+    Xavfsizlik hodisalari (login, logout, token, sessiya)
+    audit.py fon thread'i to'plamlab yozadi - so'rov ichida INSERT yo'q
+    """
+    __tablename__ = 'security_events'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    event_type = db.Column(db.String(50), nullable=False)
+    username = db.Column(db.String(100))
+    ip_address = db.Column(db.String(50))
+    user_agent = db.Column(db.String(500))
+    details = db.Column(db.String(500))
+    
+    PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+    
+    __table_args__ = (
+        db.Index('ix_security_events_created_at', 'created_at'),
+        db.Index('ix_security_events_type_id', 'event_type', 'id'),
+        db.Index('ix_security_events_ip_id', 'ip_address', 'id'),
+    )
+    
+    def __repr__(self):
+        return f'<SecurityEvent {self.event_type} - {self.created_at}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'created_at': self.created_at.isoformat(),
+            'event_type': self.event_type,
+            'username': self.username,
+            'ip_address': self.ip_address,
+            'user_agent': self.user_agent,
+            'details': self.details
+        }
+    
+    @staticmethod
+    def list_page(limit=None, before=None, event_type=None, ip_address=None):
+        """
+        Hodisalar sahifasi - eng yangisidan, keyset (id) bo'yicha
+        
+        Args:
+            limit: Sahifa hajmi
+            before: Oldingi sahifaning next_cursor qiymati (id)
+            event_type: Hodisa turi filtri
+            ip_address: IP filtri
+        
+        Returns:
+            dict: {'items': [...], 'next_cursor': int yoki None}
+        """
+        limit = min(max(limit or SecurityEvent.PAGE_SIZE, 1), SecurityEvent.MAX_PAGE_SIZE)
+        
+        query = SecurityEvent.query
+        if event_type:
+            query = query.filter(SecurityEvent.event_type == event_type)
+        if ip_address:
+            query = query.filter(SecurityEvent.ip_address == ip_address)
+        if before:
+            query = query.filter(SecurityEvent.id < before)
+        
+        rows = query.order_by(SecurityEvent.id.desc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        return {
+            'items': [event.to_dict() for event in rows],
+            'next_cursor': rows[-1].id if has_more else None
+        }
+
+
+class SchedulerLease(db.Model):
+    """
+    Scheduler lideri uchun muddatli qulf qatori (PostgreSQL'dan boshqa
+    database'larda - scheduler.LeaseLeader)
+    """
+    __tablename__ = 'scheduler_leases'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    owner = db.Column(db.String(100))
+    expires_at = db.Column(db.DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f'<SchedulerLease {self.name} - {self.owner}>'
 
 
 # Helper funksiyalar
 
+def dialect_insert(table):
+    """
+    ON CONFLICT qo'llab-quvvatlaydigan INSERT konstruktsiyasi
+    
+    Returns:
+        SQLite/PostgreSQL uchun insert(table), boshqa dialektlar uchun None
+    """
+    from sqlalchemy.dialects import postgresql, sqlite
+    
+    dialects = {
+        'sqlite': sqlite.insert,
+        'postgresql': postgresql.insert,
+    }
+    insert = dialects.get(db.engine.dialect.name)
+    return insert(table) if insert else None
+
+
 def init_db(app):
     """
     Database'ni ishga tushirish
+    Sxema migratsiyalar orqali yaratiladi/yangilanadi (migrations.py)
     """
+    from migrations import check_schema
+    
     db.init_app(app)
-    with app.app_context():
-        db.create_all()
-        print("✅ Database yaratildi!")
+    check_schema(app)
+    print("✅ Database ulandi!")
 
 
 def seed_data():
@@ -0,0 +1,275 @@
+"""
+Rate Limit Backends
+Sliding-window hisoblagichlari uchun saqlash joylari (security.RateLimiter)
+
+Har bir kalit uchun faqat ikkita son saqlanadi - joriy va oldingi oynadagi
+urinishlar soni (O(1) xotira). Backend'lar:
+
+    memory                      - worker xotirasi (bitta worker / test)
+    sqlite:////path/limits.db   - umumiy SQLite fayl (bitta serverdagi barcha worker'lar)
+    redis://[:parol@]host:6379/0 - Redis protokoli (bir nechta server)
+
+Redis backend tashqi kutubxonasiz, RESP protokolini to'g'ridan-to'g'ri
+ishlatadi - Redis, KeyDB, Dragonfly yoki lokal stand-in server bilan ishlaydi.
+"""
+
+import os
+import socket
+import sqlite3
+import threading
+from urllib.parse import unquote, urlparse
+
+
+class MemoryBackend:
+    """
+    Worker xotirasidagi hisoblagichlar: kalit -> [oyna, joriy, oldingi]
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _rotate(entry, window):
+        start, current, previous = entry
+        if start == window:
+            return entry
+        if start == window - 1:
+            return [window, 0, current]
+        return [window, 0, 0]
+
+    def counts(self, key, window, window_seconds):
+        """
+        Returns:
+            tuple: (oldingi oyna soni, joriy oyna soni)
+        """
+        with self.lock:
+            entry = self.counters.get(key)
+            if entry is None:
+                return 0, 0
+            _, current, previous = self._rotate(entry, window)
+            return previous, current
+
+    def increment(self, key, window, window_seconds):
+        with self.lock:
+            entry = self._rotate(self.counters.get(key, [window, 0, 0]), window)
+            entry[1] += 1
+            self.counters[key] = entry
+
+    def reset(self, key, window):
+        with self.lock:
+            self.counters.pop(key, None)
+
+    def cleanup(self, window):
+        with self.lock:
+            for key in [k for k, entry in self.counters.items() if entry[0] < window - 1]:
+                del self.counters[key]
+
+
+class SQLiteBackend:
+    """
+    Umumiy SQLite fayldagi hisoblagichlar (bitta serverdagi worker'lar uchun)
+
+    Oshirish bitta atomar UPSERT - oyna almashishi ham shu so'rov ichida.
+    Fayl va jadval birinchi ishlatilganda yaratiladi - import paytida
+    (create_app) hech narsa ochilmaydi.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS rate_limits ("
+                    " key TEXT PRIMARY KEY,"
+                    " window_index INTEGER NOT NULL,"
+                    " current INTEGER NOT NULL,"
+                    " previous INTEGER NOT NULL)"
+                )
+            self.local.conn = conn
+        return conn
+
+    def counts(self, key, window, window_seconds):
+        row = self._connection().execute(
+            "SELECT window_index, current, previous FROM rate_limits WHERE key = ?",
+            (key,)
+        ).fetchone()
+        if row is None:
+            return 0, 0
+        _, current, previous = MemoryBackend._rotate(list(row), window)
+        return previous, current
+
+    def increment(self, key, window, window_seconds):
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO rate_limits (key, window_index, current, previous)"
+                " VALUES (?, ?, 1, 0)"
+                " ON CONFLICT(key) DO UPDATE SET"
+                "  previous = CASE"
+                "   WHEN excluded.window_index = window_index THEN previous"
+                "   WHEN excluded.window_index = window_index + 1 THEN current"
+                "   ELSE 0 END,"
+                "  current = CASE"
+                "   WHEN excluded.window_index = window_index THEN current + 1"
+                "   ELSE 1 END,"
+                "  window_index = excluded.window_index",
+                (key, window)
+            )
+
+    def reset(self, key, window):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+    def cleanup(self, window):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM rate_limits WHERE window_index < ?", (window - 1,))
+
+
+class RedisError(Exception):
+    """Redis server xato javobi yoki ulanish xatosi"""
+
+
+class RedisBackend:
+    """
+    Redis protokoli (RESP) orqali hisoblagichlar
+
+    Har bir oyna alohida kalit: {prefix}:{kalit}:{oyna}, 2 oyna TTL bilan -
+    eski kalitlar Redis tomonidan o'chiriladi, cleanup kerak emas.
+    Har bir tekshiruv/oshirish - bitta round-trip (pipelining).
+    """
+
+    def __init__(self, url, prefix='davomat:rl', timeout=2):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.prefix = prefix
+        self.timeout = timeout
+        self.sock = None
+        self.reader = None
+        self.lock = threading.Lock()
+
+    # ---------- RESP ----------
+
+    @staticmethod
+    def _encode(*args):
+        parts = [f'*{len(args)}\r\n'.encode()]
+        for arg in args:
+            data = str(arg).encode()
+            parts.append(b'$%d\r\n%s\r\n' % (len(data), data))
+        return b''.join(parts)
+
+    def _read_reply(self):
+        line = self.reader.readline()
+        if not line:
+            raise RedisError('Ulanish uzildi')
+        kind, payload = line[:1], line[1:-2]
+
+        if kind == b'+':
+            return payload.decode()
+        if kind == b'-':
+            raise RedisError(payload.decode())
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self.reader.read(length + 2)
+            return data[:-2].decode()
+        if kind == b'*':
+            length = int(payload)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise RedisError(f"Noma'lum javob: {line!r}")
+
+    def _connect(self):
+        self.sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile('rb')
+        if self.password:
+            self._send([('AUTH', self.password)])
+        if self.db:
+            self._send([('SELECT', self.db)])
+
+    def _send(self, commands):
+        self.sock.sendall(b''.join(self._encode(*command) for command in commands))
+        return [self._read_reply() for _ in commands]
+
+    def execute(self, *commands):
+        """
+        Buyruqlarni bitta round-trip'da yuborish
+
+        Returns:
+            list: Har bir buyruq javobi
+        """
+        with self.lock:
+            try:
+                if self.sock is None:
+                    self._connect()
+                return self._send(commands)
+            except (OSError, RedisError):
+                self._close()
+                raise
+
+    def _close(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+        self.sock = None
+        self.reader = None
+
+    # ---------- Backend ----------
+
+    def _key(self, key, window):
+        return f'{self.prefix}:{key}:{window}'
+
+    def counts(self, key, window, window_seconds):
+        previous, current = self.execute(
+            ('MGET', self._key(key, window - 1), self._key(key, window))
+        )[0]
+        return int(previous or 0), int(current or 0)
+
+    def increment(self, key, window, window_seconds):
+        name = self._key(key, window)
+        self.execute(('INCR', name), ('EXPIRE', name, window_seconds * 2))
+
+    def reset(self, key, window):
+        self.execute(('DEL', self._key(key, window - 1), self._key(key, window)))
+
+    def cleanup(self, window):
+        # Kalitlar TTL bilan o'zi o'chadi
+        pass
+
+
+def create_backend(url):
+    """
+    URL bo'yicha backend yaratish
+
+    Args:
+        url: 'memory', 'sqlite:////path/file.db' yoki 'redis://host:port/db'
+
+    Returns:
+        Backend obyekti
+    """
+    if not url or url == 'memory':
+        return MemoryBackend()
+    if url.startswith('sqlite:///'):
+        return SQLiteBackend(url[len('sqlite:///'):])
+    if url.startswith('redis://'):
+        return RedisBackend(url)
+    raise ValueError(f"Noma'lum rate limit backend: {url}")
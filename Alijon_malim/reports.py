@@ -0,0 +1,562 @@
+"""
+Report Service Module
+Hisobotlar uchun umumiy servis - HTML, Excel va JSON bir xil ma'lumotdan
+
+Barcha guruhlar bo'yicha kunlik hisobot BITTA so'rov bilan olinadi:
+guruh -> aktiv talabalar -> o'sha sanadagi davomat (LEFT JOIN),
+guruh va ism bo'yicha tartiblangan qatorlar Python'da guruhlanadi.
+Excel export uchun xuddi shu so'rov generator sifatida (iter_*) o'qiladi.
+Sana oralig'i matritsasi (talaba x kun) ham bitta so'rovdan, pandas/numpy
+bilan vektorli yig'iladi.
+"""
+
+from datetime import timedelta
+
+from models import db, Group, Student, Attendance, DailyGroupRollup
+from rollups import range_totals
+
+
+# Katta hisobotlarda bir marta o'qiladigan qatorlar soni
+YIELD_PER = 500
+
+# Talaba tarixining bitta sahifasi
+HISTORY_PAGE_SIZE = 50
+
+# Matritsa kodlari (talaba x kun)
+MARK_NONE = 0
+MARK_PRESENT = 1
+MARK_ABSENT = 2
+
+
+def _percentage(present, total):
+    return round(present / total * 100, 1) if total > 0 else 0
+
+
+class ReportService:
+    """
+    Davomat hisobotlarini tayyorlash
+    """
+
+    @staticmethod
+    def _daily_rows(date, group_id=None):
+        """
+        Guruh -> aktiv talabalar -> davomat (LEFT JOIN) qatorlari,
+        guruh va ism bo'yicha tartiblangan, YIELD_PER qatordan o'qiladi
+        """
+        query = db.session.query(
+            Group.id,
+            Group.name,
+            Student.id,
+            Student.first_name,
+            Student.middle_name,
+            Student.last_name,
+            Attendance.status
+        ).outerjoin(
+            Student,
+            db.and_(
+                Student.group_id == Group.id,
+                Student.active == True
+            )
+        ).outerjoin(
+            Attendance,
+            db.and_(
+                Attendance.student_id == Student.id,
+                Attendance.date == date
+            )
+        )
+
+        if group_id:
+            query = query.filter(Group.id == group_id)
+
+        return query.order_by(
+            Group.name, Group.id, Student.first_name, Student.id
+        ).yield_per(YIELD_PER)
+
+    @staticmethod
+    def iter_daily_report(date, group_id=None, include_empty=False):
+        """
+        Kunlik hisobot guruhlarini birma-bir qaytarish (generator)
+        Xotirada bir vaqtda faqat bitta guruh turadi - katta export'lar uchun
+
+        Args:
+            date: Hisobot sanasi
+            group_id: Faqat bitta guruh (ixtiyoriy)
+            include_empty: Talabasi yo'q guruhlarni ham qaytarish
+
+        Yields:
+            dict: daily_report() elementlari bilan bir xil
+        """
+        current = None
+
+        for g_id, g_name, student_id, first_name, middle_name, last_name, status in \
+                ReportService._daily_rows(date, group_id):
+            if current is None or current['group_id'] != g_id:
+                if current is not None and (include_empty or current['total'] > 0):
+                    current['percentage'] = _percentage(current['present'], current['total'])
+                    yield current
+                current = {
+                    'group_id': g_id,
+                    'group_name': g_name,
+                    'students': [],
+                    'total': 0,
+                    'present': 0,
+                    'absent': 0,
+                    'unmarked': 0
+                }
+
+            # Talabasi yo'q guruh (LEFT JOIN bo'sh qatori)
+            if student_id is None:
+                continue
+
+            current['students'].append({
+                'student_id': student_id,
+                'first_name': first_name,
+                'middle_name': middle_name,
+                'last_name': last_name,
+                'status': status
+            })
+            current['total'] += 1
+            if status == 'present':
+                current['present'] += 1
+            elif status == 'absent':
+                current['absent'] += 1
+            else:
+                current['unmarked'] += 1
+
+        if current is not None and (include_empty or current['total'] > 0):
+            current['percentage'] = _percentage(current['present'], current['total'])
+            yield current
+
+    @staticmethod
+    def daily_report(date, group_id=None, include_empty=False):
+        """
+        Kunlik hisobot - har bir guruh uchun statistika va talabalar statusi
+        (bitta so'rov)
+
+        Args:
+            date: Hisobot sanasi
+            group_id: Faqat bitta guruh (ixtiyoriy)
+            include_empty: Talabasi yo'q guruhlarni ham qaytarish
+
+        Returns:
+            list: [{
+                'group_id', 'group_name',
+                'students': [{'student_id', 'first_name', 'middle_name',
+                              'last_name', 'status'}],
+                'total', 'present', 'absent', 'unmarked', 'percentage'
+            }]
+        """
+        return list(ReportService.iter_daily_report(date, group_id, include_empty))
+
+    @staticmethod
+    def iter_group_students(date, group_id):
+        """
+        Bitta guruh talabalari va statuslari (generator, YIELD_PER qatordan)
+
+        Yields:
+            dict: {'student_id', 'first_name', 'middle_name', 'last_name', 'status'}
+        """
+        query = db.session.query(
+            Student.id,
+            Student.first_name,
+            Student.middle_name,
+            Student.last_name,
+            Attendance.status
+        ).outerjoin(
+            Attendance,
+            db.and_(
+                Attendance.student_id == Student.id,
+                Attendance.date == date
+            )
+        ).filter(
+            Student.group_id == group_id,
+            Student.active == True
+        ).order_by(Student.first_name, Student.id).yield_per(YIELD_PER)
+
+        for student_id, first_name, middle_name, last_name, status in query:
+            yield {
+                'student_id': student_id,
+                'first_name': first_name,
+                'middle_name': middle_name,
+                'last_name': last_name,
+                'status': status
+            }
+
+    @staticmethod
+    def dashboard_stats(date):
+        """
+        Dashboard statistikasi - kunlik rollup'lardan bitta so'rov
+        (guruhlar soniga bog'liq, talabalar soniga emas)
+
+        O'sha kun uchun rollup qatori hali yo'q guruhda (bugun hech kim
+        belgilanmagan, scheduler hali yangilamagan) aktiv talabalar soni
+        guruhning oxirgi rollup qatoridan olinadi.
+
+        Returns:
+            dict: total (belgilanganlar), present, absent, unmarked, percentage,
+                  total_students, total_groups,
+                  groups: [{'group_id', 'group_name', 'total', 'present',
+                            'absent', 'unmarked', 'percentage'}]
+        """
+        latest = db.aliased(DailyGroupRollup)
+        last_active_total = db.session.query(latest.active_total).filter(
+            latest.group_id == Group.id
+        ).order_by(latest.date.desc()).limit(1).correlate(Group).scalar_subquery()
+
+        rows = db.session.query(
+            Group.id,
+            Group.name,
+            db.func.coalesce(DailyGroupRollup.active_total, last_active_total, 0),
+            db.func.coalesce(DailyGroupRollup.present, 0),
+            db.func.coalesce(DailyGroupRollup.absent, 0)
+        ).outerjoin(
+            DailyGroupRollup,
+            db.and_(
+                DailyGroupRollup.group_id == Group.id,
+                DailyGroupRollup.date == date
+            )
+        ).order_by(Group.name).all()
+
+        groups = []
+        for g_id, g_name, total, present, absent in rows:
+            groups.append({
+                'group_id': g_id,
+                'group_name': g_name,
+                'total': total,
+                'present': present,
+                'absent': absent,
+                'unmarked': max(total - present - absent, 0),
+                'percentage': _percentage(present, total)
+            })
+
+        total_students = sum(g['total'] for g in groups)
+        present = sum(g['present'] for g in groups)
+        absent = sum(g['absent'] for g in groups)
+
+        return {
+            'total': present + absent,
+            'present': present,
+            'absent': absent,
+            'unmarked': max(total_students - present - absent, 0),
+            'percentage': _percentage(present, present + absent),
+            'total_students': total_students,
+            'total_groups': len(groups),
+            'groups': groups
+        }
+
+    @staticmethod
+    def _student_rows(student_id, start_date, end_date, before=None, limit=None):
+        """
+        Talabaning sana oralig'idagi yozuvlari - (student_id, date) unique
+        indeksi bo'yicha bitta range scan, sana kamayish tartibida
+        """
+        query = db.session.query(Attendance.date, Attendance.status).filter(
+            Attendance.student_id == student_id,
+            Attendance.date >= start_date,
+            Attendance.date <= end_date
+        )
+        if before:
+            query = query.filter(Attendance.date < before)
+
+        query = query.order_by(Attendance.date.desc())
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+    @staticmethod
+    def _history_page(rows, limit):
+        items = [
+            {'date': row_date.isoformat(), 'status': status}
+            for row_date, status in rows[:limit]
+        ]
+        next_cursor = items[-1]['date'] if len(rows) > limit else None
+        return {'items': items, 'next_cursor': next_cursor}
+
+    @staticmethod
+    def student_report(student_id, start_date, end_date, history_limit=HISTORY_PAGE_SIZE):
+        """
+        Talaba hisoboti - BITTA range scan'dan:
+        jami, foiz, eng uzun ketma-ket kelmaslik, oylik kalendar va tarixning
+        birinchi sahifasi
+
+        Ketma-ket kelmaslik belgilangan kunlar bo'yicha sanaladi: dars
+        bo'lmagan (belgilanmagan) kunlar seriyani uzmaydi.
+
+        Returns:
+            dict: {
+                'stats': {'total', 'present', 'absent', 'percentage',
+                          'longest_absence_streak', 'current_absence_streak'},
+                'calendar': [{'month': 'YYYY-MM', 'days': {'D': status},
+                              'present', 'absent'}],
+                'history': {'items': [{'date', 'status'}], 'next_cursor'}
+            }
+        """
+        rows = ReportService._student_rows(student_id, start_date, end_date)
+
+        present = 0
+        absent = 0
+        longest = 0
+        streak = 0
+        months = {}
+
+        # Hisob-kitob uchun o'sish tartibida
+        for row_date, status in reversed(rows):
+            if status == 'absent':
+                absent += 1
+                streak += 1
+                longest = max(longest, streak)
+            else:
+                present += 1
+                streak = 0
+
+            key = f'{row_date.year:04d}-{row_date.month:02d}'
+            month = months.get(key)
+            if month is None:
+                month = months[key] = {'month': key, 'days': {}, 'present': 0, 'absent': 0}
+            month['days'][str(row_date.day)] = status
+            month['absent' if status == 'absent' else 'present'] += 1
+
+        total = present + absent
+
+        return {
+            'stats': {
+                'total': total,
+                'present': present,
+                'absent': absent,
+                'percentage': _percentage(present, total),
+                'longest_absence_streak': longest,
+                'current_absence_streak': streak
+            },
+            'calendar': list(months.values()),
+            'history': ReportService._history_page(rows, history_limit)
+        }
+
+    @staticmethod
+    def student_history(student_id, start_date, end_date, before=None, limit=HISTORY_PAGE_SIZE):
+        """
+        Talaba tarixining keyingi sahifasi (keyset: sana < before)
+
+        Returns:
+            dict: {'items': [{'date', 'status'}], 'next_cursor': 'YYYY-MM-DD' yoki None}
+        """
+        rows = ReportService._student_rows(
+            student_id, start_date, end_date, before=before, limit=limit + 1
+        )
+        return ReportService._history_page(rows, limit)
+
+    @staticmethod
+    def summarize(report):
+        """
+        Guruhlar hisobotidan umumiy statistika
+        """
+        total = sum(g['total'] for g in report)
+        present = sum(g['present'] for g in report)
+        absent = sum(g['absent'] for g in report)
+
+        return {
+            'groups': len(report),
+            'total': total,
+            'present': present,
+            'absent': absent,
+            'unmarked': total - present - absent,
+            'percentage': _percentage(present, total)
+        }
+
+    @staticmethod
+    def range_stats(start_date, end_date):
+        """
+        Sana oralig'i bo'yicha umumiy statistika - kunlik rollup'lardan
+        (xom attendance qatorlari sanalmaydi)
+
+        Returns:
+            dict: total_records, total_present, total_absent, attendance_percentage
+        """
+        totals = range_totals(start_date, end_date)
+
+        return {
+            'total_records': totals['total'],
+            'total_present': totals['present'],
+            'total_absent': totals['absent'],
+            'attendance_percentage': _percentage(totals['present'], totals['total'])
+        }
+
+    @staticmethod
+    def range_matrix(start_date, end_date, group_id=None):
+        """
+        Sana oralig'i bo'yicha talaba x kun davomat matritsasi (bitta so'rov)
+
+        Args:
+            start_date: Boshlanish sanasi
+            end_date: Tugash sanasi (kiradi)
+            group_id: Faqat bitta guruh (ixtiyoriy)
+
+        Returns:
+            dict: {
+                'start_date', 'end_date',
+                'days': [date, ...],
+                'students': DataFrame (student_id, group_name, first_name,
+                                       middle_name, last_name),
+                'matrix': np.ndarray (talabalar x kunlar, MARK_* kodlari),
+                'student_present', 'student_absent', 'student_percentage': np.ndarray,
+                'day_present', 'day_absent': np.ndarray
+            }
+        """
+        # Og'ir kutubxonalar faqat matritsa kerak bo'lganda yuklanadi
+        import numpy as np
+        import pandas as pd
+
+        query = db.session.query(
+            Student.id,
+            Group.name,
+            Student.first_name,
+            Student.middle_name,
+            Student.last_name,
+            Attendance.date,
+            Attendance.status
+        ).join(
+            Group, Student.group_id == Group.id
+        ).outerjoin(
+            Attendance,
+            db.and_(
+                Attendance.student_id == Student.id,
+                Attendance.date >= start_date,
+                Attendance.date <= end_date
+            )
+        ).filter(Student.active == True)
+
+        if group_id:
+            query = query.filter(Student.group_id == group_id)
+
+        rows = query.order_by(
+            Group.name, Group.id, Student.first_name, Student.id
+        ).yield_per(YIELD_PER)
+
+        df = pd.DataFrame(list(rows), columns=[
+            'student_id', 'group_name', 'first_name', 'middle_name',
+            'last_name', 'date', 'status'
+        ])
+
+        days = pd.date_range(start_date, end_date, freq='D')
+
+        # Talabalar so'rovdagi tartibda (guruh, ism)
+        students = df.drop_duplicates('student_id')[[
+            'student_id', 'group_name', 'first_name', 'middle_name', 'last_name'
+        ]].reset_index(drop=True)
+
+        matrix = np.full((len(students), len(days)), MARK_NONE, dtype=np.int8)
+
+        marked = df[df['date'].notna()]
+        if len(marked):
+            rows_idx = pd.Index(students['student_id']).get_indexer(marked['student_id'])
+            cols_idx = (pd.to_datetime(marked['date']) - days[0]).dt.days.to_numpy()
+            matrix[rows_idx, cols_idx] = np.where(
+                marked['status'].to_numpy() == 'present', MARK_PRESENT, MARK_ABSENT
+            )
+
+        present = matrix == MARK_PRESENT
+        absent = matrix == MARK_ABSENT
+        student_present = present.sum(axis=1)
+        student_absent = absent.sum(axis=1)
+        student_marked = student_present + student_absent
+
+        # Foiz - belgilangan kunlarga nisbatan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            student_percentage = np.where(
+                student_marked > 0,
+                np.round(student_present / student_marked * 100, 1),
+                0.0
+            )
+
+        return {
+            'start_date': start_date,
+            'end_date': end_date,
+            'days': [day.date() for day in days],
+            'students': students,
+            'matrix': matrix,
+            'student_present': student_present,
+            'student_absent': student_absent,
+            'student_percentage': student_percentage,
+            'day_present': present.sum(axis=0),
+            'day_absent': absent.sum(axis=0)
+        }
+
+    @staticmethod
+    def export_query(dataset, start_date=None, end_date=None, group_id=None):
+        """
+        Xom ma'lumot eksporti uchun ustunli so'rov (stream_export.stream_query uchun)
+
+        Args:
+            dataset: 'attendance', 'students' yoki 'groups'
+            start_date, end_date: attendance - davomat sanasi,
+                                  students - qo'shilgan sana bo'yicha (ixtiyoriy)
+            group_id: Faqat bitta guruh (ixtiyoriy)
+
+        Returns:
+            Query: Barqaror tartiblangan so'rov
+        """
+        if dataset == 'attendance':
+            query = db.session.query(
+                Attendance.id.label('id'),
+                Attendance.date.label('date'),
+                Attendance.student_id.label('student_id'),
+                Student.first_name.label('first_name'),
+                Student.middle_name.label('middle_name'),
+                Student.last_name.label('last_name'),
+                Student.group_id.label('group_id'),
+                Group.name.label('group_name'),
+                Attendance.status.label('status'),
+                Attendance.created_at.label('created_at')
+            ).join(
+                Student, Attendance.student_id == Student.id
+            ).join(
+                Group, Student.group_id == Group.id
+            )
+            if start_date:
+                query = query.filter(Attendance.date >= start_date)
+            if end_date:
+                query = query.filter(Attendance.date <= end_date)
+            if group_id:
+                query = query.filter(Student.group_id == group_id)
+            return query.order_by(Attendance.date, Attendance.student_id)
+
+        if dataset == 'students':
+            query = db.session.query(
+                Student.id.label('id'),
+                Student.first_name.label('first_name'),
+                Student.middle_name.label('middle_name'),
+                Student.last_name.label('last_name'),
+                Student.group_id.label('group_id'),
+                Group.name.label('group_name'),
+                Student.active.label('active'),
+                Student.created_at.label('created_at')
+            ).join(
+                Group, Student.group_id == Group.id
+            )
+            if start_date:
+                query = query.filter(Student.created_at >= start_date)
+            if end_date:
+                query = query.filter(Student.created_at < end_date + timedelta(days=1))
+            if group_id:
+                query = query.filter(Student.group_id == group_id)
+            return query.order_by(Student.id)
+
+        if dataset == 'groups':
+            counts = db.session.query(
+                Student.group_id.label('group_id'),
+                db.func.count(Student.id).label('total_students'),
+                db.func.sum(db.case([(Student.active == True, 1)], else_=0)).label('active_students')
+            ).group_by(Student.group_id).subquery()
+
+            query = db.session.query(
+                Group.id.label('id'),
+                Group.name.label('name'),
+                db.func.coalesce(counts.c.active_students, 0).label('active_students'),
+                db.func.coalesce(counts.c.total_students, 0).label('total_students')
+            ).outerjoin(
+                counts, counts.c.group_id == Group.id
+            )
+            if group_id:
+                query = query.filter(Group.id == group_id)
+            return query.order_by(Group.id)
+
+        raise ValueError(f"Noma'lum dataset: {dataset}")
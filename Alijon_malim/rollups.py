@@ -0,0 +1,328 @@
+"""
+Daily Rollup Module
+daily_group_rollup jadvalini yuritish - (guruh, sana) bo'yicha tayyor sanoqlar
+
+Yozish tartibi (davomat belgilanadigan har bir tranzaksiyada):
+    1. lock_rollups()    - tegishli rollup qatorlarini qulflash
+    2. davomatni yozish  - upsert
+    3. refresh_rollups() - faqat o'zgargan (guruh, sana) qatorlarini qayta sanash
+
+1-qadam PostgreSQL'da parallel belgilovchilarni bitta guruh/sana ichida
+ketma-ket qiladi: ikkinchi tranzaksiya birinchisi commit bo'lgandan keyin
+sanaydi va uning yozuvlarini ko'radi. SQLite'da yozuvlar baribir ketma-ket.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from models import db, Student, Attendance, DailyGroupRollup, dialect_insert
+from scheduler import scheduler
+
+
+# Backfill'da bitta tranzaksiyadagi kunlar soni
+BACKFILL_CHUNK_DAYS = 31
+
+
+def _present_sum():
+    return db.func.coalesce(
+        db.func.sum(db.case([(Attendance.status == 'present', 1)], else_=0)), 0
+    )
+
+
+def _absent_sum():
+    return db.func.coalesce(
+        db.func.sum(db.case([(Attendance.status == 'absent', 1)], else_=0)), 0
+    )
+
+
+def lock_rollups(group_ids, date):
+    """
+    (guruh, sana) rollup qatorlarini tranzaksiya oxirigacha qulflash
+    Qator bo'lmasa nol qiymatlar bilan yaratiladi
+    """
+    group_ids = sorted({g for g in group_ids if g})
+    if not group_ids:
+        return
+
+    now = datetime.utcnow()
+    stmt = dialect_insert(DailyGroupRollup.__table__)
+    if stmt is None:
+        return
+
+    stmt = stmt.values([
+        {'group_id': group_id, 'date': date, 'present': 0, 'absent': 0,
+         'active_total': 0, 'updated_at': now}
+        for group_id in group_ids
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['group_id', 'date'],
+        set_={'updated_at': stmt.excluded.updated_at}
+    )
+    db.session.execute(stmt)
+
+
+def refresh_rollups(group_ids, date):
+    """
+    Berilgan guruhlar uchun bitta sanadagi rollup'ni qayta hisoblash
+    Bitta INSERT ... SELECT ... ON CONFLICT DO UPDATE so'rovi
+    """
+    group_ids = sorted({g for g in group_ids if g})
+    if not group_ids:
+        return
+
+    select = db.select([
+        Student.group_id,
+        db.literal(date, type_=db.Date),
+        _present_sum(),
+        _absent_sum(),
+        db.func.count(Student.id),
+        db.literal(datetime.utcnow(), type_=db.DateTime),
+    ]).select_from(
+        db.outerjoin(
+            Student.__table__, Attendance.__table__,
+            db.and_(
+                Attendance.student_id == Student.id,
+                Attendance.date == date
+            )
+        )
+    ).where(
+        db.and_(
+            Student.group_id.in_(group_ids),
+            Student.active == True
+        )
+    ).group_by(Student.group_id)
+
+    columns = ['group_id', 'date', 'present', 'absent', 'active_total', 'updated_at']
+    stmt = dialect_insert(DailyGroupRollup.__table__)
+    existing = DailyGroupRollup.query.filter(
+        DailyGroupRollup.group_id.in_(group_ids),
+        DailyGroupRollup.date == date
+    )
+
+    if stmt is None:
+        existing.delete(synchronize_session=False)
+        db.session.execute(DailyGroupRollup.__table__.insert().from_select(columns, select))
+        return
+
+    # Aktiv talabasi qolmagan guruhlar SELECT'da chiqmaydi - avval nolga tushiriladi
+    existing.update(
+        {'present': 0, 'absent': 0, 'active_total': 0},
+        synchronize_session=False
+    )
+
+    stmt = stmt.from_select(columns, select)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['group_id', 'date'],
+        set_={
+            'present': stmt.excluded.present,
+            'absent': stmt.excluded.absent,
+            'active_total': stmt.excluded.active_total,
+            'updated_at': stmt.excluded.updated_at,
+        }
+    )
+    db.session.execute(stmt)
+
+
+def refresh_today(group_ids):
+    """
+    Guruh tarkibi o'zgarganda (talaba qo'shildi/o'chirildi/ko'chirildi)
+    bugungi rollup'ni yangilash - active_total to'g'ri qolishi uchun
+    """
+    db.session.flush()
+    refresh_rollups(group_ids, datetime.now().date())
+
+
+def refresh_recent(days=2):
+    """
+    Oxirgi kunlar rollup'ini barcha aktiv guruhlar uchun qayta sanash
+    (scheduler vazifasi - yozishda o'tkazib yuborilgan o'zgarishlarni tuzatadi)
+
+    Args:
+        days: Bugundan orqaga nechta kun
+
+    Returns:
+        int: Qayta sanalgan (guruh, sana) juftlari soni
+    """
+    group_ids = [
+        row[0] for row in db.session.query(Student.group_id).filter(
+            Student.active == True,
+            Student.group_id.isnot(None)
+        ).distinct()
+    ]
+    if not group_ids:
+        return 0
+
+    today = datetime.now().date()
+    for offset in range(days):
+        date = today - timedelta(days=offset)
+        lock_rollups(group_ids, date)
+        refresh_rollups(group_ids, date)
+    db.session.commit()
+    return len(group_ids) * days
+
+
+def rebuild_range(connection, start_date, end_date):
+    """
+    Sana oralig'idagi barcha rollup'larni xom davomatdan qayta qurish
+    (eski qatorlar o'chiriladi, keyin bitta INSERT ... SELECT)
+    Tarixiy kunlar uchun active_total - guruhdagi HOZIRGI aktiv talabalar soni
+
+    Args:
+        connection: SQLAlchemy Connection yoki Session (tranzaksiya ichida)
+
+    Returns:
+        int: Yozilgan qatorlar soni
+    """
+    rollup = DailyGroupRollup.__table__
+
+    connection.execute(rollup.delete().where(
+        db.and_(rollup.c.date >= start_date, rollup.c.date <= end_date)
+    ))
+
+    active_counts = db.select([
+        Student.group_id.label('group_id'),
+        db.func.count(Student.id).label('active_total'),
+    ]).where(Student.active == True).group_by(Student.group_id).subquery()
+
+    select = db.select([
+        Student.group_id,
+        Attendance.date,
+        _present_sum(),
+        _absent_sum(),
+        db.func.max(active_counts.c.active_total),
+        db.literal(datetime.utcnow(), type_=db.DateTime),
+    ]).select_from(
+        db.join(
+            Attendance.__table__, Student.__table__,
+            Attendance.student_id == Student.id
+        ).join(
+            active_counts, active_counts.c.group_id == Student.group_id
+        )
+    ).where(
+        db.and_(
+            Attendance.date >= start_date,
+            Attendance.date <= end_date,
+            Student.active == True
+        )
+    ).group_by(Student.group_id, Attendance.date)
+
+    columns = ['group_id', 'date', 'present', 'absent', 'active_total', 'updated_at']
+    result = connection.execute(rollup.insert().from_select(columns, select))
+    return result.rowcount
+
+
+def attendance_date_bounds(connection):
+    """
+    Attendance jadvalidagi eng birinchi va eng oxirgi sana
+    """
+    return connection.execute(
+        db.select([db.func.min(Attendance.date), db.func.max(Attendance.date)])
+    ).one()
+
+
+def backfill(engine, start_date=None, end_date=None, workers=4):
+    """
+    Mavjud tarix uchun rollup'larni parallel qayta qurish
+    Oraliq BACKFILL_CHUNK_DAYS kunlik bo'laklarga bo'linadi, har bir bo'lak
+    alohida ulanish va tranzaksiyada bajariladi.
+
+    Returns:
+        int: Yozilgan qatorlar soni
+    """
+    if start_date is None or end_date is None:
+        with engine.connect() as conn:
+            first, last = attendance_date_bounds(conn)
+        start_date = start_date or first
+        end_date = end_date or last
+        if start_date is None or end_date is None:
+            return 0
+
+    chunks = []
+    chunk_start = start_date
+    while chunk_start <= end_date:
+        chunk_end = min(chunk_start + timedelta(days=BACKFILL_CHUNK_DAYS - 1), end_date)
+        chunks.append((chunk_start, chunk_end))
+        chunk_start = chunk_end + timedelta(days=1)
+
+    # SQLite bitta yozuvchiga ruxsat beradi - parallellikdan foyda yo'q
+    if engine.dialect.name == 'sqlite':
+        workers = 1
+
+    def run(chunk):
+        with engine.begin() as conn:
+            if engine.dialect.name == 'postgresql':
+                # CLI ishi - engine profilidagi statement_timeout qo'llanmaydi
+                conn.exec_driver_sql('SET LOCAL statement_timeout = 0')
+            return rebuild_range(conn, chunk[0], chunk[1])
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return sum(pool.map(run, chunks))
+
+
+def range_totals(start_date, end_date):
+    """
+    Sana oralig'i bo'yicha umumiy sanoqlar
+    """
+    present, absent = db.session.query(
+        db.func.coalesce(db.func.sum(DailyGroupRollup.present), 0),
+        db.func.coalesce(db.func.sum(DailyGroupRollup.absent), 0)
+    ).filter(
+        DailyGroupRollup.date >= start_date,
+        DailyGroupRollup.date <= end_date
+    ).one()
+
+    return {'present': present, 'absent': absent, 'total': present + absent}
+
+
+def range_version(start_date, end_date, group_id=None):
+    """
+    Sana oralig'idagi davomatning "versiyasi" - har qanday belgilash
+    tegishli rollup qatorining updated_at'ini o'zgartiradi
+    (export keshi kaliti uchun; bitta agregat so'rov)
+
+    Returns:
+        tuple: (qatorlar soni, kelgan, kelmagan, aktiv, oxirgi updated_at)
+    """
+    query = db.session.query(
+        db.func.count(),
+        db.func.sum(DailyGroupRollup.present),
+        db.func.sum(DailyGroupRollup.absent),
+        db.func.sum(DailyGroupRollup.active_total),
+        db.func.max(DailyGroupRollup.updated_at)
+    ).filter(
+        DailyGroupRollup.date >= start_date,
+        DailyGroupRollup.date <= end_date
+    )
+
+    if group_id:
+        query = query.filter(DailyGroupRollup.group_id == group_id)
+
+    return tuple(query.one())
+
+
+def init_rollups(app):
+    """
+    Rollup CLI buyruqlari va davriy qayta sanash vazifasini ro'yxatdan o'tkazish
+
+    Args:
+        app: Flask application
+    """
+    import click
+
+    days = app.config.get('ROLLUP_REFRESH_DAYS', 2)
+    scheduler.add_job(
+        'rollup-refresh', lambda: refresh_recent(days),
+        app.config.get('ROLLUP_REFRESH_INTERVAL_MIN', 60) * 60
+    )
+
+    @app.cli.command('rollup-backfill')
+    @click.option('--start', 'start_str', default=None, help='Boshlanish sanasi (YYYY-MM-DD)')
+    @click.option('--end', 'end_str', default=None, help='Tugash sanasi (YYYY-MM-DD)')
+    @click.option('--workers', default=4, show_default=True, help='Parallel ulanishlar soni')
+    def rollup_backfill_command(start_str, end_str, workers):
+        """daily_group_rollup jadvalini mavjud davomatdan qayta qurish"""
+        start_date = datetime.strptime(start_str, '%Y-%m-%d').date() if start_str else None
+        end_date = datetime.strptime(end_str, '%Y-%m-%d').date() if end_str else None
+
+        count = backfill(db.engine, start_date, end_date, workers=workers)
+        print(f"✅ {count} ta rollup qatori yozildi")
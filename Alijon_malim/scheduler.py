@@ -0,0 +1,456 @@
+"""
+Scheduler Module
+Jarayon ichidagi (in-process) davriy vazifalar rejalashtiruvchisi
+
+Har bir worker'da bitta fon thread'i ('scheduler') har SCHEDULER_TICK_SECONDS
+soniyada muddati kelgan vazifalarni bajaradi - foydalanuvchi so'rovlari
+hech qachon kutmaydi. Vazifalar ikki xil:
+
+    leader_only=True   - umumiy ma'lumot (token tozalash, rollup, export keshi):
+                         faqat lider worker bajaradi
+    leader_only=False  - worker xotirasidagi holat (bufer, snapshot keshlar):
+                         har bir worker o'zi bajaradi
+
+Lider tanlash:
+    PostgreSQL  - pg_try_advisory_lock (alohida ulanishda, worker yashaguncha)
+    boshqalar   - scheduler_leases jadvalidagi muddatli qator (lease)
+
+Lider worker o'lsa, PostgreSQL qulfni darhol bo'shatadi, lease esa
+SCHEDULER_LEASE_SECONDS dan keyin boshqa worker'ga o'tadi.
+
+Holat va vazifalar metrikasi: GET /scheduler/status
+Qo'lda bajarish:
+
+    flask --app app scheduler-run tokens-purge
+"""
+
+import atexit
+import os
+import socket
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta
+
+
+# PostgreSQL advisory lock kaliti (migratsiya kalitidan farqli)
+SCHEDULER_LOCK_KEY = zlib.crc32(b'davomat-scheduler')
+
+LEASE_NAME = 'scheduler'
+
+
+class Job:
+    """
+    Bitta davriy vazifa va uning bajarilish metrikasi
+    """
+
+    def __init__(self, name, func, interval_seconds, leader_only=True):
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self.leader_only = leader_only
+        self.next_run = None
+        self.runs = 0
+        self.failures = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_seconds = None
+        self.last_started_at = None
+        self.last_result = None
+        self.last_error = None
+
+    def is_due(self, now):
+        return self.next_run is None or now >= self.next_run
+
+    def record(self, started_at, seconds, result=None, error=None):
+        self.runs += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.last_seconds = seconds
+        self.last_started_at = started_at
+        if error is None:
+            self.last_result = result
+        else:
+            self.failures += 1
+            self.last_error = error
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'interval_seconds': self.interval_seconds,
+            'leader_only': self.leader_only,
+            'runs': self.runs,
+            'failures': self.failures,
+            'last_started_at': self.last_started_at.isoformat() if self.last_started_at else None,
+            'last_ms': round(self.last_seconds * 1000, 2) if self.last_seconds is not None else None,
+            'avg_ms': round(self.total_seconds / self.runs * 1000, 2) if self.runs else None,
+            'max_ms': round(self.max_seconds * 1000, 2),
+            'last_result': self.last_result,
+            'last_error': self.last_error
+        }
+
+
+class AdvisoryLockLeader:
+    """
+    PostgreSQL: sessiya darajasidagi advisory lock
+
+    Qulf olingan ulanish worker yashaguncha ushlab turiladi (pool'dan bitta
+    ulanish). Ulanish uzilsa server qulfni bo'shatadi va liderlik yo'qoladi.
+    Ulanish AUTOCOMMIT rejimida - qulf va heartbeat so'rovlari ochiq
+    tranzaksiya qoldirmaydi ("idle in transaction" emas).
+    """
+
+    def __init__(self, key=SCHEDULER_LOCK_KEY):
+        self.key = key
+        self.conn = None
+
+    def acquire(self, engine):
+        """
+        Liderlikni olish yoki saqlab qolish
+
+        Returns:
+            bool: True agar shu worker lider bo'lsa
+        """
+        from sqlalchemy import text
+
+        if self.conn is not None:
+            try:
+                self.conn.execute(text('SELECT 1'))
+                return True
+            except Exception:
+                self._drop()
+                return False
+
+        conn = engine.connect().execution_options(isolation_level='AUTOCOMMIT')
+        try:
+            acquired = conn.execute(
+                text('SELECT pg_try_advisory_lock(:key)'), {'key': self.key}
+            ).scalar()
+        except Exception:
+            conn.invalidate()
+            conn.close()
+            raise
+        if acquired:
+            self.conn = conn
+            return True
+        conn.close()
+        return False
+
+    def _drop(self):
+        # Qulf sessiyaga bog'liq - ulanish pool'ga qaytmasligi kerak
+        try:
+            self.conn.invalidate()
+            self.conn.close()
+        except Exception:
+            pass
+        self.conn = None
+
+    def release(self, engine):
+        if self.conn is None:
+            return
+        from sqlalchemy import text
+        try:
+            self.conn.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': self.key})
+        except Exception:
+            pass
+        self._drop()
+
+
+class LeaseLeader:
+    """
+    SQLite va boshqalar: scheduler_leases jadvalidagi muddatli qator
+
+    Lider har tick'da muddatni uzaytiradi; muddati o'tgan lease'ni istalgan
+    worker bitta shartli UPDATE bilan egallaydi.
+    """
+
+    def __init__(self, lease_seconds=60, name=LEASE_NAME):
+        self.lease_seconds = lease_seconds
+        self.name = name
+        self.owner = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+    def acquire(self, engine):
+        from models import db, SchedulerLease, dialect_insert
+
+        table = SchedulerLease.__table__
+        now = datetime.utcnow()
+
+        with engine.begin() as conn:
+            insert = dialect_insert(table)
+            if insert is not None:
+                conn.execute(
+                    insert.values(name=self.name, owner=None, expires_at=now)
+                    .on_conflict_do_nothing(index_elements=['name'])
+                )
+            elif conn.execute(
+                db.select([table.c.name]).where(table.c.name == self.name)
+            ).first() is None:
+                conn.execute(table.insert().values(name=self.name, owner=None, expires_at=now))
+
+            result = conn.execute(
+                table.update()
+                .where(db.and_(
+                    table.c.name == self.name,
+                    db.or_(table.c.owner == self.owner, table.c.expires_at <= now)
+                ))
+                .values(owner=self.owner, expires_at=now + timedelta(seconds=self.lease_seconds))
+            )
+            return result.rowcount == 1
+
+    def release(self, engine):
+        from models import db, SchedulerLease
+
+        table = SchedulerLease.__table__
+        with engine.begin() as conn:
+            conn.execute(
+                table.update()
+                .where(db.and_(table.c.name == self.name, table.c.owner == self.owner))
+                .values(owner=None, expires_at=datetime.utcnow())
+            )
+
+
+class Scheduler:
+    """
+    Vazifalar ro'yxati + har bir worker'dagi fon thread'i
+    """
+
+    def __init__(self, tick_seconds=15, lease_seconds=60):
+        """
+        Args:
+            tick_seconds: Muddati kelgan vazifalarni tekshirish oralig'i
+            lease_seconds: Lease muddati (lider to'xtasa shundan keyin almashadi)
+        """
+        self.tick_seconds = tick_seconds
+        self.lease_seconds = lease_seconds
+        self.enabled = True
+        self.app = None
+        self.jobs = {}
+        self.leader = None
+        self.is_leader = False
+        self.thread = None
+        self.pid = None
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+
+    def configure(self, app, enabled=None, tick_seconds=None, lease_seconds=None):
+        """
+        Sozlamalarni app config'dan olish
+        """
+        with self.lock:
+            self.app = app
+            if enabled is not None:
+                self.enabled = enabled
+            if tick_seconds is not None:
+                self.tick_seconds = tick_seconds
+            if lease_seconds is not None:
+                self.lease_seconds = lease_seconds
+            self.leader = None
+
+    def add_job(self, name, func, interval_seconds, leader_only=True):
+        """
+        Vazifani ro'yxatdan o'tkazish (shu nomdagi eski vazifa almashtiriladi)
+
+        Args:
+            name: Vazifa nomi
+            func: Argumentsiz funksiya (app context ichida chaqiriladi)
+            interval_seconds: Bajarish oralig'i (0 yoki None - vazifa o'chiq)
+            leader_only: Faqat lider worker bajaradimi
+        """
+        with self.lock:
+            if not interval_seconds:
+                self.jobs.pop(name, None)
+                return
+            self.jobs[name] = Job(name, func, interval_seconds, leader_only)
+
+    def ensure_started(self):
+        """
+        Fon thread'ini ishga tushirish (har bir worker'da bir marta,
+        fork'dan keyin ham)
+        """
+        if not self.enabled:
+            return
+        pid = os.getpid()
+        if self.thread is not None and self.pid == pid and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread is not None and self.pid == pid and self.thread.is_alive():
+                return
+            # Fork'dan keyin ota jarayonning lider holati meros qolmaydi
+            self.pid = pid
+            self.leader = None
+            self.is_leader = False
+            self.stopping.clear()
+            for job in self.jobs.values():
+                job.next_run = None
+            self.thread = threading.Thread(target=self._run, name='scheduler', daemon=True)
+            self.thread.start()
+
+    def _make_leader(self, engine):
+        if engine.dialect.name == 'postgresql':
+            return AdvisoryLockLeader()
+        return LeaseLeader(self.lease_seconds)
+
+    def _elect(self):
+        engine = self._engine()
+        if self.leader is None:
+            self.leader = self._make_leader(engine)
+        try:
+            self.is_leader = self.leader.acquire(engine)
+        except Exception as e:
+            self.is_leader = False
+            print(f"❌ Scheduler lider tanlashda xatolik: {e}")
+        return self.is_leader
+
+    def _engine(self):
+        from models import db
+        return db.engine
+
+    def _run(self):
+        while not self.stopping.wait(self.tick_seconds):
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"❌ Scheduler xatoligi: {e}")
+
+    def tick(self):
+        """
+        Muddati kelgan vazifalarni bajarish
+
+        Returns:
+            list: Bajarilgan vazifalar nomlari
+        """
+        now = time.monotonic()
+        with self.lock:
+            jobs = list(self.jobs.values())
+        due = [job for job in jobs if job.is_due(now)]
+        needs_leader = any(job.leader_only for job in jobs)
+        if not due and not needs_leader:
+            return []
+
+        with self.app.app_context():
+            # Lease har tick'da uzaytiriladi - liderlik bitta worker'da turadi
+            if needs_leader:
+                self._elect()
+
+            executed = []
+            for job in due:
+                if job.leader_only and not self.is_leader:
+                    continue
+                self.run_job(job)
+                executed.append(job.name)
+            return executed
+
+    def run_job(self, job):
+        """
+        Bitta vazifani bajarish va metrikasini yozish (app context ichida)
+        """
+        from models import db
+
+        job.next_run = time.monotonic() + job.interval_seconds
+        started_at = datetime.utcnow()
+        start = time.perf_counter()
+        try:
+            result = job.func()
+        except Exception as e:
+            db.session.rollback()
+            job.record(started_at, time.perf_counter() - start, error=str(e))
+            print(f"❌ '{job.name}' vazifasida xatolik: {e}")
+            return None
+        finally:
+            db.session.remove()
+
+        job.record(started_at, time.perf_counter() - start, result=result)
+        return result
+
+    def status(self):
+        """
+        Scheduler holati va vazifalar metrikasi
+
+        Returns:
+            dict
+        """
+        with self.lock:
+            jobs = [job.to_dict() for job in self.jobs.values()]
+        return {
+            'enabled': self.enabled,
+            'running': self.thread is not None and self.pid == os.getpid() and self.thread.is_alive(),
+            'pid': os.getpid(),
+            'leader': self.is_leader,
+            'tick_seconds': self.tick_seconds,
+            'jobs': sorted(jobs, key=lambda job: job['name'])
+        }
+
+    def metric_samples(self):
+        """
+        /metrics uchun vazifalar metrikasi (metrics.add_collector)
+        """
+        with self.lock:
+            jobs = list(self.jobs.values())
+        samples = [('scheduler_leader', 'gauge', 'Shu worker lider bo\'lsa 1', {}, int(self.is_leader))]
+        for job in jobs:
+            labels = {'job': job.name}
+            samples.extend([
+                ('scheduler_job_runs_total', 'counter', 'Vazifa bajarilishlari soni', labels, job.runs),
+                ('scheduler_job_failures_total', 'counter', 'Vazifa xatolari soni', labels, job.failures),
+                ('scheduler_job_seconds_total', 'counter', 'Vazifalarga ketgan vaqt', labels, job.total_seconds),
+            ])
+        return samples
+
+    def stop(self):
+        """
+        Thread'ni to'xtatish va liderlikni bo'shatish (worker to'xtaganda)
+        """
+        self.stopping.set()
+        if self.leader is None or not self.is_leader or self.app is None:
+            return
+        try:
+            with self.app.app_context():
+                self.leader.release(self._engine())
+        except Exception:
+            pass
+        self.is_leader = False
+
+
+# Har bir worker uchun bitta rejalashtiruvchi
+scheduler = Scheduler()
+
+
+def init_scheduler(app):
+    """
+    Scheduler'ni sozlash, birinchi so'rovda ishga tushirish va
+    `scheduler-run` CLI buyrug'ini ro'yxatdan o'tkazish
+
+    Vazifalarning o'zi tegishli modullarda qo'shiladi (init_cache,
+    init_token_activity, init_rollups, init_security, ...).
+
+    Args:
+        app: Flask application
+    """
+    import click
+
+    scheduler.configure(
+        app,
+        enabled=app.config.get('SCHEDULER_ENABLED', True),
+        tick_seconds=app.config.get('SCHEDULER_TICK_SECONDS', 15),
+        lease_seconds=app.config.get('SCHEDULER_LEASE_SECONDS', 60)
+    )
+
+    # Import va CLI buyruqlarida thread ochilmaydi - faqat xizmat qilayotgan worker'da
+    @app.before_request
+    def start_scheduler():
+        scheduler.ensure_started()
+
+    @app.cli.command('scheduler-run')
+    @click.argument('names', nargs=-1)
+    def scheduler_run_command(names):
+        """Vazifalarni hozir bajarish (nom berilmasa - barchasi)"""
+        for name in names or sorted(scheduler.jobs):
+            job = scheduler.jobs.get(name)
+            if job is None:
+                print(f"❌ '{name}' vazifasi topilmadi")
+                continue
+            result = scheduler.run_job(job)
+            print(f"✅ {name}: {result} ({job.last_seconds * 1000:.1f} ms)")
+
+    atexit.register(scheduler.stop)
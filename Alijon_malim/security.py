@@ -3,9 +3,13 @@ Security Management Module
 Xavfsizlik boshqaruvi - Token management, Rate limiting
 """
 
-from datetime import datetime, timedelta
-from collections import defaultdict
-import threading
+from datetime import datetime
+import os
+import time
+
+from audit import audit_log
+from rate_limit_backends import MemoryBackend, create_backend
+from scheduler import scheduler
 
 
 # ==========================================
@@ -14,19 +18,43 @@ import threading
 
 class RateLimiter:
     """
-    IP address bo'yicha login urinishlarini cheklash
+    IP address bo'yicha login urinishlarini cheklash (sliding window)
+    
+    Har bir IP uchun faqat ikkita hisoblagich saqlanadi - joriy va oldingi
+    oyna. Urinishlar soni oldingi oynaning qolgan qismi bilan baholanadi:
+    
+        taxmin = oldingi * (1 - o'tgan_ulush) + joriy
+    
+    Hisoblagichlar backend'da (rate_limit_backends.py) - umumiy backend
+    bilan cheklov barcha worker'larda bir xil ishlaydi.
     """
     
-    def __init__(self, max_attempts=5, window_minutes=15):
+    def __init__(self, max_attempts=5, window_minutes=15, backend=None):
         """
         Args:
             max_attempts: Maksimal urinishlar soni
             window_minutes: Vaqt oynasi (daqiqada)
+            backend: Hisoblagichlar backend'i (standart: worker xotirasi)
         """
         self.max_attempts = max_attempts
-        self.window_minutes = window_minutes
-        self.attempts = defaultdict(list)
-        self.lock = threading.Lock()
+        self.window_seconds = window_minutes * 60
+        self.backend = backend or MemoryBackend()
+    
+    def configure(self, max_attempts=None, window_minutes=None, backend=None):
+        """
+        Sozlamalarni app config'dan olish
+        """
+        if max_attempts is not None:
+            self.max_attempts = max_attempts
+        if window_minutes is not None:
+            self.window_seconds = window_minutes * 60
+        if backend is not None:
+            self.backend = backend
+    
+    def _window(self):
+        now = time.time()
+        window, elapsed = divmod(now, self.window_seconds)
+        return int(window), elapsed / self.window_seconds
     
     def is_allowed(self, ip_address):
         """
@@ -38,21 +66,15 @@ class RateLimiter:
         Returns:
             bool: True agar ruxsat bo'lsa
         """
-        with self.lock:
-            now = datetime.now()
-            cutoff = now - timedelta(minutes=self.window_minutes)
-            
-            # Eski urinishlarni tozalash
-            self.attempts[ip_address] = [
-                attempt_time for attempt_time in self.attempts[ip_address]
-                if attempt_time > cutoff
-            ]
-            
-            # Urinishlar sonini tekshirish
-            if len(self.attempts[ip_address]) >= self.max_attempts:
-                return False
-            
+        window, elapsed = self._window()
+        try:
+            previous, current = self.backend.counts(ip_address, window, self.window_seconds)
+        except Exception as e:
+            # Backend ishlamasa login bloklanmaydi
+            print(f"❌ Rate limiter backend xatosi: {e}")
             return True
+        
+        return previous * (1 - elapsed) + current < self.max_attempts
     
     def record_attempt(self, ip_address):
         """
@@ -61,8 +83,11 @@ class RateLimiter:
         Args:
             ip_address: Client IP address
         """
-        with self.lock:
-            self.attempts[ip_address].append(datetime.now())
+        window, _ = self._window()
+        try:
+            self.backend.increment(ip_address, window, self.window_seconds)
+        except Exception as e:
+            print(f"❌ Rate limiter backend xatosi: {e}")
     
     def reset(self, ip_address):
         """
@@ -71,30 +96,24 @@ class RateLimiter:
         Args:
             ip_address: Client IP address
         """
-        with self.lock:
-            if ip_address in self.attempts:
-                del self.attempts[ip_address]
+        window, _ = self._window()
+        try:
+            self.backend.reset(ip_address, window)
+        except Exception as e:
+            print(f"❌ Rate limiter backend xatosi: {e}")
     
     def cleanup(self):
         """
-        Barcha eski urinishlarni tozalash
+        Barcha eski hisoblagichlarni tozalash
         """
-        with self.lock:
-            now = datetime.now()
-            cutoff = now - timedelta(minutes=self.window_minutes)
-            
-            for ip_address in list(self.attempts.keys()):
-                self.attempts[ip_address] = [
-                    attempt_time for attempt_time in self.attempts[ip_address]
-                    if attempt_time > cutoff
-                ]
-                
-                # Agar bo'sh bo'lsa, o'chirish
-                if not self.attempts[ip_address]:
-                    del self.attempts[ip_address]
+        window, _ = self._window()
+        try:
+            self.backend.cleanup(window)
+        except Exception as e:
+            print(f"❌ Rate limiter backend xatosi: {e}")
 
 
-# Global rate limiter
+# Global rate limiter (backend init_security'da sozlanadi)
 rate_limiter = RateLimiter(max_attempts=5, window_minutes=15)
 
 
@@ -181,33 +200,26 @@ def revoke_all_sessions_except_current(current_selector=None):
     """
     from models import AdminToken, db
     
+    query = AdminToken.query
     if current_selector:
         # Joriy tokendan tashqari hammasini o'chirish
-        tokens = AdminToken.query.filter(
-            AdminToken.selector != current_selector
-        ).all()
-    else:
-        # Barcha tokenlarni o'chirish
-        tokens = AdminToken.query.all()
-    
-    count = len(tokens)
-    
-    for token in tokens:
-        db.session.delete(token)
+        query = query.filter(AdminToken.selector != current_selector)
     
+    # Bitta DELETE (obyektlarni yuklamasdan)
+    count = query.delete(synchronize_session=False)
     db.session.commit()
     
     return count
 
 
 # ==========================================
-# SECURITY AUDIT LOG (ixtiyoriy)
+# SECURITY AUDIT LOG
 # ==========================================
 
 class SecurityAuditLog:
     """
     Xavfsizlik hodisalarini logga yozish
-    Production'da database yoki file'ga yozilishi kerak
+    Hodisa faqat navbatga qo'shiladi - yozishni audit.py fon thread'i bajaradi
     """
     
     @staticmethod
@@ -215,44 +227,56 @@ class SecurityAuditLog:
         """
         Muvaffaqiyatli login
         """
-        print(f"[LOGIN SUCCESS] {username} from {ip_address} via {method}")
-        # Bu yerda database'ga yoki file'ga yoziladi
+        audit_log.emit('login_success', username, ip_address, user_agent, f'method={method}')
     
     @staticmethod
     def log_login_failure(username, ip_address, reason='Invalid credentials'):
         """
         Muvaffaqiyatsiz login urinishi
         """
-        print(f"[LOGIN FAILED] {username} from {ip_address} - {reason}")
-        # Bu yerda database'ga yoki file'ga yoziladi
+        audit_log.emit('login_failure', username, ip_address, details=reason)
     
     @staticmethod
     def log_logout(username, ip_address):
         """
         Logout
         """
-        print(f"[LOGOUT] {username} from {ip_address}")
+        audit_log.emit('logout', username, ip_address)
     
     @staticmethod
     def log_token_created(ip_address, user_agent):
         """
         Remember me token yaratildi
         """
-        print(f"[TOKEN CREATED] for {ip_address}")
+        audit_log.emit('token_created', ip_address=ip_address, user_agent=user_agent)
     
     @staticmethod
-    def log_token_revoked(selector, reason='Manual logout'):
+    def log_token_revoked(selector, reason='Manual logout', ip_address=None):
         """
         Token bekor qilindi
         """
-        print(f"[TOKEN REVOKED] {selector} - {reason}")
+        audit_log.emit('token_revoked', ip_address=ip_address, details=f'{selector[:8]}... - {reason}')
+    
+    @staticmethod
+    def log_token_rejected(ip_address, user_agent):
+        """
+        Cookie'dagi token yaroqsiz (muddati tugagan yoki hash mos emas)
+        """
+        audit_log.emit('token_rejected', ip_address=ip_address, user_agent=user_agent)
+    
+    @staticmethod
+    def log_sessions_revoked(username, ip_address, count):
+        """
+        Sessionlar bekor qilindi (bittasi yoki hammasi)
+        """
+        audit_log.emit('sessions_revoked', username, ip_address, details=f'count={count}')
     
     @staticmethod
     def log_suspicious_activity(ip_address, reason):
         """
         Shubhali faoliyat
         """
-        print(f"[SUSPICIOUS] {ip_address} - {reason}")
+        audit_log.emit('suspicious', ip_address=ip_address, details=reason)
 
 
 # ==========================================
@@ -274,22 +298,13 @@ def is_secure_connection():
 def get_real_ip():
     """
     Client'ning haqiqiy IP addressini olish
-    Proxy va load balancer hisobga olinadi
+    Proxy va load balancer ProxyFix orqali hisobga olinadi (TRUSTED_PROXY_HOPS)
     
     Returns:
         str: IP address
     """
     from flask import request
     
-    # X-Forwarded-For header'dan (proxy orqali)
-    if request.headers.get('X-Forwarded-For'):
-        return request.headers.get('X-Forwarded-For').split(',')[0].strip()
-    
-    # X-Real-IP header'dan
-    if request.headers.get('X-Real-IP'):
-        return request.headers.get('X-Real-IP')
-    
-    # To'g'ridan-to'g'ri ulanish
     return request.remote_addr or '0.0.0.0'
 
 
@@ -339,13 +354,26 @@ def init_security(app):
     Args:
         app: Flask application
     """
-    # Rate limiter cleanup (har 1 soatda)
-    @app.before_request
-    def cleanup_rate_limiter():
-        # Har 100-requestda tozalash (taxminiy)
-        import random
-        if random.randint(1, 100) == 1:
-            rate_limiter.cleanup()
+    backend_url = app.config.get('RATE_LIMIT_BACKEND')
+    if backend_url is None:
+        # Standart: CACHE_DIR'dagi umumiy SQLite fayl (barcha worker'lar uchun)
+        from cache import DEFAULT_CACHE_DIR
+        cache_dir = app.config.get('CACHE_DIR', DEFAULT_CACHE_DIR)
+        backend_url = 'sqlite:///' + os.path.join(cache_dir, 'rate_limits.db')
+    
+    rate_limiter.configure(
+        max_attempts=app.config.get('RATE_LIMIT_MAX_ATTEMPTS', 5),
+        window_minutes=app.config.get('RATE_LIMIT_WINDOW_MIN', 15),
+        backend=create_backend(backend_url)
+    )
+    
+    # Eski oyna hisoblagichlarini tozalash - scheduler thread'ida
+    # (memory backend har bir worker'da alohida, umumiy backend - faqat lider)
+    scheduler.add_job(
+        'rate-limit-cleanup', rate_limiter.cleanup,
+        app.config.get('RATE_LIMIT_CLEANUP_INTERVAL_MIN', 60) * 60,
+        leader_only=not isinstance(rate_limiter.backend, MemoryBackend)
+    )
     
     print("✅ Security module ishga tushdi")
 
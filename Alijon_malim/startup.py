@@ -0,0 +1,141 @@
+"""
+Startup Profile
+Worker ishga tushish vaqti: `import app` va birinchi so'rov
+
+Har bir o'lchov yangi Python jarayonida (gunicorn worker kabi toza holatda)
+`-X importtime` bilan bajariladi:
+
+    import_ms          - `from app import app` (modullar + ilovani sozlash)
+    first_request_ms   - birinchi so'rov (database ulanishi, shablon kompilyatsiyasi)
+    second_request_ms  - ikkinchi so'rov (taqqoslash uchun)
+    slowest imports    - kumulyativ import vaqti bo'yicha eng sekin paketlar
+
+Sxema tekshiruvi o'lchanmaydi - u worker'da emas, `flask db-check`da.
+
+ISHLATISH (ilova papkasidan):
+    python startup.py                       # 3 marta, mediana
+    python startup.py --path /login --runs 5 --top 15 --json startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+# Bola jarayonda bajariladigan kod - natija oxirgi qatorda JSON
+CHILD = '''
+import json, sys, time
+start = time.perf_counter()
+from app import app
+imported = time.perf_counter()
+client = app.test_client()
+status = client.get(sys.argv[1]).status_code
+first = time.perf_counter()
+client.get(sys.argv[1])
+second = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_request_ms": (first - imported) * 1000,
+    "second_request_ms": (second - first) * 1000,
+    "status": status,
+}))
+'''
+
+
+def parse_importtime(stderr):
+    """
+    `-X importtime` chiqishidan yuqori darajadagi paketlar
+
+    Returns:
+        dict: paket -> kumulyativ vaqt (ms)
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|', 2)
+        if not cumulative.strip().isdigit():
+            continue  # sarlavha qatori
+        # Faqat paketlarning o'zi (flask, sqlalchemy, openpyxl...) - har biri
+        # bir marta import qilinadi, kumulyativ vaqtga submodullar kiradi
+        name = name.strip()
+        if '.' in name:
+            continue
+        modules[name] = int(cumulative) / 1000
+    return modules
+
+
+def run_once(path):
+    """
+    Bitta toza jarayonda o'lchash
+
+    Returns:
+        tuple: (o'lchovlar dict, importlar dict)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD, path],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True
+    )
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        sys.exit(f"❌ Ilovani ishga tushirib bo'lmadi:\n{result.stderr[-2000:]}")
+    return json.loads(lines[-1]), parse_importtime(result.stderr)
+
+
+def profile(path='/health', runs=3):
+    """
+    Returns:
+        dict: import_ms, first_request_ms, second_request_ms (mediana), status, imports
+    """
+    samples = [run_once(path) for _ in range(runs)]
+    timings = [sample[0] for sample in samples]
+
+    imports = {}
+    for _, modules in samples:
+        for name, ms in modules.items():
+            imports.setdefault(name, []).append(ms)
+
+    return {
+        'path': path,
+        'runs': runs,
+        'status': timings[-1]['status'],
+        **{
+            key: round(statistics.median(t[key] for t in timings), 1)
+            for key in ('import_ms', 'first_request_ms', 'second_request_ms')
+        },
+        'imports': {
+            name: round(statistics.median(values), 1)
+            for name, values in sorted(imports.items(), key=lambda item: -statistics.median(item[1]))
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Worker ishga tushish vaqtini o'lchash")
+    parser.add_argument('--path', default='/health', help="Birinchi so'rov manzili")
+    parser.add_argument('--runs', type=int, default=3, help="O'lchovlar soni (mediana)")
+    parser.add_argument('--top', type=int, default=10, help="Eng sekin importlar soni")
+    parser.add_argument('--json', dest='json_path', help='Natijani JSON faylga yozish')
+    args = parser.parse_args(argv)
+
+    report = profile(args.path, args.runs)
+
+    print(f"import app:          {report['import_ms']:>8} ms")
+    print(f"birinchi so'rov:     {report['first_request_ms']:>8} ms  (GET {args.path} -> {report['status']})")
+    print(f"ikkinchi so'rov:     {report['second_request_ms']:>8} ms")
+    print("eng sekin importlar:")
+    for name, ms in list(report['imports'].items())[:args.top]:
+        print(f"  {name:<30}{ms:>8} ms")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"✅ Natija yozildi: {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
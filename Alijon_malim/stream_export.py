@@ -0,0 +1,134 @@
+"""
+Stream Export Module
+Katta hajmdagi ma'lumotlarni CSV yoki NDJSON ko'rinishida oqim (stream) bilan yuborish
+
+Modul sxemaga bog'liq emas - har qanday ustunli SQLAlchemy so'rovini oladi.
+Shu fayl Alijon_malim va Alijon_2 ilovalarida bir xil (tests/test_shared_modules.py tekshiradi).
+
+    query = db.session.query(Student.id, Student.first_name, ...)
+    return stream_query(query, 'csv', 'students')
+
+Qatorlar server-side cursor (yield_per) bilan o'qiladi va generator javob
+orqali yuboriladi: ko'p yillik dump ham o'zgarmas xotira bilan ishlaydi va
+birinchi baytlar darhol jo'natiladi.
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import Response, stream_with_context
+
+
+# Bitta fetch'dagi qatorlar soni
+YIELD_PER = 1000
+
+# Shuncha qatordan keyin bufer klientga yuboriladi
+FLUSH_ROWS = 500
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8'
+}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 1 if value else 0
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def query_columns(query):
+    """
+    So'rov ustunlari nomlari (label yoki atribut nomi)
+    """
+    return [column['name'] for column in query.column_descriptions]
+
+
+def iter_csv(columns, rows):
+    """
+    CSV qatorlari (birinchisi - sarlavha), FLUSH_ROWS qatordan bo'laklab
+
+    Yields:
+        str: CSV matni bo'lagi
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    count = 0
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        count += 1
+        if count % FLUSH_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def iter_ndjson(columns, rows):
+    """
+    Har bir qator - alohida JSON obyekt va yangi qator
+
+    Yields:
+        str: NDJSON matni bo'lagi
+    """
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps(
+            dict(zip(columns, row)),
+            default=_json_default,
+            ensure_ascii=False
+        ))
+        if len(chunk) >= FLUSH_ROWS:
+            yield '\n'.join(chunk) + '\n'
+            chunk = []
+
+    if chunk:
+        yield '\n'.join(chunk) + '\n'
+
+
+def stream_query(query, fmt, filename):
+    """
+    So'rov natijasini oqim bilan yuborish
+
+    Args:
+        query: Ustunli SQLAlchemy Query (tartiblangan)
+        fmt: 'csv' yoki 'ndjson'
+        filename: Fayl nomi (kengaytmasiz)
+
+    Returns:
+        Response: Generator javob (Content-Length'siz, chunked)
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Noma'lum format: {fmt}")
+
+    columns = query_columns(query)
+    rows = query.yield_per(YIELD_PER)
+    generate = iter_csv if fmt == 'csv' else iter_ndjson
+
+    response = Response(
+        stream_with_context(generate(columns, rows)),
+        content_type=FORMATS[fmt]
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    # Proksi (nginx) javobni buferlamasin - baytlar darhol ketadi
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
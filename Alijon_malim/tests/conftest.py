@@ -0,0 +1,167 @@
+"""
+Test sozlamalari
+
+ISHLATISH (Alijon_malim papkasidan):
+    python -m pytest tests                                  # vaqtinchalik SQLite
+    TEST_DATABASE_URL=postgresql://... python -m pytest tests   # PostgreSQL
+
+PostgreSQL database bo'sh test database bo'lishi kerak - jadvallar
+migratsiyalar bilan yaratiladi va test oxirida o'chiriladi.
+"""
+
+import os
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Seed hajmi - planner indeksni tanlashi uchun yetarli, lekin tez
+SEED_GROUPS = 5
+SEED_STUDENTS = 200
+SEED_DAYS = 31
+
+
+@pytest.fixture(scope='session')
+def app():
+    """
+    Alohida database'ga ulangan ilova (sxema migratsiyalar bilan yaratiladi)
+    """
+    workdir = tempfile.mkdtemp(prefix='alijon_malim_tests_')
+    os.environ['DATABASE_URL'] = os.environ.get(
+        'TEST_DATABASE_URL', 'sqlite:///' + os.path.join(workdir, 'test.db')
+    )
+    os.environ['CACHE_DIR'] = workdir
+    # Fon vazifalari testlardagi SQL ushlashga aralashmasligi uchun
+    os.environ.setdefault('SCHEDULER_ENABLED', '0')
+
+    from app import app as flask_app
+    flask_app.config['TESTING'] = True
+
+    # Sxema import paytida emas, ishga tushirish buyrug'ida (flask db-check) yaratiladi
+    from migrations import check_schema
+    check_schema(flask_app)
+
+    with flask_app.app_context():
+        yield flask_app
+
+        from migrations import schema_version
+        from models import db
+        db.session.remove()
+        db.drop_all()
+        schema_version.drop(bind=db.engine, checkfirst=True)
+
+
+@pytest.fixture(scope='module')
+def seed(app):
+    """
+    Query plan testlari uchun o'z database'i: sxema qaytadan yaratiladi,
+    har bir katta jadval to'ldiriladi va ANALYZE qilinadi. Rejalar boshqa
+    test modullari qoldirgan ma'lumot va statistikaga bog'liq emas.
+
+    Returns:
+        dict: today, start_date, group_id, student_id
+    """
+    from migrations import check_schema, schema_version
+    from models import db, Group, Student, Attendance, AdminToken, IdempotencyKey, SecurityEvent
+    from rollups import backfill
+
+    db.session.remove()
+    db.drop_all()
+    schema_version.drop(bind=db.engine, checkfirst=True)
+    check_schema(app)
+
+    today = date.today()
+    start_date = today - timedelta(days=SEED_DAYS - 1)
+    now = datetime.utcnow()
+
+    groups = [Group(name=f'Test-{i:02}') for i in range(SEED_GROUPS)]
+    db.session.add_all(groups)
+    db.session.commit()
+
+    db.session.bulk_insert_mappings(Student, [
+        {
+            'first_name': f'Ism{i:04}',
+            'last_name': f'Familiya{i:04}',
+            'group_id': groups[i % SEED_GROUPS].id,
+            'active': i % 10 != 0
+        }
+        for i in range(SEED_STUDENTS)
+    ])
+    db.session.commit()
+
+    student_ids = [
+        row.id for row in db.session.query(Student.id).filter(
+            Student.group_id.in_([group.id for group in groups])
+        )
+    ]
+    db.session.bulk_insert_mappings(Attendance, [
+        {
+            'student_id': student_id,
+            'date': start_date + timedelta(days=day),
+            'status': 'absent' if (student_id + day) % 5 == 0 else 'present'
+        }
+        for student_id in student_ids
+        for day in range(SEED_DAYS)
+    ])
+
+    # Sessiyalar (yarmi muddati o'tgan), idempotency kalitlari va xavfsizlik hodisalari
+    db.session.bulk_insert_mappings(AdminToken, [
+        {
+            'token_hash': f'hash-{i:04}',
+            'selector': f'selector-{i:04}',
+            'user_agent': 'pytest',
+            'ip_address': f'10.0.{i % 8}.{i % 250}',
+            'created_at': now - timedelta(days=SEED_DAYS - i % SEED_DAYS),
+            'expires_at': now + timedelta(days=1 if i % 2 else -1, minutes=i),
+            'last_used': now - timedelta(minutes=i)
+        }
+        for i in range(SEED_STUDENTS)
+    ])
+    db.session.bulk_insert_mappings(IdempotencyKey, [
+        {'key': f'seed-{i:04}', 'response': '{}', 'created_at': now - timedelta(hours=i)}
+        for i in range(SEED_STUDENTS)
+    ])
+    db.session.bulk_insert_mappings(SecurityEvent, [
+        {
+            'event_type': ('login_failure', 'login_success', 'logout')[i % 3],
+            'username': 'admin',
+            'ip_address': f'10.0.{i % 8}.{i % 250}',
+            'created_at': now - timedelta(minutes=SEED_STUDENTS * 5 - i)
+        }
+        for i in range(SEED_STUDENTS * 5)
+    ])
+    db.session.commit()
+
+    backfill(db.engine)
+
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql('ANALYZE')
+
+    return {
+        'today': today,
+        'start_date': start_date,
+        'group_id': groups[0].id,
+        'student_id': student_ids[1]
+    }
+
+
+@pytest.fixture
+def captured_sql(app):
+    """
+    Test davomida bajarilgan barcha SQL (statement, parameters) ro'yxati
+    """
+    from models import db
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    yield statements
+    event.remove(db.engine, 'before_cursor_execute', capture)
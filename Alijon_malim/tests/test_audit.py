@@ -0,0 +1,83 @@
+"""
+Audit JSONL yozuvchisi - papka birinchi yozishda, aylantirish (rotation)
+barcha worker'lar uchun flock ostida
+"""
+
+import glob
+import json
+import multiprocessing
+import os
+
+from audit import JsonlWriter
+
+
+WORKERS = 4
+BATCHES = 50
+BATCH_SIZE = 5
+
+
+def events(worker, batch):
+    return [
+        {'event_type': 'login_failure', 'details': f'{worker}-{batch}-{index}'}
+        for index in range(BATCH_SIZE)
+    ]
+
+
+def read_all(directory):
+    lines = []
+    for path in glob.glob(os.path.join(directory, 'security_events.jsonl*')):
+        if path.endswith('.lock'):
+            continue
+        with open(path, encoding='utf-8') as f:
+            lines.extend(json.loads(line) for line in f)
+    return lines
+
+
+def write_batches(directory, worker):
+    writer = JsonlWriter(directory, max_bytes=2000, backups=1000)
+    for batch in range(BATCHES):
+        writer.write(events(worker, batch))
+
+
+def test_directory_is_created_on_first_write(tmp_path):
+    directory = tmp_path / 'audit'
+    writer = JsonlWriter(str(directory))
+    assert not directory.exists()
+
+    writer.write(events(0, 0))
+    assert len(read_all(str(directory))) == BATCH_SIZE
+
+
+def test_rotation_keeps_backups(tmp_path):
+    writer = JsonlWriter(str(tmp_path), max_bytes=1000, backups=3)
+    for batch in range(40):
+        writer.write(events(0, batch))
+
+    names = sorted(os.path.basename(path) for path in glob.glob(str(tmp_path / 'security_events.jsonl*')))
+    assert names == [
+        'security_events.jsonl', 'security_events.jsonl.1', 'security_events.jsonl.2',
+        'security_events.jsonl.3', 'security_events.jsonl.lock',
+    ]
+    for name in names:
+        assert os.path.getsize(tmp_path / name) <= 1000
+
+
+def test_concurrent_workers_rotate_without_losing_events(tmp_path):
+    context = multiprocessing.get_context('fork')
+    processes = [
+        context.Process(target=write_batches, args=(str(tmp_path), worker))
+        for worker in range(WORKERS)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(30)
+        assert process.exitcode == 0
+
+    details = sorted(event['details'] for event in read_all(str(tmp_path)))
+    assert details == sorted(
+        event['details']
+        for worker in range(WORKERS)
+        for batch in range(BATCHES)
+        for event in events(worker, batch)
+    )
@@ -0,0 +1,50 @@
+"""
+Login rate limit kaliti - client IP
+
+Ilova TRUSTED_PROXY_HOPS (standart 1) ta proxy ortida: IP X-Forwarded-For'ning
+o'ngdan shuncha qiymatidan olinadi. Client o'zi yozgan chap qiymatlarni
+har safar almashtirib limitni chetlab o'tolmaydi.
+"""
+
+import pytest
+
+from auth import get_client_info
+from security import rate_limiter
+
+
+PROXY_SEEN_IP = '203.0.113.7'
+OTHER_IP = '203.0.113.8'
+
+
+@pytest.fixture
+def limited_ips(app):
+    yield
+    for ip in (PROXY_SEEN_IP, OTHER_IP):
+        rate_limiter.reset(ip)
+
+
+def failed_login(client, forwarded_for):
+    return client.post('/login', data={'username': 'nobody', 'password': 'x'},
+                       headers={'X-Forwarded-For': forwarded_for})
+
+
+def test_client_ip_is_taken_from_trusted_hop(app):
+    client = app.test_client()
+    with client:
+        client.get('/health', headers={'X-Forwarded-For': f'1.2.3.4, {PROXY_SEEN_IP}'})
+        assert get_client_info()[1] == PROXY_SEEN_IP
+
+
+def test_spoofed_forwarded_for_does_not_reset_limit(app, limited_ips):
+    client = app.test_client()
+
+    for attempt in range(app.config['RATE_LIMIT_MAX_ATTEMPTS']):
+        response = failed_login(client, f'10.9.9.{attempt}, {PROXY_SEEN_IP}')
+        assert 'Juda ko' not in response.get_data(as_text=True)
+
+    blocked = failed_login(client, f'10.9.9.200, {PROXY_SEEN_IP}')
+    assert 'Juda ko' in blocked.get_data(as_text=True)
+
+    # Boshqa (proxy ko'rgan) IP - alohida hisoblagich
+    allowed = failed_login(client, f'10.9.9.200, {OTHER_IP}')
+    assert 'Juda ko' not in allowed.get_data(as_text=True)
@@ -0,0 +1,120 @@
+"""
+Idempotency kaliti - /attendance/bulk-mark
+
+Kalit so'rov tanasi va foydalanuvchiga bog'langan: aynan shu batch qayta
+yuborilsa avvalgi javob qaytadi, boshqa batch yoki foydalanuvchi bilan
+ishlatilgan kalit 422 qaytaradi va hech narsa yozmaydi.
+"""
+
+from datetime import date
+
+import pytest
+
+from models import db, Group, Student, Attendance
+
+
+@pytest.fixture(scope='module')
+def students(app):
+    """
+    Idempotency testlari uchun alohida guruh va 3 ta talaba
+
+    Returns:
+        tuple: (group_id, [student_id, ...])
+    """
+    group = Group(name='Idempotency')
+    db.session.add(group)
+    db.session.commit()
+
+    db.session.add_all([
+        Student(first_name=f'Ism{i}', last_name='Idem', group_id=group.id, active=True)
+        for i in range(3)
+    ])
+    db.session.commit()
+
+    return group.id, [
+        row.id for row in db.session.query(Student.id).filter_by(group_id=group.id).order_by(Student.id)
+    ]
+
+
+def make_client(app, username='admin'):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['logged_in'] = True
+        session['username'] = username
+    return client
+
+
+def bulk_mark(client, key, group_id, marks):
+    return client.post('/attendance/bulk-mark', json={
+        'date': date.today().isoformat(),
+        'group_id': group_id,
+        'attendances': [
+            {'student_id': student_id, 'status': status} for student_id, status in marks
+        ],
+    }, headers={'Idempotency-Key': key})
+
+
+def statuses(student_ids):
+    rows = db.session.query(Attendance.student_id, Attendance.status).filter(
+        Attendance.student_id.in_(student_ids),
+        Attendance.date == date.today()
+    )
+    return dict(rows)
+
+
+def test_same_batch_is_replayed(app, students):
+    group_id, (first, _, _) = students
+    client = make_client(app)
+
+    response = bulk_mark(client, 'same-batch', group_id, [(first, 'present')])
+    assert response.status_code == 200
+    assert response.get_json()['replayed'] is False
+
+    # Kalitlar tartibi boshqacha, tana esa bir xil
+    retry = client.post('/attendance/bulk-mark', json={
+        'attendances': [{'status': 'present', 'student_id': first}],
+        'group_id': group_id,
+        'date': date.today().isoformat(),
+    }, headers={'Idempotency-Key': 'same-batch'})
+    assert retry.status_code == 200
+    assert retry.get_json()['replayed'] is True
+    assert retry.get_json()['count'] == 1
+
+
+def test_key_reused_with_different_batch(app, students):
+    group_id, (_, second, third) = students
+    client = make_client(app)
+
+    assert bulk_mark(client, 'reused-key', group_id, [(second, 'present')]).status_code == 200
+
+    response = bulk_mark(client, 'reused-key', group_id, [(second, 'absent'), (third, 'absent')])
+    assert response.status_code == 422
+    assert response.get_json()['success'] is False
+
+    # Yangi belgilashlar yozilmagan
+    db.session.expire_all()
+    assert statuses([second, third]) == {second: 'present'}
+
+
+def test_key_reused_by_other_user(app, students):
+    group_id, (first, _, _) = students
+
+    marks = [(first, 'absent')]
+    assert bulk_mark(make_client(app, 'admin'), 'user-key', group_id, marks).status_code == 200
+
+    response = bulk_mark(make_client(app, 'boshqa'), 'user-key', group_id, marks)
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize('key', [12345, {'id': 1}, ['a'], 'x' * 300])
+def test_invalid_key_in_body(app, students, key):
+    group_id, (first, _, _) = students
+
+    response = make_client(app).post('/attendance/bulk-mark', json={
+        'date': date.today().isoformat(),
+        'group_id': group_id,
+        'attendances': [{'student_id': first, 'status': 'present'}],
+        'idempotency_key': key,
+    })
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
@@ -0,0 +1,106 @@
+"""
+Migratsiyalar zanjiri - bo'sh database'dan boshlab
+
+Har bir migratsiya o'z jadval ta'rifi bilan ishlaydi (joriy models.py
+emas), shuning uchun faqat zanjir oxirida sxema models.py bilan bir xil
+bo'lishi kerak. Har bir qadam bo'sh database'da haqiqatan ish qilishi
+ham tekshiriladi.
+"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, inspect
+
+import migrations
+from migrations import MIGRATIONS, get_current_version, upgrade
+from models import db
+
+
+def schema(engine):
+    """
+    Returns:
+        dict: jadval -> (ustunlar, indeks nomlari)
+    """
+    inspector = inspect(engine)
+    return {
+        table: (
+            {column['name'] for column in inspector.get_columns(table)},
+            {index['name'] for index in inspector.get_indexes(table)},
+        )
+        for table in inspector.get_table_names()
+        if table != 'schema_version' and not table.startswith('sqlite_')
+    }
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine('sqlite:///' + str(tmp_path / 'migrate.db'))
+    yield engine
+    engine.dispose()
+
+
+def test_fresh_database_matches_models(engine, tmp_path):
+    applied = upgrade(engine)
+
+    assert len(applied) == len(MIGRATIONS)
+    with engine.connect() as conn:
+        assert get_current_version(conn) == MIGRATIONS[-1][0]
+
+    expected_engine = create_engine('sqlite:///' + str(tmp_path / 'models.db'))
+    db.metadata.create_all(bind=expected_engine)
+    try:
+        assert schema(engine) == schema(expected_engine)
+    finally:
+        expected_engine.dispose()
+
+
+def test_every_migration_changes_fresh_schema(engine, monkeypatch):
+    """
+    Bo'sh database'da hech bir migratsiya no-op bo'lmasligi kerak
+    (masalan, _m001 joriy models.py'dan hamma narsani yaratib qo'ysa)
+    """
+    before = schema(engine)
+    for index, migration in enumerate(MIGRATIONS):
+        monkeypatch.setattr(migrations, 'MIGRATIONS', MIGRATIONS[:index + 1])
+        upgrade(engine)
+
+        after = schema(engine)
+        assert after != before, f"{migration[0]:03d}_{migration[1]} bo'sh database'da hech narsa qilmadi"
+        before = after
+
+
+def test_rollup_backfill_matches_rebuild(engine, monkeypatch):
+    """
+    _m004 mavjud davomatdan rollup'larni rollups.rebuild_range bilan bir xil hisoblaydi
+    """
+    from rollups import rebuild_range
+
+    monkeypatch.setattr(migrations, 'MIGRATIONS', MIGRATIONS[:3])
+    upgrade(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("INSERT INTO groups (id, name) VALUES (1, 'A'), (2, 'B')")
+        conn.exec_driver_sql(
+            "INSERT INTO students (id, first_name, last_name, group_id, active) VALUES "
+            "(1, 'a', 'a', 1, 1), (2, 'b', 'b', 1, 1), (3, 'c', 'c', 1, 0), (4, 'd', 'd', 2, 1)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO attendance (student_id, date, status) VALUES "
+            "(1, '2024-01-01', 'present'), (2, '2024-01-01', 'absent'), (3, '2024-01-01', 'present'), "
+            "(1, '2024-01-02', 'present'), (4, '2024-01-02', 'absent')"
+        )
+
+    monkeypatch.setattr(migrations, 'MIGRATIONS', MIGRATIONS)
+    upgrade(engine)
+
+    query = "SELECT group_id, date, present, absent, active_total FROM daily_group_rollup ORDER BY 1, 2"
+    with engine.begin() as conn:
+        backfilled = conn.exec_driver_sql(query).fetchall()
+        rebuild_range(conn, date(2024, 1, 1), date(2024, 1, 2))
+        rebuilt = conn.exec_driver_sql(query).fetchall()
+
+    assert backfilled == rebuilt == [
+        (1, '2024-01-01', 1, 1, 2),
+        (1, '2024-01-02', 1, 0, 2),
+        (2, '2024-01-02', 0, 1, 1),
+    ]
@@ -0,0 +1,193 @@
+"""
+So'rovlar soni byudjeti (N+1 regressiya testlari)
+
+Har bir route ikki xil hajmdagi guruhda chaqiriladi - 10 talaba va
+2 kunlik davomat hamda 1000 talaba va 30 kunlik davomat. Bajarilgan SQL
+so'rovlari soni ikkalasida bir xil bo'lishi va route byudjetidan
+oshmasligi kerak. Talaba yoki kun bo'yicha sikl ichidagi so'rov (N+1)
+katta guruhda darhol sonni oshirib yuboradi.
+
+Keshlar har o'lchovdan oldin tozalanadi - eng qimmat (sovuq) yo'l o'lchanadi.
+"""
+
+from datetime import timedelta
+
+import pytest
+
+from cache import dashboard_cache, export_cache, roster_cache
+from models import db, Group, Student, Attendance, DailyGroupRollup
+from reports import ReportService
+
+
+# Hajm -> (talabalar soni, davomat kunlari)
+SCALES = {
+    'small': (10, 2),
+    'large': (1000, 30),
+}
+
+# Route -> maksimal SQL so'rovlar soni
+QUERY_BUDGETS = {
+    'attendance_page': 2,
+    'dashboard': 1,
+    'reports_view': 1,
+    'reports_export_group': 3,
+    'reports_export_daily': 3,
+    'reports_export_range': 3,
+    'student_report': 3,
+}
+
+# Route -> hajm ma'lumotlari bilan URL
+ROUTES = {
+    'attendance_page': lambda s: f"/attendance?group_id={s['group_id']}&date={s['end_date']}",
+    'dashboard': lambda s: '/dashboard',
+    'reports_view': lambda s: f"/reports/view?date={s['end_date']}",
+    'reports_export_group': lambda s: (
+        f"/reports/export?date={s['end_date']}&group_id={s['group_id']}"
+    ),
+    'reports_export_daily': lambda s: f"/reports/export?date={s['end_date']}",
+    'reports_export_range': lambda s: (
+        f"/reports/export-range?start_date={s['start_date']}"
+        f"&end_date={s['end_date']}&group_id={s['group_id']}"
+    ),
+    'student_report': lambda s: (
+        f"/reports/student/{s['student_id']}"
+        f"?start_date={s['start_date']}&end_date={s['end_date']}"
+    ),
+}
+
+
+@pytest.fixture(scope='module')
+def scales(app):
+    """
+    Har bir hajm uchun alohida guruh, talabalar va davomat (rollup'lar bilan)
+
+    Returns:
+        dict: hajm -> group_id, student_id, start_date, end_date
+    """
+    from datetime import date
+    from rollups import rebuild_range
+
+    end_date = date.today()
+    data = {}
+
+    for name, (student_count, days) in SCALES.items():
+        group = Group(name=f'Budget-{name}')
+        db.session.add(group)
+        db.session.commit()
+
+        db.session.bulk_insert_mappings(Student, [
+            {
+                'first_name': f'Ism{i:04}',
+                'last_name': f'Byudjet{i:04}',
+                'group_id': group.id,
+                'active': True
+            }
+            for i in range(student_count)
+        ])
+        db.session.commit()
+
+        student_ids = [
+            row.id for row in db.session.query(Student.id).filter_by(group_id=group.id)
+        ]
+        start_date = end_date - timedelta(days=days - 1)
+        db.session.bulk_insert_mappings(Attendance, [
+            {
+                'student_id': student_id,
+                'date': start_date + timedelta(days=day),
+                'status': 'absent' if (student_id + day) % 4 == 0 else 'present'
+            }
+            for student_id in student_ids
+            for day in range(days)
+        ])
+        db.session.commit()
+
+        data[name] = {
+            'group_id': group.id,
+            'student_id': student_ids[0],
+            'start_date': start_date,
+            'end_date': end_date,
+        }
+
+    with db.engine.begin() as conn:
+        rebuild_range(conn, min(scale['start_date'] for scale in data.values()), end_date)
+
+    return data
+
+
+@pytest.fixture
+def client(app):
+    """
+    Login qilingan test client
+    """
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['logged_in'] = True
+    return client
+
+
+def count_queries(app, client, captured_sql, url):
+    """
+    Bitta so'rovdagi SQL so'rovlari soni
+
+    So'rov yangi app context'da (yangi database session bilan) bajariladi.
+    """
+    roster_cache.invalidate_all()
+    dashboard_cache.invalidate_all()
+    export_cache.clear()
+
+    with app.app_context():
+        captured_sql.clear()
+        response = client.get(url)
+        assert response.status_code == 200, url
+        return len(captured_sql)
+
+
+@pytest.mark.parametrize('route', sorted(QUERY_BUDGETS))
+def test_query_budget(route, app, scales, client, captured_sql):
+    counts = {
+        name: count_queries(app, client, captured_sql, ROUTES[route](scale))
+        for name, scale in scales.items()
+    }
+
+    assert counts['large'] <= QUERY_BUDGETS[route], (
+        f"{route}: {counts['large']} ta so'rov (byudjet {QUERY_BUDGETS[route]})"
+    )
+    assert counts['small'] == counts['large'], (
+        f"{route}: so'rovlar soni hajmga bog'liq - {counts}"
+    )
+
+
+def test_dashboard_stats_from_rollups(app, scales):
+    """
+    Dashboard sanoqlari rollup'lardan - xom davomat bilan bir xil;
+    bugungi rollup qatori yo'q guruhda aktiv talabalar oxirgi qatordan
+    """
+    def group_row(group_id):
+        stats = ReportService.dashboard_stats(scales['large']['end_date'])
+        return next(g for g in stats['groups'] if g['group_id'] == group_id)
+
+    for name, (student_count, _) in SCALES.items():
+        scale = scales[name]
+        present, absent = db.session.query(
+            db.func.sum(db.case([(Attendance.status == 'present', 1)], else_=0)),
+            db.func.sum(db.case([(Attendance.status == 'absent', 1)], else_=0))
+        ).join(Student).filter(
+            Student.group_id == scale['group_id'],
+            Attendance.date == scale['end_date']
+        ).one()
+
+        row = group_row(scale['group_id'])
+        assert (row['total'], row['present'], row['absent'], row['unmarked']) == (
+            student_count, present, absent, student_count - present - absent
+        )
+
+    # Bugun hali hech kim belgilanmagan guruh
+    small = scales['small']
+    DailyGroupRollup.query.filter_by(group_id=small['group_id'], date=small['end_date']).delete()
+    try:
+        row = group_row(small['group_id'])
+        assert (row['total'], row['present'], row['absent'], row['unmarked']) == (
+            SCALES['small'][0], 0, 0, SCALES['small'][0]
+        )
+    finally:
+        db.session.rollback()
@@ -0,0 +1,132 @@
+"""
+Query plan regressiya testlari
+
+Har bir "issiq" so'rov haqiqiy servis funksiyasi orqali bajariladi, uning
+SQL'i ushlanadi va EXPLAIN (SQLite: EXPLAIN QUERY PLAN) bilan tekshiriladi.
+Katta jadvallardan birortasi to'liq skanerlansa (indekssiz) test yiqiladi.
+
+PostgreSQL'da kichik seed jadvallarida ham indeks tanlanishi uchun
+`enable_seqscan = off` qo'yiladi - indeks umuman bo'lmasagina Seq Scan qoladi.
+"""
+
+import re
+
+import pytest
+
+from models import db, AdminToken, Attendance, Group, IdempotencyKey, SecurityEvent, Student
+from reports import ReportService
+from rollups import range_version, refresh_recent
+from security import get_active_sessions, get_all_sessions
+
+
+# To'liq skanerlanishi mumkin bo'lmagan jadvallar (groups - kichik ma'lumotnoma)
+LARGE_TABLES = ('attendance', 'students', 'admin_tokens', 'idempotency_keys', 'daily_group_rollup',
+                'security_events')
+
+SQLITE_SCAN = re.compile(r'^SCAN (\w+)$')
+POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def _student(seed):
+    return db.session.get(Student, seed['student_id'])
+
+
+# Nom -> seed bilan chaqiriladigan funksiya
+HOT_QUERIES = {
+    'daily_report': lambda s: ReportService.daily_report(s['today']),
+    'daily_report_group': lambda s: ReportService.daily_report(s['today'], group_id=s['group_id']),
+    'group_students': lambda s: list(ReportService.iter_group_students(s['today'], s['group_id'])),
+    'dashboard_stats': lambda s: ReportService.dashboard_stats(s['today']),
+    'range_matrix': lambda s: ReportService.range_matrix(s['start_date'], s['today']),
+    'range_matrix_group': lambda s: ReportService.range_matrix(s['start_date'], s['today'], s['group_id']),
+    'range_version': lambda s: range_version(s['start_date'], s['today']),
+    'range_version_group': lambda s: range_version(s['start_date'], s['today'], s['group_id']),
+    'student_report': lambda s: ReportService.student_report(s['student_id'], s['start_date'], s['today']),
+    'student_stats': lambda s: _student(s).get_attendance_stats(s['start_date'], s['today']),
+    'attendance_roster': lambda s: Attendance.get_roster(s['today'], s['group_id']),
+    'attendance_by_date': lambda s: Attendance.get_by_date(s['today'], s['group_id']),
+    'attendance_day_summary': lambda s: Attendance.get_day_summary(s['today'], s['group_id']),
+    'attendance_export': lambda s: ReportService.export_query('attendance', s['start_date'], s['today']).all(),
+    'attendance_export_group': lambda s: ReportService.export_query(
+        'attendance', s['start_date'], s['today'], s['group_id']).all(),
+    'students_page': lambda s: Student.list_page(),
+    'students_page_group': lambda s: Student.list_page(
+        group_id=s['group_id'], cursor=Student.encode_cursor(_student(s))),
+    'students_page_inactive': lambda s: Student.list_page(status='inactive', group_id=s['group_id']),
+    'students_page_all': lambda s: Student.list_page(status='all'),
+    'group_student_counts': lambda s: Group.with_student_counts(),
+    'tokens_cleanup': lambda s: AdminToken.cleanup_expired(),
+    'active_sessions': lambda s: get_active_sessions(),
+    'all_sessions': lambda s: get_all_sessions(),
+    'idempotency_purge': lambda s: IdempotencyKey.purge_older_than(),
+    'rollup_refresh_recent': lambda s: refresh_recent(),
+    'security_events_page': lambda s: SecurityEvent.list_page(before=1000),
+    'security_events_type': lambda s: SecurityEvent.list_page(event_type='login_failure'),
+    'security_events_ip': lambda s: SecurityEvent.list_page(ip_address='127.0.0.1'),
+}
+
+
+def explain(statement, parameters):
+    """
+    So'rov rejasi qatorlari (dialektga qarab)
+
+    Returns:
+        list: Reja qatorlari (matn)
+    """
+    with db.engine.connect() as conn:
+        if conn.dialect.name == 'postgresql':
+            with conn.begin():
+                conn.exec_driver_sql('SET LOCAL enable_seqscan = off')
+                rows = conn.exec_driver_sql('EXPLAIN ' + statement, parameters)
+                return [row[0] for row in rows]
+
+        rows = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)
+        return [row[3] for row in rows]
+
+
+def scanned_tables(plan):
+    """
+    Rejada to'liq (indekssiz) skanerlangan katta jadvallar
+    """
+    pattern = POSTGRES_SCAN if db.engine.dialect.name == 'postgresql' else SQLITE_SCAN
+    tables = set()
+    for line in plan:
+        match = pattern.search(line.strip())
+        if match and match.group(1) in LARGE_TABLES:
+            tables.add(match.group(1))
+    return tables
+
+
+@pytest.mark.parametrize('name', sorted(HOT_QUERIES))
+def test_hot_query_uses_indexes(name, seed, captured_sql):
+    HOT_QUERIES[name](seed)
+    db.session.rollback()
+
+    statements = [
+        (statement, parameters) for statement, parameters in captured_sql
+        if statement.lstrip().split(None, 1)[0].upper() in ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+    ]
+    assert statements, f'{name}: hech qanday so\'rov bajarilmadi'
+
+    for statement, parameters in statements:
+        plan = explain(statement, parameters)
+        assert not scanned_tables(plan), (
+            f'{name}: to\'liq skanerlash\n{statement}\n' + '\n'.join(plan)
+        )
+
+
+def test_curated_indexes_exist(app):
+    from sqlalchemy import inspect
+
+    inspector = inspect(db.engine)
+    expected = {
+        'attendance': {'ix_attendance_date_status'},
+        'students': {'ix_students_group_active_name', 'ix_students_active_group_name'},
+        'admin_tokens': {'ix_admin_tokens_expires_at'},
+        'idempotency_keys': {'ix_idempotency_keys_created_at'},
+        'daily_group_rollup': {'ix_daily_group_rollup_date'},
+        'security_events': {'ix_security_events_type_id', 'ix_security_events_ip_id'},
+    }
+    for table, names in expected.items():
+        existing = {index['name'] for index in inspector.get_indexes(table)}
+        assert names <= existing, f'{table}: {names - existing} yo\'q'
@@ -0,0 +1,397 @@
+"""
+Rate limiter backend'lari va sliding-window taxmini
+
+Uchala backend bir xil shartnoma bo'yicha tekshiriladi (oyna almashishi,
+reset, cleanup). Redis o'rniga test ichidagi minimal RESP server
+(stand-in) ishlatiladi - haqiqiy Redis shart emas. Umumiy backend'lar
+uchun ikki "worker" (alohida backend obyektlari) bitta cheklovni ko'rishi
+tekshiriladi.
+"""
+
+import io
+import os
+import socketserver
+import subprocess
+import sys
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import security
+from rate_limit_backends import (
+    MemoryBackend, RedisBackend, RedisError, SQLiteBackend, create_backend
+)
+from security import RateLimiter
+
+
+WINDOW = 1000
+WINDOW_SECONDS = 60
+
+
+# ==========================================
+# RESP STAND-IN SERVER
+# ==========================================
+
+class RespHandler(socketserver.StreamRequestHandler):
+    """
+    Backend ishlatadigan buyruqlar: AUTH, SELECT, MGET, INCR, EXPIRE, DEL
+    """
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        assert line[:1] == b'*', line
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2].decode())
+        return args
+
+    def handle(self):
+        server = self.server
+        while True:
+            command = self.read_command()
+            if command is None:
+                return
+            name, args = command[0].upper(), command[1:]
+            with server.lock:
+                server.commands.append([name] + args)
+                self.wfile.write(self.reply(server, name, args))
+
+    @staticmethod
+    def reply(server, name, args):
+        if name == 'AUTH':
+            if args[0] != server.password:
+                return b'-WRONGPASS invalid password\r\n'
+            return b'+OK\r\n'
+        if name == 'SELECT':
+            return b'+OK\r\n'
+        if name == 'MGET':
+            parts = [b'*%d\r\n' % len(args)]
+            for key in args:
+                value = server.data.get(key)
+                if value is None:
+                    parts.append(b'$-1\r\n')
+                else:
+                    data = str(value).encode()
+                    parts.append(b'$%d\r\n%s\r\n' % (len(data), data))
+            return b''.join(parts)
+        if name == 'INCR':
+            server.data[args[0]] = server.data.get(args[0], 0) + 1
+            return b':%d\r\n' % server.data[args[0]]
+        if name == 'EXPIRE':
+            server.ttls[args[0]] = int(args[1])
+            return b':1\r\n'
+        if name == 'DEL':
+            removed = sum(server.data.pop(key, None) is not None for key in args)
+            return b':%d\r\n' % removed
+        return b"-ERR unknown command '%s'\r\n" % name.encode()
+
+
+class RespServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, password=None):
+        super().__init__(('127.0.0.1', 0), RespHandler)
+        self.password = password
+        self.lock = threading.Lock()
+        self.data = {}
+        self.ttls = {}
+        self.commands = []
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        auth = f':{self.password}@' if self.password else ''
+        return f'redis://{auth}{host}:{port}/3'
+
+
+@pytest.fixture
+def resp_server():
+    server = RespServer(password='maxfiy')
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(params=['memory', 'sqlite', 'redis'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryBackend()
+    if request.param == 'sqlite':
+        return SQLiteBackend(str(tmp_path / 'limits.db'))
+    return RedisBackend(request.getfixturevalue('resp_server').url)
+
+
+# ==========================================
+# BACKEND SHARTNOMASI
+# ==========================================
+
+def test_counts_for_unknown_key(backend):
+    assert backend.counts('10.0.0.1', WINDOW, WINDOW_SECONDS) == (0, 0)
+
+
+def test_increment_and_window_rotation(backend):
+    for _ in range(3):
+        backend.increment('10.0.0.1', WINDOW, WINDOW_SECONDS)
+    assert backend.counts('10.0.0.1', WINDOW, WINDOW_SECONDS) == (0, 3)
+
+    # Keyingi oyna: joriy -> oldingi
+    assert backend.counts('10.0.0.1', WINDOW + 1, WINDOW_SECONDS) == (3, 0)
+    backend.increment('10.0.0.1', WINDOW + 1, WINDOW_SECONDS)
+    assert backend.counts('10.0.0.1', WINDOW + 1, WINDOW_SECONDS) == (3, 1)
+
+    # Bitta oyna o'tkazib yuborilsa - ikkalasi ham nol
+    assert backend.counts('10.0.0.1', WINDOW + 3, WINDOW_SECONDS) == (0, 0)
+    backend.increment('10.0.0.1', WINDOW + 3, WINDOW_SECONDS)
+    assert backend.counts('10.0.0.1', WINDOW + 3, WINDOW_SECONDS) == (0, 1)
+
+    # Boshqa kalitlarga ta'sir qilmaydi
+    assert backend.counts('10.0.0.2', WINDOW + 3, WINDOW_SECONDS) == (0, 0)
+
+
+def test_reset(backend):
+    backend.increment('10.0.0.1', WINDOW, WINDOW_SECONDS)
+    backend.increment('10.0.0.1', WINDOW + 1, WINDOW_SECONDS)
+    backend.reset('10.0.0.1', WINDOW + 1)
+    assert backend.counts('10.0.0.1', WINDOW + 1, WINDOW_SECONDS) == (0, 0)
+
+
+def test_cleanup_keeps_recent_windows(backend):
+    backend.increment('eski', WINDOW, WINDOW_SECONDS)
+    backend.increment('yangi', WINDOW + 2, WINDOW_SECONDS)
+    backend.cleanup(WINDOW + 3)
+
+    assert backend.counts('yangi', WINDOW + 3, WINDOW_SECONDS) == (1, 0)
+    if not isinstance(backend, RedisBackend):
+        # Redis kalitlari TTL bilan o'chadi
+        assert 'eski' not in _keys(backend)
+
+
+def _keys(backend):
+    if isinstance(backend, MemoryBackend):
+        return set(backend.counters)
+    return {row[0] for row in backend._connection().execute("SELECT key FROM rate_limits")}
+
+
+# ==========================================
+# SQLITE
+# ==========================================
+
+def test_sqlite_upsert_rotation_in_one_statement(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'limits.db'))
+
+    def row():
+        return backend._connection().execute(
+            "SELECT window_index, current, previous FROM rate_limits WHERE key = 'ip'"
+        ).fetchone()
+
+    backend.increment('ip', WINDOW, WINDOW_SECONDS)
+    backend.increment('ip', WINDOW, WINDOW_SECONDS)
+    assert row() == (WINDOW, 2, 0)
+
+    backend.increment('ip', WINDOW + 1, WINDOW_SECONDS)
+    assert row() == (WINDOW + 1, 1, 2)
+
+    backend.increment('ip', WINDOW + 5, WINDOW_SECONDS)
+    assert row() == (WINDOW + 5, 1, 0)
+
+
+def test_sqlite_shared_between_workers(tmp_path, monkeypatch):
+    path = str(tmp_path / 'shared.db')
+    monkeypatch.setattr(security, 'time', SimpleNamespace(time=lambda: WINDOW * WINDOW_SECONDS))
+
+    # Ikki worker - alohida backend obyektlari, bitta fayl
+    worker_a = RateLimiter(max_attempts=3, window_minutes=1, backend=SQLiteBackend(path))
+    worker_b = RateLimiter(max_attempts=3, window_minutes=1, backend=SQLiteBackend(path))
+
+    worker_a.record_attempt('10.0.0.1')
+    worker_b.record_attempt('10.0.0.1')
+    assert worker_a.is_allowed('10.0.0.1')
+
+    worker_a.record_attempt('10.0.0.1')
+    assert not worker_a.is_allowed('10.0.0.1')
+    assert not worker_b.is_allowed('10.0.0.1')
+
+    worker_b.reset('10.0.0.1')
+    assert worker_a.is_allowed('10.0.0.1')
+
+
+def test_sqlite_shared_between_processes(tmp_path):
+    path = str(tmp_path / 'shared.db')
+    backend_dir = os.path.dirname(os.path.abspath(security.__file__))
+
+    # Boshqa jarayon (gunicorn worker kabi) bitta faylga yozadi
+    subprocess.run([
+        sys.executable, '-c',
+        'import sys; sys.path.insert(0, sys.argv[1])\n'
+        'from rate_limit_backends import SQLiteBackend\n'
+        'backend = SQLiteBackend(sys.argv[2])\n'
+        'for _ in range(3): backend.increment("10.0.0.1", int(sys.argv[3]), 60)',
+        backend_dir, path, str(WINDOW)
+    ], check=True)
+
+    limiter = RateLimiter(max_attempts=3, window_minutes=1, backend=SQLiteBackend(path))
+    assert limiter.backend.counts('10.0.0.1', WINDOW, WINDOW_SECONDS) == (0, 3)
+
+
+def test_sqlite_concurrent_increments(tmp_path):
+    path = str(tmp_path / 'shared.db')
+    backend = SQLiteBackend(path)
+
+    def worker():
+        # Har bir thread o'z ulanishida (threading.local)
+        for _ in range(50):
+            backend.increment('ip', WINDOW, WINDOW_SECONDS)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert SQLiteBackend(path).counts('ip', WINDOW, WINDOW_SECONDS) == (0, 200)
+
+
+# ==========================================
+# REDIS (RESP)
+# ==========================================
+
+@pytest.mark.parametrize('reply, expected', [
+    (b'+OK\r\n', 'OK'),
+    (b':42\r\n', 42),
+    (b'$5\r\nsalom\r\n', 'salom'),
+    (b'$0\r\n\r\n', ''),
+    (b'$-1\r\n', None),
+    (b'*-1\r\n', None),
+    (b'*3\r\n$1\r\n7\r\n$-1\r\n:2\r\n', ['7', None, 2]),
+    (b'*2\r\n*1\r\n+a\r\n*0\r\n', [['a'], []]),
+])
+def test_resp_reply_parsing(reply, expected):
+    backend = RedisBackend('redis://localhost')
+    backend.reader = io.BytesIO(reply)
+    assert backend._read_reply() == expected
+
+
+@pytest.mark.parametrize('reply', [b'-ERR xato\r\n', b'!nomalum\r\n', b''])
+def test_resp_error_replies(reply):
+    backend = RedisBackend('redis://localhost')
+    backend.reader = io.BytesIO(reply)
+    with pytest.raises(RedisError):
+        backend._read_reply()
+
+
+def test_resp_encoding():
+    assert RedisBackend._encode('INCR', 'k:1') == b'*2\r\n$4\r\nINCR\r\n$3\r\nk:1\r\n'
+    assert RedisBackend._encode('EXPIRE', 'k', 120) == b'*3\r\n$6\r\nEXPIRE\r\n$1\r\nk\r\n$3\r\n120\r\n'
+
+
+def test_redis_auth_select_and_ttl(resp_server):
+    backend = create_backend(resp_server.url)
+    backend.increment('10.0.0.1', WINDOW, WINDOW_SECONDS)
+
+    names = [command[0] for command in resp_server.commands]
+    assert names == ['AUTH', 'SELECT', 'INCR', 'EXPIRE']
+    assert resp_server.commands[1] == ['SELECT', '3']
+    assert resp_server.ttls == {f'davomat:rl:10.0.0.1:{WINDOW}': WINDOW_SECONDS * 2}
+
+
+def test_redis_wrong_password(resp_server):
+    backend = RedisBackend(resp_server.url.replace('maxfiy', 'notogri'))
+    with pytest.raises(RedisError):
+        backend.counts('10.0.0.1', WINDOW, WINDOW_SECONDS)
+    # Xatodan keyin ulanish yopiladi - keyingi chaqiruv qayta ulanadi
+    assert backend.sock is None
+
+
+def test_redis_shared_between_workers(resp_server, monkeypatch):
+    monkeypatch.setattr(security, 'time', SimpleNamespace(time=lambda: WINDOW * WINDOW_SECONDS))
+
+    worker_a = RateLimiter(max_attempts=2, window_minutes=1, backend=RedisBackend(resp_server.url))
+    worker_b = RateLimiter(max_attempts=2, window_minutes=1, backend=RedisBackend(resp_server.url))
+
+    worker_a.record_attempt('10.0.0.1')
+    worker_b.record_attempt('10.0.0.1')
+    assert not worker_a.is_allowed('10.0.0.1')
+    assert not worker_b.is_allowed('10.0.0.1')
+
+
+# ==========================================
+# SLIDING WINDOW TAXMINI
+# ==========================================
+
+class FailingBackend(MemoryBackend):
+    def counts(self, *args):
+        raise RedisError('Ulanish uzildi')
+
+    increment = reset = counts
+
+
+def test_sliding_window_estimate(monkeypatch):
+    now = [WINDOW * WINDOW_SECONDS]
+    monkeypatch.setattr(security, 'time', SimpleNamespace(time=lambda: now[0]))
+    limiter = RateLimiter(max_attempts=5, window_minutes=1)
+
+    for _ in range(4):
+        limiter.record_attempt('ip')
+    assert limiter.is_allowed('ip')            # 4 < 5
+    limiter.record_attempt('ip')
+    assert not limiter.is_allowed('ip')        # 5
+
+    # Keyingi oynaning yarmi: 5 * 0.5 + 0 = 2.5
+    now[0] = (WINDOW + 1) * WINDOW_SECONDS + WINDOW_SECONDS / 2
+    assert limiter.is_allowed('ip')
+    limiter.record_attempt('ip')
+    limiter.record_attempt('ip')
+    assert limiter.is_allowed('ip')            # 2.5 + 2 = 4.5
+    limiter.record_attempt('ip')
+    assert not limiter.is_allowed('ip')        # 2.5 + 3 = 5.5
+
+
+def test_sliding_window_previous_window_decays(monkeypatch):
+    now = [WINDOW * WINDOW_SECONDS]
+    monkeypatch.setattr(security, 'time', SimpleNamespace(time=lambda: now[0]))
+    limiter = RateLimiter(max_attempts=5, window_minutes=1)
+
+    for _ in range(5):
+        limiter.record_attempt('ip')
+
+    # 10% o'tdi: 5 * 0.9 = 4.5 < 5
+    now[0] = (WINDOW + 1) * WINDOW_SECONDS + WINDOW_SECONDS * 0.1
+    assert limiter.is_allowed('ip')
+    limiter.record_attempt('ip')               # 4.5 + 1 = 5.5
+    assert not limiter.is_allowed('ip')
+
+    # 60% o'tdi: 5 * 0.4 + 1 = 3
+    now[0] = (WINDOW + 1) * WINDOW_SECONDS + WINDOW_SECONDS * 0.6
+    assert limiter.is_allowed('ip')
+
+    # Ikki oyna keyin hammasi unutilgan
+    now[0] = (WINDOW + 3) * WINDOW_SECONDS
+    assert limiter.is_allowed('ip')
+    assert limiter.backend.counts('ip', WINDOW + 3, WINDOW_SECONDS) == (0, 0)
+
+
+def test_backend_failure_does_not_block_login(capsys):
+    limiter = RateLimiter(max_attempts=1, window_minutes=1, backend=FailingBackend())
+
+    limiter.record_attempt('ip')
+    limiter.reset('ip')
+    assert limiter.is_allowed('ip')
+    assert 'Rate limiter backend xatosi' in capsys.readouterr().out
+
+
+def test_sqlite_backend_is_lazy(tmp_path):
+    path = tmp_path / 'cache' / 'limits.db'
+    backend = SQLiteBackend(str(path))
+
+    # Yaratishda fayl ham, papka ham ochilmaydi (create_app import paytida)
+    assert not path.parent.exists()
+
+    assert backend.counts('ip', WINDOW, WINDOW_SECONDS) == (0, 0)
+    assert path.exists()
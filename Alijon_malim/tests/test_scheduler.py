@@ -0,0 +1,58 @@
+"""
+Scheduler liderligi - PostgreSQL advisory lock ulanishi
+
+pg_try_advisory_lock/pg_advisory_unlock SQLite funksiyalari bilan
+almashtiriladi: liderning ushlab turilgan ulanishi AUTOCOMMIT rejimida
+bo'lishi (ochiq tranzaksiya - "idle in transaction" - qolmasligi) tekshiriladi.
+"""
+
+import pytest
+from sqlalchemy import create_engine, event
+
+from scheduler import AdvisoryLockLeader
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine('sqlite:///' + str(tmp_path / 'lock.db'))
+    held = set()
+
+    def try_lock(key):
+        if key in held:
+            return 0
+        held.add(key)
+        return 1
+
+    @event.listens_for(engine, 'connect')
+    def register(dbapi_connection, connection_record):
+        dbapi_connection.create_function('pg_try_advisory_lock', 1, try_lock)
+        dbapi_connection.create_function('pg_advisory_unlock', 1, lambda key: held.discard(key) or 1)
+
+    yield engine
+    engine.dispose()
+
+
+def test_lock_connection_is_autocommit(engine):
+    leader = AdvisoryLockLeader()
+
+    assert leader.acquire(engine)
+    assert leader.conn.get_execution_options()['isolation_level'] == 'AUTOCOMMIT'
+    assert not leader.conn.in_transaction()
+
+    # Heartbeat ham tranzaksiya ochmaydi
+    assert leader.acquire(engine)
+    assert not leader.conn.in_transaction()
+
+    leader.release(engine)
+    assert leader.conn is None
+
+
+def test_second_worker_is_not_leader(engine):
+    first, second = AdvisoryLockLeader(), AdvisoryLockLeader()
+
+    assert first.acquire(engine)
+    assert not second.acquire(engine)
+
+    first.release(engine)
+    assert second.acquire(engine)
+    second.release(engine)
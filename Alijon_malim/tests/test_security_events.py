@@ -0,0 +1,48 @@
+"""
+Xavfsizlik hodisalari sahifasi (SecurityEvent.list_page) - limit chegaralari
+"""
+
+import pytest
+
+from models import db, SecurityEvent
+
+
+EVENT_COUNT = 8
+
+
+@pytest.fixture(scope='module')
+def events(app):
+    """
+    Alohida IP bilan EVENT_COUNT ta hodisa (boshqa testlar yozuvlaridan ajratish uchun)
+    """
+    db.session.add_all([
+        SecurityEvent(event_type='login_failure', username='admin', ip_address='10.0.0.99')
+        for _ in range(EVENT_COUNT)
+    ])
+    db.session.commit()
+    return '10.0.0.99'
+
+
+@pytest.mark.parametrize('limit, expected', [
+    (-3, 1),                 # manfiy - kamida bitta qator (LIMIT -2 = cheklovsiz emas)
+    (0, EVENT_COUNT),        # berilmagan - PAGE_SIZE
+    (None, EVENT_COUNT),
+    (3, 3),
+    (10 ** 6, EVENT_COUNT),  # MAX_PAGE_SIZE bilan cheklanadi
+])
+def test_list_page_limit_is_clamped(events, limit, expected):
+    page = SecurityEvent.list_page(limit=limit, ip_address=events)
+
+    assert len(page['items']) == expected
+    assert (page['next_cursor'] is not None) == (expected < EVENT_COUNT)
+
+
+def test_events_endpoint_negative_limit(app, events):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['logged_in'] = True
+
+    response = client.get(f'/security/events/data?limit=-3&ip={events}')
+
+    assert response.status_code == 200
+    assert len(response.get_json()['items']) == 1
@@ -0,0 +1,47 @@
+"""
+Import paytida ish yo'q: `import app` database'ga ulanmaydi va
+CACHE_DIR'da fayl yaratmaydi (sxema - `flask db-check`da, rate limit
+SQLite fayli va metrikalar papkasi - birinchi ishlatilganda)
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+
+CHILD = '''
+import json, os, sqlite3, sys
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+connects = []
+event.listen(Engine, 'connect', lambda *args: connects.append('sqlalchemy'))
+original_connect = sqlite3.connect
+def counting_connect(*args, **kwargs):
+    connects.append('sqlite3')
+    return original_connect(*args, **kwargs)
+sqlite3.connect = counting_connect
+
+import app
+
+files = [os.path.join(root, name) for root, _, names in os.walk(sys.argv[1]) for name in names]
+print(json.dumps({'connects': connects, 'files': files}))
+'''
+
+
+def test_import_does_no_work(tmp_path):
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(
+        os.environ,
+        DATABASE_URL='sqlite:///' + str(tmp_path / 'import.db'),
+        CACHE_DIR=str(tmp_path / 'cache'),
+    )
+
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD, str(tmp_path)],
+        cwd=app_dir, env=env, capture_output=True, text=True, check=True
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert report == {'connects': [], 'files': []}
@@ -0,0 +1,101 @@
+"""
+Token faolligi buferi - scheduler'siz ham yozuvlar kechikmaydi
+
+Bufer hajm (max_pending) yoki yosh (flush_seconds) chegarasidan oshsa
+touch()/revoke() uni o'zi yozadi; sync_revoke bo'lsa o'chirish darhol yoziladi.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import db, AdminToken
+from token_activity import TokenActivityBuffer, token_activity
+
+
+@pytest.fixture
+def tokens(app):
+    """
+    3 ta token, last_used - bir kun oldin
+
+    Returns:
+        list: token id'lari
+    """
+    old = datetime.utcnow() - timedelta(days=1)
+    rows = [
+        AdminToken(token_hash=f'activity-hash-{i}', selector=f'activity-selector-{i}',
+                   expires_at=datetime.utcnow() + timedelta(days=1), last_used=old)
+        for i in range(3)
+    ]
+    db.session.add_all(rows)
+    db.session.commit()
+    ids = [row.id for row in rows]
+
+    yield ids
+
+    db.session.rollback()
+    AdminToken.query.filter(AdminToken.id.in_(ids)).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def stored(ids):
+    db.session.expire_all()
+    return {
+        row.id: row.last_used
+        for row in AdminToken.query.filter(AdminToken.id.in_(ids))
+    }
+
+
+def test_buffered_below_thresholds(tokens):
+    buffer = TokenActivityBuffer(flush_seconds=3600, max_pending=10)
+    before = stored(tokens)
+
+    buffer.touch(tokens[0], before[tokens[0]])
+    buffer.revoke(tokens[1])
+
+    assert buffer.pending_count() == 2
+    assert stored(tokens) == before
+
+
+def test_flushes_inline_at_max_pending(tokens):
+    buffer = TokenActivityBuffer(flush_seconds=3600, max_pending=2)
+    before = stored(tokens)
+
+    buffer.touch(tokens[0], before[tokens[0]])
+    buffer.touch(tokens[1], before[tokens[1]])
+
+    assert buffer.pending_count() == 0
+    after = stored(tokens)
+    assert after[tokens[0]] > before[tokens[0]]
+    assert after[tokens[1]] > before[tokens[1]]
+
+
+def test_flushes_inline_when_oldest_is_too_old(tokens, monkeypatch):
+    buffer = TokenActivityBuffer(flush_seconds=60, max_pending=100)
+    before = stored(tokens)
+
+    buffer.touch(tokens[0], before[tokens[0]])
+    assert buffer.pending_count() == 1
+
+    # Eng eski yozuv flush_seconds'dan eski
+    buffer.pending_since -= timedelta(seconds=61)
+    buffer.touch(tokens[1], before[tokens[1]])
+
+    assert buffer.pending_count() == 0
+    assert stored(tokens)[tokens[0]] > before[tokens[0]]
+
+
+def test_sync_revoke_deletes_immediately(tokens):
+    buffer = TokenActivityBuffer(flush_seconds=3600, max_pending=100)
+    buffer.configure(sync_revoke=True)
+
+    buffer.revoke(tokens[2])
+
+    assert buffer.pending_count() == 0
+    assert tokens[2] not in stored(tokens)
+
+
+def test_revoke_is_synchronous_without_scheduler(app):
+    # conftest SCHEDULER_ENABLED=0 bilan ishga tushiradi
+    assert app.config['SCHEDULER_ENABLED'] is False
+    assert token_activity.sync_revoke is True
@@ -0,0 +1,256 @@
+"""
+Token Activity Module
+"Remember Me" tokenlari uchun write-behind bufer
+
+Auto-login faqat bitta indeksli SELECT qiladi (selector bo'yicha).
+`last_used` yangilanishi va muddati tugagan / buzilgan tokenlarni o'chirish
+xotirada yig'iladi va scheduler thread'ida bitta tranzaksiyada yoziladi:
+
+    - last_used har bir token uchun TOKEN_TOUCH_INTERVAL_MIN daqiqada
+      ko'pi bilan bir marta yangilanadi
+    - bufer har TOKEN_FLUSH_SECONDS soniyada yoziladi (har bir worker)
+    - scheduler ishlamasa ham yozuvlar kechikmaydi: bufer TOKEN_BUFFER_MAX
+      yozuvga yetsa yoki eng eski yozuv TOKEN_FLUSH_SECONDS'dan oshsa,
+      touch()/revoke() uni o'zi yozadi; SCHEDULER_ENABLED=0 da token
+      o'chirilishi darhol yoziladi
+
+Muddati tugagan tokenlar TokenJanitor bilan set-based DELETE orqali
+tozalanadi - har TOKEN_PURGE_INTERVAL_MIN daqiqada lider worker'da yoki
+qo'lda:
+
+    flask --app app tokens-purge --batch-size 1000
+"""
+
+import atexit
+import threading
+from datetime import datetime, timedelta
+
+from scheduler import scheduler
+
+
+class TokenActivityBuffer:
+    """
+    Token faolligi va o'chirilishi kerak bo'lgan tokenlar (worker xotirasida)
+    """
+
+    def __init__(self, touch_interval_minutes=15, flush_seconds=60, max_pending=500):
+        """
+        Args:
+            touch_interval_minutes: Bitta token uchun last_used yozish oralig'i
+            flush_seconds: Eng eski yozilmagan yozuvning maksimal yoshi
+            max_pending: Shuncha yozuv yig'ilsa bufer darhol yoziladi
+        """
+        self.touch_interval = timedelta(minutes=touch_interval_minutes)
+        self.flush_interval = timedelta(seconds=flush_seconds)
+        self.max_pending = max_pending
+        self.sync_revoke = False
+        self.touched = {}
+        self.revoked = set()
+        self.pending_since = None
+        self.lock = threading.Lock()
+
+    def configure(self, touch_interval_minutes=None, flush_seconds=None, max_pending=None,
+                  sync_revoke=None):
+        """
+        Sozlamalarni app config'dan olish
+
+        Args:
+            sync_revoke: True bo'lsa revoke() darhol yoziladi (scheduler o'chiq)
+        """
+        with self.lock:
+            if touch_interval_minutes is not None:
+                self.touch_interval = timedelta(minutes=touch_interval_minutes)
+            if flush_seconds is not None:
+                self.flush_interval = timedelta(seconds=flush_seconds)
+            if max_pending is not None:
+                self.max_pending = max_pending
+            if sync_revoke is not None:
+                self.sync_revoke = sync_revoke
+
+    def _flush_due(self, now):
+        """
+        Bufer hajmi yoki eng eski yozuv yoshi chegaradan oshdimi (lock ichida)
+        """
+        if self.pending_since is None:
+            self.pending_since = now
+        return (
+            len(self.touched) + len(self.revoked) >= self.max_pending or
+            now - self.pending_since >= self.flush_interval
+        )
+
+    def touch(self, token_id, last_used=None):
+        """
+        Token ishlatilganini belgilash (yozish keyinroq)
+
+        Args:
+            token_id: AdminToken.id
+            last_used: Database'dagi joriy qiymat - yaqinda yozilgan bo'lsa
+                       qayta yozilmaydi
+        """
+        now = datetime.utcnow()
+        if last_used is not None and now - last_used < self.touch_interval:
+            return
+
+        with self.lock:
+            self.touched[token_id] = now
+            due = self._flush_due(now)
+
+        if due:
+            self.flush()
+
+    def revoke(self, token_id):
+        """
+        Tokenni o'chirish uchun navbatga qo'yish
+        (sync_revoke bo'lsa yoki chegaradan oshsa - darhol yoziladi)
+        """
+        with self.lock:
+            self.touched.pop(token_id, None)
+            self.revoked.add(token_id)
+            due = self._flush_due(datetime.utcnow()) or self.sync_revoke
+
+        if due:
+            self.flush()
+
+    def is_revoked(self, token_id):
+        """
+        Token o'chirish navbatidami (hali yozilmagan bo'lsa ham)
+        """
+        with self.lock:
+            return token_id in self.revoked
+
+    def pending_count(self):
+        with self.lock:
+            return len(self.touched) + len(self.revoked)
+
+    def flush(self):
+        """
+        To'plangan yozuvlarni bitta tranzaksiyada database'ga yozish
+        (app context ichida chaqiriladi)
+
+        Returns:
+            int: Yangilangan + o'chirilgan tokenlar soni
+        """
+        from models import db, AdminToken
+
+        with self.lock:
+            touched, self.touched = self.touched, {}
+            revoked, self.revoked = self.revoked, set()
+            self.pending_since = None
+
+        if not touched and not revoked:
+            return 0
+
+        table = AdminToken.__table__
+        try:
+            with db.engine.begin() as conn:
+                if touched:
+                    conn.execute(
+                        table.update()
+                        .where(table.c.id == db.bindparam('token_id'))
+                        .values(last_used=db.bindparam('used_at')),
+                        [
+                            {'token_id': token_id, 'used_at': used_at}
+                            for token_id, used_at in touched.items()
+                        ]
+                    )
+                if revoked:
+                    conn.execute(table.delete().where(table.c.id.in_(revoked)))
+        except Exception as e:
+            # Keyingi flush'da qayta urinish
+            with self.lock:
+                for token_id, used_at in touched.items():
+                    self.touched.setdefault(token_id, used_at)
+                self.revoked.update(revoked)
+                # Har bir so'rov qayta urinmasin - keyingi oraliqdan keyin
+                self.pending_since = datetime.utcnow()
+            print(f"❌ Token faolligini yozishda xatolik: {e}")
+            return 0
+
+        return len(touched) + len(revoked)
+
+
+class TokenJanitor:
+    """
+    Muddati tugagan tokenlarni davriy tozalash (AdminToken.purge_expired)
+    """
+
+    def __init__(self, batch_size=1000):
+        """
+        Args:
+            batch_size: Bitta DELETE'dagi maksimal qatorlar soni
+        """
+        self.batch_size = batch_size
+
+    def configure(self, batch_size=None):
+        """
+        Sozlamalarni app config'dan olish
+        """
+        if batch_size is not None:
+            self.batch_size = batch_size
+
+    def run(self, batch_size=None):
+        """
+        Muddati tugagan tokenlarni o'chirish (app context ichida)
+
+        Returns:
+            int: O'chirilgan tokenlar soni
+        """
+        from models import AdminToken
+
+        count = AdminToken.purge_expired(batch_size or self.batch_size)
+        if count:
+            print(f"🧹 {count} ta muddati tugagan token o'chirildi")
+        return count
+
+
+# Barcha worker so'rovlari uchun umumiy bufer
+token_activity = TokenActivityBuffer()
+
+# Muddati tugagan tokenlar tozalovchisi
+token_janitor = TokenJanitor()
+
+
+def init_token_activity(app):
+    """
+    Bufer va tozalovchini sozlash, scheduler vazifalarini qo'shish
+    va `tokens-purge` CLI buyrug'ini ro'yxatdan o'tkazish
+
+    Args:
+        app: Flask application
+    """
+    import click
+
+    token_activity.configure(
+        touch_interval_minutes=app.config.get('TOKEN_TOUCH_INTERVAL_MIN', 15),
+        flush_seconds=app.config.get('TOKEN_FLUSH_SECONDS', 60),
+        max_pending=app.config.get('TOKEN_BUFFER_MAX', 500),
+        # Fon flush'i yo'q - o'chirilgan token boshqa worker'larda ham darhol yaroqsiz bo'lsin
+        sync_revoke=not app.config.get('SCHEDULER_ENABLED', True)
+    )
+    token_janitor.configure(
+        batch_size=app.config.get('TOKEN_PURGE_BATCH_SIZE', 1000)
+    )
+
+    # Bufer har bir worker xotirasida - har bir worker o'zinikini yozadi
+    scheduler.add_job(
+        'token-activity-flush', token_activity.flush,
+        app.config.get('TOKEN_FLUSH_SECONDS', 60), leader_only=False
+    )
+    scheduler.add_job(
+        'tokens-purge', token_janitor.run,
+        app.config.get('TOKEN_PURGE_INTERVAL_MIN', 60) * 60
+    )
+
+    def flush():
+        with app.app_context():
+            token_activity.flush()
+
+    @app.cli.command('tokens-purge')
+    @click.option('--batch-size', default=None, type=int, help="Bitta DELETE'dagi qatorlar soni")
+    def tokens_purge_command(batch_size):
+        """Muddati tugagan remember-me tokenlarini o'chirish"""
+        count = token_janitor.run(batch_size)
+        print(f"✅ {count} ta muddati tugagan token o'chirildi")
+
+    # Worker to'xtaganda qolganini yozish
+    atexit.register(flush)